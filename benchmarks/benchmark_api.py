@@ -0,0 +1,430 @@
+#!/usr/bin/env python
+
+import argparse
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from nf_rnaseq import config, requests_wrapper, scheduler, variables
+from nf_rnaseq.cli import get_gene_name
+
+re_biomart_ids = re.compile(r'<Filter name = "[^"]*" value = "([^"]*)"/>')
+
+LIST_HOSTS = ["http://www.ensembl.org", "https://rest.uniprot.org", "https://rest.genenames.org"]
+"""list[str]: Live API hosts replaced by the emulator URL."""
+
+DICT_ID_FORMATS = {
+    "BioMart": "ENST{:011d}.1",
+    "BioMartPOST": "ENST{:011d}.1",
+    "HGNC": "NM_{:06d}.1",
+    "UniProtBULK": "P{:05d}",
+}
+"""dict[str, str]: Format of the synthetic identifiers queried for each database."""
+
+
+def get_gene_name_for(identifier: str) -> str:
+    """Get the deterministic gene name the emulator returns for an identifier."""
+    return f"GENE_{identifier}"
+
+
+@dataclass
+class EmulatorConfig:
+    """Behavior of the local API emulator."""
+
+    latency: float = 0.0
+    """float: Seconds added to every response."""
+    error_rate: float = 0.0
+    """float: Fraction of requests answered with 500."""
+    rate_429: float = 0.0
+    """float: Fraction of requests answered with 429 Too Many Requests."""
+    retry_after: int = 0
+    """int: Retry-After header in seconds sent with 429 responses."""
+    job_delay: float = 0.0
+    """float: Seconds before a submitted UniProt idmapping job finishes."""
+    page_size: int = 500
+    """int: Number of UniProt idmapping results per page."""
+    seed: int = 0
+    """int: Seed for injected errors."""
+
+
+@dataclass
+class APIEmulator:
+    """Local HTTP server emulating BioMart martservice, UniProt idmapping, and HGNC fetch."""
+
+    config: EmulatorConfig = field(default_factory=EmulatorConfig)
+    """EmulatorConfig: Latency, error, and job settings."""
+
+    def __post_init__(self):
+        self.counts = Counter()
+        self.dict_jobs = {}
+        self.lock = threading.Lock()
+        self.rng = random.Random(self.config.seed)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.make_handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running emulator."""
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve requests in a background thread."""
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Shut down the server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def maybe_inject_error(self) -> int | None:
+        """Draw an injected status code (429 or 500) or None."""
+        with self.lock:
+            draw = self.rng.random()
+        if draw < self.config.rate_429:
+            return 429
+        if draw < self.config.rate_429 + self.config.error_rate:
+            return 500
+        return None
+
+    def biomart(self, str_query: str) -> tuple[int, str, dict]:
+        """Answer a martservice query with one TSV row per identifier."""
+        match = re_biomart_ids.search(str_query)
+        list_ids = match.group(1).split(",") if match else []
+        text = "".join(f"{i}\t{get_gene_name_for(i)}\n" for i in list_ids if i != "")
+        return 200, text, {"Content-Type": "text/plain"}
+
+    def uniprot_run(self, dict_form: dict) -> tuple[int, str, dict]:
+        """Submit an idmapping job."""
+        jobId = uuid.uuid4().hex
+        with self.lock:
+            self.dict_jobs[jobId] = (dict_form["ids"][0].split(","), time.monotonic() + self.config.job_delay)
+        return 200, json.dumps({"jobId": jobId}), {"Content-Type": "application/json"}
+
+    def uniprot_results(self, jobId: str, cursor: int, status: bool) -> tuple[int, str, dict]:
+        """Answer an idmapping status or results request, paginated with Link headers."""
+        with self.lock:
+            list_ids, time_ready = self.dict_jobs[jobId]
+        if time.monotonic() < time_ready:
+            if status:
+                return 200, json.dumps({"jobStatus": "RUNNING"}), {"Content-Type": "application/json"}
+            return 400, json.dumps({"messages": ["job not finished"]}), {"Content-Type": "application/json"}
+
+        page = list_ids[cursor : cursor + self.config.page_size]
+        dict_headers = {"Content-Type": "application/json"}
+        if cursor + self.config.page_size < len(list_ids):
+            url_next = f"{self.url}/idmapping/results/{jobId}?cursor={cursor + self.config.page_size}"
+            dict_headers["Link"] = f'<{url_next}>; rel="next"'
+        dict_json = {"results": [{"from": i, "to": get_gene_name_for(i)} for i in page], "failedIds": []}
+        return 200, json.dumps(dict_json), dict_headers
+
+    def hgnc(self, term_in: str, identifier: str) -> tuple[int, str, dict]:
+        """Answer an HGNC fetch request with one document per identifier in an OR query."""
+        list_docs = [{"symbol": get_gene_name_for(i), term_in: [i]} for i in identifier.split("+OR+")]
+        dict_json = {"responseHeader": {"status": 0}, "response": {"numFound": len(list_docs), "docs": list_docs}}
+        return 200, json.dumps(dict_json), {"Content-Type": "application/json"}
+
+    def route(self, method: str, path: str, dict_query: dict, dict_form: dict) -> tuple[int, str, dict]:
+        """Dispatch a request to the emulated endpoint."""
+        if path == "/biomart/martservice":
+            return self.biomart((dict_form if method == "POST" else dict_query)["query"][0])
+        if path == "/idmapping/run" and method == "POST":
+            return self.uniprot_run(dict_form)
+        if path.startswith("/idmapping/status/") or path.startswith("/idmapping/results/"):
+            cursor = int(dict_query.get("cursor", ["0"])[0])
+            return self.uniprot_results(path.rsplit("/", 1)[-1], cursor, path.startswith("/idmapping/status/"))
+        if path.startswith("/fetch/"):
+            _, _, term_in, identifier = path.split("/", 3)
+            return self.hgnc(term_in, identifier)
+        return 404, "", {}
+
+    def make_handler(self):
+        """Create a request handler class bound to this emulator."""
+        emulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def handle_request(self, method):
+                url = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length", 0))
+                dict_form = parse_qs(self.rfile.read(length).decode()) if length > 0 else {}
+
+                time.sleep(emulator.config.latency)
+                status = emulator.maybe_inject_error()
+                if status is None:
+                    status, body, dict_headers = emulator.route(method, url.path, parse_qs(url.query), dict_form)
+                else:
+                    body, dict_headers = "", {"Retry-After": str(emulator.config.retry_after)}
+                with emulator.lock:
+                    emulator.counts[status] += 1
+
+                data = body.encode()
+                self.send_response(status)
+                for key, value in dict_headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self.handle_request("GET")
+
+            def do_POST(self):
+                self.handle_request("POST")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def point_registry_at(url: str) -> dict:
+    """Copy variables.DICT_DATABASES with every live API host replaced by the emulator URL."""
+    dict_out = {}
+    for database, dict_methods in variables.DICT_DATABASES.items():
+        dict_out[database] = {}
+        for method, dict_api in dict_methods.items():
+            url_base = dict_api["url_base"]
+            for host in LIST_HOSTS:
+                if url_base is not None:
+                    url_base = url_base.replace(host, url)
+            dict_out[database][method] = {**dict_api, "url_base": url_base}
+    return dict_out
+
+
+def record_requests(session, list_records: list):
+    """Wrap session.send to record the latency and cache status of each request made by the clients."""
+    send = session.send
+
+    def timed_send(request, **kwargs):
+        t0 = time.perf_counter()
+        response = send(request, **kwargs)
+        list_records.append((time.perf_counter() - t0, getattr(response, "from_cache", False)))
+        return response
+
+    session.send = timed_send
+    return session
+
+
+def run_benchmark(
+    emulator: APIEmulator,
+    database: str,
+    n_ids: int,
+    batch_size: int | None = None,
+    workers: int = 4,
+    passes: int = 2,
+    polling_interval: float = 0.05,
+    cache_dir: str | None = None,
+) -> list[dict]:
+    """Query the emulator with a fresh requests cache and report throughput, latency, and cache hits per pass.
+
+    The first pass runs against an empty cache and later passes measure cache hits.
+
+    Parameters
+    ----------
+    emulator : APIEmulator
+        Running emulator
+    database : str
+        Database key in variables.DICT_DATABASES
+    n_ids : int
+        Number of synthetic identifiers to query
+    batch_size : int | None
+        Identifiers per request; if None, batches are packed by batching.pack_batches
+    workers : int
+        Maximum number of concurrent requests
+    passes : int
+        Number of times to query the same identifiers
+    polling_interval : float
+        Base interval in seconds between UniProt job status polls
+    cache_dir : str | None
+        Directory for the requests cache; default is a temporary directory
+
+    Returns
+    -------
+    list[dict]
+        One row of metrics per pass
+
+    """
+    list_ids = [DICT_ID_FORMATS[database].format(i) for i in range(n_ids)]
+    dict_databases = variables.DICT_DATABASES
+    variables.DICT_DATABASES = point_registry_at(emulator.url)
+    list_rows = []
+    try:
+        with tempfile.TemporaryDirectory(dir=cache_dir) as tmp_dir:
+            config.set_requests_cache(os.path.join(tmp_dir, f"{database}_{batch_size}"))
+            os.environ.pop(config.LOOKUP_STORE_VAR, None)
+            requests_wrapper.get_cached_session.cache_clear()
+            for idx in range(passes):
+                list_records = []
+                session = record_requests(requests_wrapper.get_cached_session(), list_records)
+                n_http = sum(emulator.counts.values())
+
+                t0 = time.perf_counter()
+                if "POST" in variables.DICT_DATABASES[database] and "GET" in variables.DICT_DATABASES[database]:
+                    list_results = [
+                        api_obj.result
+                        for api_obj in scheduler.run_jobs(database, list_ids, batch_size, workers, polling_interval)
+                    ]
+                else:
+                    list_results = get_gene_name.query_database_batches(database, list_ids, batch_size, workers)
+                seconds = time.perf_counter() - t0
+                # drop the instance attribute set by record_requests
+                del session.send
+
+                latency = np.array([i[0] for i in list_records]) * 1e3
+                list_rows.append(
+                    {
+                        "database": database,
+                        "batch_size": batch_size if batch_size is not None else "auto",
+                        "pass": "cold" if idx == 0 else f"warm{idx}",
+                        "ids": sum(len(result) for result in list_results),
+                        "seconds": seconds,
+                        "requests": len(list_records),
+                        "http_requests": sum(emulator.counts.values()) - n_http,
+                        "requests_per_sec": len(list_records) / seconds,
+                        "ids_per_sec": n_ids / seconds,
+                        "p50_ms": np.percentile(latency, 50) if len(latency) > 0 else np.nan,
+                        "p99_ms": np.percentile(latency, 99) if len(latency) > 0 else np.nan,
+                        "cache_hit_rate": np.mean([i[1] for i in list_records]) if list_records else np.nan,
+                    }
+                )
+            requests_wrapper.get_cached_session.cache_clear()
+    finally:
+        variables.DICT_DATABASES = dict_databases
+        os.environ.pop(config.REQUESTS_CACHE_VAR, None)
+    return list_rows
+
+
+def parsearg_utils():
+    """
+
+    Argparser for the offline API benchmarks.
+
+    Returns
+    -------
+    args: argparse.Namespace
+        Namespace object containing benchmark settings
+
+    """
+    parser = argparse.ArgumentParser(description="Parser for benchmark_api.py.")
+
+    parser.add_argument(
+        "-d",
+        "--databases",
+        help="Databases to benchmark (type: str, default: all emulated databases)",
+        nargs="+",
+        default=list(DICT_ID_FORMATS.keys()),
+        choices=list(DICT_ID_FORMATS.keys()),
+    )
+
+    parser.add_argument(
+        "-n",
+        "--ids",
+        help="Number of identifiers to query per database (type: int, default: 1000)",
+        type=int,
+        default=1000,
+    )
+
+    parser.add_argument(
+        "-b",
+        "--batchSizes",
+        help="Identifiers per request to compare; 0 packs batches by database defaults (type: int, default: 0)",
+        nargs="+",
+        type=int,
+        default=[0],
+    )
+
+    parser.add_argument(
+        "-w",
+        "--workers",
+        help="Number of concurrent requests (type: int, default: 4)",
+        type=int,
+        default=4,
+    )
+
+    parser.add_argument(
+        "--latency",
+        help="Seconds added to every emulated response (type: float, default: 0.02)",
+        type=float,
+        default=0.02,
+    )
+
+    parser.add_argument(
+        "--errorRate",
+        help="Fraction of emulated responses that are 500 errors (type: float, default: 0)",
+        type=float,
+        default=0.0,
+    )
+
+    parser.add_argument(
+        "--rate429",
+        help="Fraction of emulated responses that are 429 Too Many Requests (type: float, default: 0)",
+        type=float,
+        default=0.0,
+    )
+
+    parser.add_argument(
+        "--jobDelay",
+        help="Seconds before an emulated UniProt idmapping job finishes (type: float, default: 0.2)",
+        type=float,
+        default=0.2,
+    )
+
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Path to write results as CSV (type: str, default: None)",
+        type=str,
+        default=None,
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    """Run the offline API benchmarks and print a table of results."""
+    args = parsearg_utils()
+    emulator_config = EmulatorConfig(
+        latency=args.latency,
+        error_rate=args.errorRate,
+        rate_429=args.rate429,
+        job_delay=args.jobDelay,
+    )
+    list_rows = []
+    with APIEmulator(emulator_config) as emulator:
+        for database in args.databases:
+            for batch_size in args.batchSizes:
+                list_rows.extend(
+                    run_benchmark(emulator, database, args.ids, batch_size if batch_size > 0 else None, args.workers)
+                )
+
+    df = pd.DataFrame(list_rows)
+    print(df.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+    if args.output is not None:
+        df.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+from merge_featureCounts import LIST_FORMATS, write_count_matrix
+
+LIST_RULES = ["split", "first", "all", "drop"]
+"""list[str]: Rules for features that map to more than one gene (see build_indicator)."""
+
+logger = logging.getLogger(__name__)
+
+
+def parsearg_utils():
+    """
+
+    Argparser to collapse the merged feature-level count matrix to genes.
+
+    Returns
+    -------
+    args: argparse.Namespace
+        Namespace object containing count matrix, annotation, and aggregation rules
+
+    """
+    parser = argparse.ArgumentParser(description="Parser for aggregate_featureCounts.py.")
+
+    parser.add_argument(
+        "-c",
+        "--counts",
+        help="Merged count matrix from merge_featureCounts.py; a .csv or the path prefix of .npy/.npz/.csr.npz output (type: str)",
+        type=str,
+    )
+
+    parser.add_argument(
+        "-p",
+        "--prefixFile",
+        help="Prefix for the output files (type: str)",
+        type=str,
+    )
+
+    parser.add_argument(
+        "-a",
+        "--annotation",
+        help="get_gene_name output (.jsonl, .parquet, or .tsv) mapping features to genes (type: str, default: None)",
+        nargs="+",
+        default=None,
+    )
+
+    parser.add_argument(
+        "-g",
+        "--fileGTF",
+        help="GTF to map features to genes instead of --annotation (type: str, default: None)",
+        type=str,
+        default=None,
+    )
+
+    parser.add_argument(
+        "--termIn",
+        help="GTF attribute matching the feature IDs (type: str, default: transcript_id)",
+        type=str,
+        default="transcript_id",
+    )
+
+    parser.add_argument(
+        "--termOut",
+        help="GTF attribute to aggregate to (type: str, default: gene_name)",
+        type=str,
+        default="gene_name",
+    )
+
+    parser.add_argument(
+        "-r",
+        "--rule",
+        help="Features mapping to more than one gene: 'split' counts equally, 'first' counts to the first gene, 'all' counts fully to each, 'drop' ignores them (type: str, default: split)",
+        type=str,
+        default="split",
+        choices=LIST_RULES,
+    )
+
+    parser.add_argument(
+        "-d",
+        "--dropUnmapped",
+        help="If flag included, drop features without a gene; otherwise keep each as its own row",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "-o",
+        "--outputFormat",
+        help="Output format(s) for the gene-level count matrix (type: str, default: csv)",
+        nargs="+",
+        default=["csv"],
+        choices=LIST_FORMATS,
+    )
+
+    args = parser.parse_args()
+
+    return args
+
+
+def read_feature_map(
+    list_annotation: list[str] | None = None,
+    path_gtf: str | None = None,
+    term_in: str = "transcript_id",
+    term_out: str = "gene_name",
+) -> pd.DataFrame:
+    """
+
+    Read feature to gene pairs from get_gene_name output or a GTF.
+
+    Parameters
+    ----------
+    list_annotation: list[str] | None
+        get_gene_name output files read with nf_rnaseq.load.load_gene_names
+    path_gtf: str | None
+        GTF read with nf_rnaseq.gtf.load_gtf_index if list_annotation is None
+    term_in: str
+        GTF attribute matching the feature IDs; default is "transcript_id"
+    term_out: str
+        GTF attribute to aggregate to; default is "gene_name"
+
+    Returns
+    -------
+    pd.DataFrame
+        "feature" and "gene" columns with one row per (feature, gene) pair; NaN genes are dropped
+
+    """
+    if list_annotation is not None:
+        from nf_rnaseq.load import load_gene_names
+
+        df = load_gene_names(list_annotation)
+        df = pd.DataFrame(
+            {"feature": df["original_id"].to_numpy(dtype=object), "gene": df["gene_name"].to_numpy(dtype=object)}
+        )
+    elif path_gtf is not None:
+        from nf_rnaseq.gtf import load_gtf_index
+
+        dict_index = load_gtf_index(path_gtf, term_in, term_out)
+        df = pd.DataFrame({"feature": list(dict_index.keys()), "gene": list(dict_index.values())}, dtype=object)
+    else:
+        raise ValueError("Either an annotation or a GTF is required to map features to genes")
+    return df.dropna().drop_duplicates(ignore_index=True)
+
+
+def build_indicator(
+    features: np.ndarray,
+    df_map: pd.DataFrame,
+    rule: str = "split",
+    drop_unmapped: bool = False,
+):
+    """
+
+    Build a sparse feature x gene indicator matrix whose entries are the share of a feature's counts per gene.
+
+    Parameters
+    ----------
+    features: np.ndarray
+        Feature IDs (rows of the count matrix)
+    df_map: pd.DataFrame
+        "feature" and "gene" pairs from read_feature_map
+    rule: str
+        Rule for features that map to more than one gene; default is "split"
+
+        - split: weight 1 / number of genes, so totals are preserved
+        - first: weight 1 for the first gene listed
+        - all: weight 1 for every gene
+        - drop: no weight, so the feature is excluded
+    drop_unmapped: bool
+        If True, features without a gene are excluded; otherwise each is kept as its own gene; default is False
+
+    Returns
+    -------
+    tuple[scipy.sparse.csr_matrix, np.ndarray]
+        Indicator matrix (features x genes) and gene labels (columns)
+
+    """
+    from scipy import sparse
+
+    rows = pd.Index(features).get_indexer(df_map["feature"])
+    mask = rows >= 0
+    rows, genes = rows[mask], df_map["gene"].to_numpy(dtype=object)[mask]
+    n_genes = np.bincount(rows, minlength=len(features))
+
+    if rule == "split":
+        weights = 1 / n_genes[rows]
+    else:
+        if rule == "first":
+            mask = ~pd.Series(rows).duplicated().to_numpy()
+        elif rule == "drop":
+            mask = n_genes[rows] == 1
+        else:
+            mask = np.ones(len(rows), dtype=bool)
+        rows, genes = rows[mask], genes[mask]
+        weights = np.ones(len(rows), dtype=np.int64)
+
+    if not drop_unmapped:
+        # features without any gene (not those dropped by the rule) are kept under their own ID
+        rows_unmapped = np.flatnonzero(n_genes == 0)
+        rows = np.concatenate([rows, rows_unmapped])
+        genes = np.concatenate([genes, np.asarray(features, dtype=object)[rows_unmapped]])
+        weights = np.concatenate([weights, np.ones(len(rows_unmapped), dtype=weights.dtype)])
+
+    cols, labels = pd.factorize(genes, sort=True)
+    mat_indicator = sparse.csr_matrix((weights, (rows, cols)), shape=(len(features), len(labels)))
+    return mat_indicator, np.asarray(labels, dtype=object)
+
+
+def read_counts(path: str, gene_column_name: str = "Geneid"):
+    """
+
+    Read a merged count matrix from a .csv or the path prefix of binary merge_featureCounts.py output.
+
+    Parameters
+    ----------
+    path: str
+        Path to a .csv count matrix or prefix of .npy/.npz/.csr.npz output (see nf_rnaseq.load.load_count_matrix)
+    gene_column_name: str
+        Feature ID column of a .csv count matrix; default is "Geneid"
+
+    Returns
+    -------
+    tuple[np.ndarray | scipy.sparse.csr_matrix, np.ndarray, np.ndarray]
+        Count matrix (features x samples), feature IDs, and sample names
+
+    """
+    if path.endswith(".csv"):
+        df = pd.read_csv(path, dtype={gene_column_name: str})
+        return df.iloc[:, 1:].to_numpy(), df.iloc[:, 0].to_numpy(dtype=object), df.columns[1:].to_numpy()
+
+    from nf_rnaseq.load import load_count_matrix
+
+    return load_count_matrix(path)
+
+
+def aggregate_featureCounts(
+    path_counts: str,
+    prefix: str,
+    list_annotation: list[str] | None = None,
+    path_gtf: str | None = None,
+    term_in: str = "transcript_id",
+    term_out: str = "gene_name",
+    rule: str = "split",
+    drop_unmapped: bool = False,
+    list_formats: list[str] | None = None,
+):
+    """
+
+    Collapse a feature-level count matrix to genes with one sparse matrix product.
+
+    Writes <prefix>_featureCounts_gene in list_formats (see merge_featureCounts.write_count_matrix).
+
+    Parameters
+    ----------
+    path_counts: str
+        Merged count matrix (see read_counts)
+    prefix: str
+        Prefix for the output files
+    list_annotation: list[str] | None
+        get_gene_name output mapping features to genes
+    path_gtf: str | None
+        GTF mapping features to genes if list_annotation is None
+    term_in: str
+        GTF attribute matching the feature IDs; default is "transcript_id"
+    term_out: str
+        GTF attribute to aggregate to; default is "gene_name"
+    rule: str
+        Rule for features that map to more than one gene (see build_indicator); default is "split"
+    drop_unmapped: bool
+        If True, drop features without a gene; default is False
+    list_formats: list[str] | None
+        Output formats; default is ["csv"]
+
+    Returns
+    -------
+    pd.DataFrame
+        Gene-level count matrix with gene labels as the first column
+
+    """
+    mat_counts, features, samples = read_counts(path_counts)
+    df_map = read_feature_map(list_annotation, path_gtf, term_in, term_out)
+    mat_indicator, genes = build_indicator(features, df_map, rule, drop_unmapped)
+
+    # (genes x features) @ (features x samples); sparse or memory-mapped counts are never copied to a DataFrame
+    mat_genes = mat_indicator.T @ mat_counts
+    if hasattr(mat_genes, "toarray"):
+        mat_genes = mat_genes.toarray()
+
+    n_mapped = np.asarray(mat_indicator.getnnz(axis=1) > 0).sum()
+    logger.info(f"Aggregated {n_mapped} of {len(features)} features into {len(genes)} genes ({rule})")
+
+    df_genes = pd.DataFrame(np.asarray(mat_genes), columns=samples, copy=False)
+    df_genes.insert(0, "gene", genes)
+    write_count_matrix(df_genes, prefix, list_formats, suffix="featureCounts_gene")
+    return df_genes
+
+
+def main():
+    """Main function to collapse featureCounts features to genes."""
+    logging.basicConfig(format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO)
+    arguments = parsearg_utils()
+    aggregate_featureCounts(
+        arguments.counts,
+        arguments.prefixFile,
+        list_annotation=arguments.annotation,
+        path_gtf=arguments.fileGTF,
+        term_in=arguments.termIn,
+        term_out=arguments.termOut,
+        rule=arguments.rule,
+        drop_unmapped=arguments.dropUnmapped,
+        list_formats=arguments.outputFormat,
+    )
+
+
+if __name__ == "__main__":
+    main()
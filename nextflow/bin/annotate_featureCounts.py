@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+
+from nf_rnaseq.load import read_gene_names_jsonl
+
+logger = logging.getLogger(__name__)
+
+
+def parsearg_utils():
+    """
+
+    Argparser to add gene names to the merged featureCounts matrix.
+
+    Returns
+    -------
+    args: argparse.Namespace
+        Namespace object containing count matrix and gene name files
+
+    """
+    parser = argparse.ArgumentParser(description="Parser for annotate_featureCounts.py.")
+
+    parser.add_argument(
+        "-c",
+        "--counts",
+        help="Path to merged featureCounts matrix written by merge_featureCounts.py (type: str)",
+        type=str,
+    )
+
+    parser.add_argument(
+        "-a",
+        "--geneNames",
+        help="Path to get_gene_name -j/--jsonl output files (type: str)",
+        nargs="+",
+    )
+
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Path to write the annotated matrix to (type: str, default: <counts>_annotated.csv)",
+        type=str,
+        default=None,
+    )
+
+    parser.add_argument(
+        "-s",
+        "--sep",
+        help="Separator between the gene names of identifiers that map to more than one gene (type: str, default: ;)",
+        type=str,
+        default=";",
+    )
+
+    return parser
+
+
+def annotate_count_matrix(
+    df_counts: pd.DataFrame,
+    df_gene_names: pd.DataFrame,
+    sep: str = ";",
+) -> pd.DataFrame:
+    """Join gene names and their source onto a count matrix in one hash join on Geneid.
+
+    Parameters
+    ----------
+    df_counts : pd.DataFrame
+        Merged count matrix with a Geneid column followed by one column per sample
+    df_gene_names : pd.DataFrame
+        original_id, gene_name (list), and source columns (see nf_rnaseq.load.read_gene_names_jsonl)
+    sep : str
+        Separator between multiple gene names of one identifier
+
+    Returns
+    -------
+    pd.DataFrame
+        Count matrix with gene_name and source columns after Geneid; NaN for IDs without gene names
+
+    """
+    gene_name = df_gene_names["gene_name"].str.join(sep).replace("", np.nan).to_numpy()
+    source = df_gene_names["source"].to_numpy()
+
+    idx = pd.Index(df_gene_names["original_id"]).get_indexer(df_counts["Geneid"])
+    mask_missing = idx == -1
+
+    df_out = df_counts.copy()
+    df_out.insert(1, "gene_name", np.where(mask_missing, np.nan, gene_name[idx]))
+    df_out.insert(2, "source", np.where(mask_missing, np.nan, source[idx]))
+    return df_out
+
+
+def main():
+    """Add gene names from get_gene_name to the merged featureCounts matrix."""
+    logging.basicConfig(format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO)
+    args = parsearg_utils().parse_args()
+
+    df_counts = pd.read_csv(args.counts, dtype={"Geneid": str})
+    df_gene_names = read_gene_names_jsonl(args.geneNames)
+    df_out = annotate_count_matrix(df_counts, df_gene_names, args.sep)
+
+    path_out = args.output
+    if path_out is None:
+        path_out = f"{args.counts.removesuffix('.csv')}_annotated.csv"
+    df_out.to_csv(path_out, index=False)
+
+    n_missing = df_out["gene_name"].isna().sum()
+    logger.info(f"Annotated {len(df_out) - n_missing} of {len(df_out)} features; wrote {path_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,34 @@
 
 import argparse
 import glob
+import hashlib
+import json
+import logging
 import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
+import numpy as np
 import pandas as pd
 
+LIST_FORMATS = ["csv", "parquet", "npz", "npy", "csr"]
+"""list[str]: Supported output formats for the merged count matrix."""
+
+DICT_FORMAT_FILES = {
+    "csv": [".csv"],
+    "parquet": [".parquet"],
+    "npz": [".npz"],
+    "npy": [".npy", ".genes.txt", ".samples.txt"],
+    "csr": [".csr.npz", ".genes.txt", ".samples.txt"],
+}
+"""dict[str, list[str]]: Extensions of the files written by write_count_matrix for each format."""
+
+COUNT_COLUMN = 6
+"""int: Position of the first count column in featureCounts output, after Geneid, Chr, Start, End, Strand, Length."""
+
+logger = logging.getLogger(__name__)
+
 
 def parsearg_utils():
     """
@@ -34,6 +58,49 @@ def parsearg_utils():
         type=str,
     )
 
+    parser.add_argument(
+        "-m",
+        "--mode",
+        help="Merge mode; 'stream' fills a preallocated matrix one column at a time, 'merge' uses chained pd.merge (type: str, default: 'stream')",
+        type=str,
+        default="stream",
+        choices=["stream", "merge"],
+    )
+
+    parser.add_argument(
+        "-o",
+        "--outputFormat",
+        help="Output format(s) for the merged count matrix; npy and csr also write .genes.txt and .samples.txt indices (type: str, default: csv)",
+        nargs="+",
+        default=["csv"],
+        choices=LIST_FORMATS,
+    )
+
+    parser.add_argument(
+        "-e",
+        "--existing",
+        help="Existing merged count matrix (csv, parquet, npz, npy, or csr.npz) to append new samples to; files already recorded in its manifest are skipped (type: str, default: None)",
+        type=str,
+        default=None,
+    )
+
+    parser.add_argument(
+        "-n",
+        "--normalize",
+        help="Normalized matrices to also write, in the same formats as the count matrix (type: str, default: None)",
+        nargs="+",
+        default=None,
+        choices=["cpm", "tpm"],
+    )
+
+    parser.add_argument(
+        "-w",
+        "--workers",
+        help="Number of processes used to parse featureCounts files in 'stream' mode (type: int, default: 1)",
+        type=int,
+        default=1,
+    )
+
     args = parser.parse_args()
 
     return args
@@ -61,15 +128,622 @@ def convert_files2list(
     return list_files
 
 
+def read_summary(file: str):
+    """
+
+    Read the featureCounts *.summary file that accompanies a featureCounts output, if present.
+
+    Parameters
+    ----------
+    file: str
+        Path to featureCounts *.txt file; the summary is expected at <file>.summary
+
+    Returns
+    -------
+    pd.Series | None
+        Read counts per assignment status, or None if no summary file exists
+
+    """
+    path_summary = f"{file}.summary"
+    if not os.path.exists(path_summary):
+        return None
+    return pd.read_csv(path_summary, sep="\t", index_col=0).iloc[:, 0]
+
+
+def read_featureCounts(
+    file: str,
+    gene_column_name: str = "Geneid",
+    keep_metadata: bool = False,
+):
+    """
+
+    Read the gene ID and count columns of a featureCounts output and its summary.
+
+    Parameters
+    ----------
+    file: str
+        Path to featureCounts *.txt file
+    gene_column_name: str
+        Column name containing gene IDs; default is "Geneid"
+    keep_metadata: bool
+        If True, also keep the Chr, Start, End, Strand, and Length columns; default is False
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, str, pd.DataFrame | None, pd.Series | None]
+        Gene IDs, counts, the sample (count column) name, gene metadata (if keep_metadata), and summary
+
+    """
+    # the count column is last in both cases, even if the file has counts for more than one BAM
+    usecols = list(range(COUNT_COLUMN + 1)) if keep_metadata else [0, COUNT_COLUMN]
+    df = pd.read_csv(file, sep="\t", comment="#", usecols=usecols)
+    return (
+        df[gene_column_name].to_numpy(),
+        df.iloc[:, -1].to_numpy(),
+        df.columns[-1],
+        df.iloc[:, :COUNT_COLUMN] if keep_metadata else None,
+        read_summary(file),
+    )
+
+
+def iter_featureCounts(
+    list_files: list[str],
+    gene_column_name: str = "Geneid",
+    workers: int = 1,
+):
+    """
+
+    Parse featureCounts files, optionally in a process pool, yielding results in input order.
+
+    Gene metadata is only kept for the first file.
+
+    Parameters
+    ----------
+    list_files: list[str]
+        List of featureCounts files to parse
+    gene_column_name: str
+        Column name containing gene IDs; default is "Geneid"
+    workers: int
+        Number of worker processes; 1 (default) parses serially
+
+    Yields
+    ------
+    tuple[np.ndarray, np.ndarray, str, pd.DataFrame | None, pd.Series | None]
+        Output of read_featureCounts for each file
+
+    """
+    list_keep_metadata = [idx == 0 for idx in range(len(list_files))]
+    if workers > 1 and len(list_files) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(list_files))) as executor:
+            yield from executor.map(read_featureCounts, list_files, repeat(gene_column_name), list_keep_metadata)
+    else:
+        for f, keep_metadata in zip(list_files, list_keep_metadata, strict=True):
+            yield read_featureCounts(f, gene_column_name, keep_metadata)
+
+
+def format_summary(
+    list_summary: list[pd.Series | None],
+    list_samples: list[str],
+):
+    """
+
+    Combine featureCounts summaries into one table with a row per sample.
+
+    Parameters
+    ----------
+    list_summary: list[pd.Series | None]
+        Summary for each sample from read_summary
+    list_samples: list[str]
+        Sample (count column) names in the same order as list_summary
+
+    Returns
+    -------
+    pd.DataFrame | None
+        Read counts per assignment status plus Total and Assigned_rate columns; None if no summaries were found
+
+    """
+    dict_summary = {
+        sample: summary for sample, summary in zip(list_samples, list_summary, strict=True) if summary is not None
+    }
+    if len(dict_summary) == 0:
+        return None
+
+    df_summary = pd.DataFrame(dict_summary).T
+    df_summary.index.name = "sample"
+    df_summary["Total"] = df_summary.sum(axis=1)
+    df_summary["Assigned_rate"] = df_summary["Assigned"] / df_summary["Total"]
+    return df_summary
+
+
+def stream_featureCounts(
+    list_files: list[str],
+    gene_column_name: str = "Geneid",
+    workers: int = 1,
+):
+    """
+
+    Assemble a count matrix column by column into a preallocated array.
+
+    The gene order of the first file is used as the index; subsequent files are
+    only reindexed if their gene order differs, which matches a left merge on
+    gene_column_name. Samples missing any gene are kept aside as float columns
+    so that missing counts are stored as NaN without upcasting the whole matrix.
+    Gene metadata and summaries are collected in the same pass.
+
+    Parameters
+    ----------
+    list_files: list[str]
+        List of featureCounts files to merge
+    gene_column_name: str
+        Column name to merge on; default is "Geneid"
+    workers: int
+        Number of worker processes used to parse files; default is 1
+
+    Returns
+    -------
+    tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame | None]
+        Count matrix with gene_column_name as the first column and one column per sample,
+        gene metadata of the first file, and merged summary (see format_summary)
+
+    """
+    list_samples = []
+    list_summary = []
+    dict_missing = {}
+    for idx, (genes, counts, sample, df_metadata, summary) in enumerate(
+        iter_featureCounts(list_files, gene_column_name, workers)
+    ):
+        list_samples.append(sample)
+        list_summary.append(summary)
+        if idx == 0:
+            genes_ref = genes
+            df_metadata_ref = df_metadata
+            mat_counts = np.zeros((len(genes_ref), len(list_files)), dtype=counts.dtype)
+        elif not np.array_equal(genes, genes_ref):
+            counts = pd.Series(counts, index=genes).reindex(genes_ref).to_numpy()
+            if counts.dtype != mat_counts.dtype:
+                dict_missing[idx] = counts
+                continue
+        mat_counts[:, idx] = counts
+
+    df_count_mat = pd.DataFrame(mat_counts, columns=list_samples, copy=False)
+    for idx, counts in dict_missing.items():
+        df_count_mat.isetitem(idx, counts)
+    df_count_mat.insert(0, gene_column_name, genes_ref)
+    return df_count_mat, df_metadata_ref, format_summary(list_summary, list_samples)
+
+
+def normalize_counts(
+    df_count_mat: pd.DataFrame,
+    lengths: np.ndarray | None,
+    method: str,
+):
+    """
+
+    Normalize a count matrix to counts per million (CPM) or transcripts per million (TPM).
+
+    Parameters
+    ----------
+    df_count_mat: pd.DataFrame
+        Count matrix with gene IDs as the first column and one column per sample
+    lengths: np.ndarray | None
+        Feature lengths aligned to the rows of df_count_mat; required for TPM
+    method: str
+        "cpm" or "tpm"
+
+    Returns
+    -------
+    pd.DataFrame
+        Normalized matrix with the same layout as df_count_mat
+
+    """
+    mat = df_count_mat.iloc[:, 1:].to_numpy(dtype=np.float64)
+    if method == "tpm":
+        mat = mat / (np.asarray(lengths, dtype=np.float64)[:, None] / 1e3)
+    elif method != "cpm":
+        raise ValueError(f"Unsupported normalization: {method}")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mat = mat / np.nansum(mat, axis=0) * 1e6
+
+    df_norm = pd.DataFrame(mat, columns=df_count_mat.columns[1:], copy=False)
+    df_norm.insert(0, df_count_mat.columns[0], df_count_mat.iloc[:, 0].to_numpy())
+    return df_norm
+
+
+def write_index(
+    path_prefix: str,
+    genes: np.ndarray,
+    samples: np.ndarray,
+):
+    """
+
+    Write gene and sample sidecar indices, one entry per line.
+
+    Parameters
+    ----------
+    path_prefix: str
+        Output path prefix; writes <path_prefix>.genes.txt and <path_prefix>.samples.txt
+    genes: np.ndarray
+        Gene IDs (rows of the count matrix)
+    samples: np.ndarray
+        Sample names (columns of the count matrix)
+
+    """
+    np.savetxt(f"{path_prefix}.genes.txt", genes, fmt="%s")
+    np.savetxt(f"{path_prefix}.samples.txt", samples, fmt="%s")
+
+
+def write_count_matrix(
+    df_count_mat: pd.DataFrame,
+    prefix: str,
+    list_formats: list[str] | None = None,
+    suffix: str = "featureCounts",
+):
+    """
+
+    Write the merged count matrix in one or more formats.
+
+    Parameters
+    ----------
+    df_count_mat: pd.DataFrame
+        Count matrix with gene IDs as the first column and one column per sample
+    prefix: str
+        Prefix for the output files
+    list_formats: list[str] | None
+        Formats to write from LIST_FORMATS; default is ["csv"]
+
+        - csv: <prefix>_<suffix>.csv
+        - parquet: <prefix>_<suffix>.parquet (requires pyarrow or fastparquet)
+        - npz: <prefix>_<suffix>.npz with "counts", "genes", and "samples" arrays
+        - npy: <prefix>_<suffix>.npy, memory-mappable with np.load(..., mmap_mode="r"), plus sidecar indices
+        - csr: <prefix>_<suffix>.csr.npz sparse matrix (requires scipy), plus sidecar indices
+    suffix: str
+        Suffix for the output files; default is "featureCounts"
+
+    """
+    if list_formats is None:
+        list_formats = ["csv"]
+
+    path_prefix = os.path.join(os.getcwd(), f"{prefix}_{suffix}")
+
+    if "csv" in list_formats:
+        df_count_mat.to_csv(f"{path_prefix}.csv", index=False)
+    if "parquet" in list_formats:
+        df_count_mat.to_parquet(f"{path_prefix}.parquet", index=False)
+
+    list_binary = [fmt for fmt in list_formats if fmt in ["npz", "npy", "csr"]]
+    if len(list_binary) == 0:
+        return
+
+    genes = df_count_mat.iloc[:, 0].to_numpy(dtype=str)
+    samples = df_count_mat.columns[1:].to_numpy(dtype=str)
+    mat_counts = df_count_mat.iloc[:, 1:].to_numpy()
+
+    if "npz" in list_binary:
+        np.savez_compressed(f"{path_prefix}.npz", counts=mat_counts, genes=genes, samples=samples)
+    if "npy" in list_binary:
+        np.save(f"{path_prefix}.npy", mat_counts)
+    if "csr" in list_binary:
+        from scipy import sparse
+
+        sparse.save_npz(f"{path_prefix}.csr.npz", sparse.csr_matrix(mat_counts))
+    if "npy" in list_binary or "csr" in list_binary:
+        write_index(path_prefix, genes, samples)
+
+
+def get_output_prefix(path_matrix: str) -> str:
+    """Get the path prefix shared by a merged count matrix and its outputs (e.g., <prefix>_featureCounts)."""
+    return os.path.splitext(path_matrix.removesuffix(".csr.npz"))[0]
+
+
+def get_matrix_format(path_matrix: str) -> str:
+    """Get the format in LIST_FORMATS of a merged count matrix from its extension."""
+    if path_matrix.endswith(".csr.npz"):
+        return "csr"
+    fmt = os.path.splitext(path_matrix)[1].removeprefix(".")
+    if fmt not in LIST_FORMATS:
+        raise ValueError(f"Unsupported count matrix extension: {path_matrix}")
+    return fmt
+
+
+def read_matrix_samples(
+    path_prefix: str,
+    fmt: str,
+) -> list[str]:
+    """
+
+    Read the sample names of a merged count matrix without reading its counts.
+
+    Parameters
+    ----------
+    path_prefix: str
+        Path prefix of the count matrix (see get_output_prefix)
+    fmt: str
+        Format of the count matrix from LIST_FORMATS
+
+    Returns
+    -------
+    list[str]
+        Sample names
+
+    Raises
+    ------
+    ValueError
+        If an npy or csr matrix does not have as many columns as the sidecar sample index
+
+    """
+    path = f"{path_prefix}{DICT_FORMAT_FILES[fmt][0]}"
+    if fmt == "csv":
+        return pd.read_csv(path, nrows=0).columns[1:].tolist()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(path).names[1:]
+    if fmt == "npz":
+        with np.load(path) as npz:
+            return npz["samples"].tolist()
+
+    with open(f"{path_prefix}.samples.txt") as f:
+        samples = f.read().splitlines()
+    # npy and csr share the sidecar indices, so either may be left over from a run that wrote only the other
+    if fmt == "npy":
+        n_samples = np.load(path, mmap_mode="r").shape[1]
+    else:
+        with np.load(path) as npz:
+            n_samples = npz["shape"][1]
+    if n_samples != len(samples):
+        raise ValueError(f"{path} has {n_samples} samples but {path_prefix}.samples.txt lists {len(samples)}")
+    return samples
+
+
+def check_manifest_samples(
+    samples: list[str],
+    list_manifest: list[str],
+    path_matrix: str,
+):
+    """Raise ValueError if the samples of a merged count matrix differ from those recorded in its manifest."""
+    set_samples, set_manifest = set(samples), set(list_manifest)
+    if set_samples != set_manifest:
+        raise ValueError(
+            f"Samples of {path_matrix} do not match its manifest; "
+            f"missing: {sorted(set_manifest - set_samples)}, unexpected: {sorted(set_samples - set_manifest)}"
+        )
+
+
+def write_manifest(
+    dict_manifest: dict,
+    prefix: str,
+):
+    """Write the manifest of merged featureCounts files to <prefix>_featureCounts.manifest.json."""
+    with open(os.path.join(os.getcwd(), f"{prefix}_featureCounts.manifest.json"), "w") as f:
+        json.dump(dict_manifest, f, indent=2)
+
+
+def get_file_record(file: str) -> dict:
+    """
+
+    Get the size, modification time, and MD5 hash of a featureCounts file for the manifest.
+
+    Parameters
+    ----------
+    file: str
+        Path to featureCounts *.txt file
+
+    Returns
+    -------
+    dict
+        Dictionary with file, size, mtime, and md5 keys
+
+    """
+    stat = os.stat(file)
+    md5 = hashlib.md5()
+    with open(file, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            md5.update(chunk)
+    return {
+        "file": os.path.realpath(file),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "md5": md5.hexdigest(),
+    }
+
+
+def filter_seen_files(
+    list_files: list[str],
+    dict_manifest: dict,
+):
+    """
+
+    Remove featureCounts files already recorded in a manifest.
+
+    A file is considered seen if its resolved path, size, and mtime match a manifest record
+    (which avoids hashing it) or if its MD5 hash matches a manifest record. Paths are resolved
+    with os.path.realpath because Nextflow stages inputs as symlinks in a new work directory.
+
+    Parameters
+    ----------
+    list_files: list[str]
+        List of featureCounts files to merge
+    dict_manifest: dict
+        Manifest of {sample: record} from previous merges
+
+    Returns
+    -------
+    tuple[list[str], list[dict]]
+        Unseen files and their manifest records
+
+    """
+    set_stat = {(v["file"], v["size"], v["mtime"]) for v in dict_manifest.values()}
+    set_md5 = {v["md5"] for v in dict_manifest.values()}
+
+    list_new, list_records = [], []
+    for f in list_files:
+        stat = os.stat(f)
+        if (os.path.realpath(f), stat.st_size, stat.st_mtime) in set_stat:
+            continue
+        record = get_file_record(f)
+        if record["md5"] in set_md5:
+            continue
+        list_new.append(f)
+        list_records.append(record)
+    return list_new, list_records
+
+
+def read_count_matrix(
+    path_matrix: str,
+    gene_column_name: str = "Geneid",
+):
+    """
+
+    Read a merged count matrix written by write_count_matrix in the format given by its extension.
+
+    Parameters
+    ----------
+    path_matrix: str
+        Path to <prefix>_featureCounts.csv, .parquet, .npy (with sidecar indices), .npz, or .csr.npz
+    gene_column_name: str
+        Column name containing gene IDs; default is "Geneid"
+
+    Returns
+    -------
+    pd.DataFrame
+        Count matrix with gene_column_name as the first column and one column per sample
+
+    """
+    from nf_rnaseq.load import load_count_matrix
+
+    fmt = get_matrix_format(path_matrix)
+    if fmt == "csv":
+        return pd.read_csv(path_matrix, dtype={gene_column_name: str})
+    if fmt == "parquet":
+        return pd.read_parquet(path_matrix)
+
+    mat_counts, genes, samples = load_count_matrix(get_output_prefix(path_matrix), fmt=fmt)
+
+    if hasattr(mat_counts, "toarray"):
+        mat_counts = mat_counts.toarray()
+    df_count_mat = pd.DataFrame(np.asarray(mat_counts), columns=samples, copy=False)
+    df_count_mat.insert(0, gene_column_name, genes)
+    return df_count_mat
+
+
+def copy_count_matrix(
+    path_existing: str,
+    prefix: str,
+    dict_manifest: dict,
+    list_formats: list[str] | None = None,
+    list_normalize: list[str] | None = None,
+) -> bool:
+    """
+
+    Copy the outputs of an existing merge byte for byte instead of reading and rewriting them.
+
+    Parameters
+    ----------
+    path_existing: str
+        Path prefix of the existing outputs (see get_output_prefix)
+    prefix: str
+        Prefix for the output files
+    dict_manifest: dict
+        Manifest of the existing outputs; if not empty, every copied matrix must have its samples
+    list_formats: list[str] | None
+        Formats to copy from LIST_FORMATS; default is ["csv"]
+    list_normalize: list[str] | None
+        Normalized matrices to copy ("cpm", "tpm"); default is None
+
+    Returns
+    -------
+    bool
+        False, without copying anything, if any requested matrix is missing from the existing outputs or, e.g.,
+        left over from an earlier run, does not have the samples of the manifest
+
+    """
+    if list_formats is None:
+        list_formats = ["csv"]
+    list_prefix = [path_existing] + [f"{path_existing}_{method}" for method in list_normalize or []]
+    list_ext = dict.fromkeys(ext for fmt in list_formats for ext in DICT_FORMAT_FILES[fmt])
+    list_src = [f"{path_prefix}{ext}" for path_prefix in list_prefix for ext in list_ext]
+    if not all(os.path.exists(f) for f in list_src):
+        return False
+    if len(dict_manifest) > 0:
+        try:
+            for path_prefix in list_prefix:
+                for fmt in list_formats:
+                    path_matrix = f"{path_prefix}{DICT_FORMAT_FILES[fmt][0]}"
+                    check_manifest_samples(read_matrix_samples(path_prefix, fmt), list(dict_manifest), path_matrix)
+        except ValueError as e:
+            logger.warning(f"Not copying existing outputs: {e}")
+            return False
+    list_src += [f"{path_existing}_{name}.csv" for name in ["metadata", "summary"]]
+
+    path_prefix = os.path.join(os.getcwd(), f"{prefix}_featureCounts")
+    for src in list_src:
+        dst = f"{path_prefix}{src.removeprefix(path_existing)}"
+        if os.path.exists(src) and not (os.path.exists(dst) and os.path.samefile(src, dst)):
+            shutil.copyfile(src, dst)
+    return True
+
+
+def append_count_matrix(
+    df_existing: pd.DataFrame,
+    df_new: pd.DataFrame,
+    gene_column_name: str = "Geneid",
+):
+    """
+
+    Append new sample columns to an existing count matrix with the same gene index.
+
+    Parameters
+    ----------
+    df_existing: pd.DataFrame
+        Existing count matrix with gene_column_name as the first column
+    df_new: pd.DataFrame
+        Count matrix of new samples with gene_column_name as the first column
+    gene_column_name: str
+        Column name containing gene IDs; default is "Geneid"
+
+    Returns
+    -------
+    pd.DataFrame
+        Existing count matrix with new sample columns appended
+
+    """
+    genes_existing = df_existing[gene_column_name].to_numpy()
+    genes_new = df_new[gene_column_name].to_numpy()
+    if not np.array_equal(genes_existing, genes_new):
+        if set(genes_existing) != set(genes_new):
+            raise ValueError(f"{gene_column_name} of new featureCounts files does not match the existing count matrix")
+        df_new = df_new.set_index(gene_column_name).reindex(genes_existing).reset_index()
+
+    list_dup = [col for col in df_new.columns[1:] if col in df_existing.columns]
+    if len(list_dup) > 0:
+        logger.info(f"Skipping samples already in existing count matrix: {', '.join(list_dup)}")
+        df_new = df_new.drop(columns=list_dup)
+
+    return pd.concat([df_existing, df_new.iloc[:, 1:]], axis=1)
+
+
 # https://github.com/reneshbedre/bioinfokit/blob/master/bioinfokit/analys.py
 def merge_featureCounts(
     list_files: list[str],
     prefix: str,
     gene_column_name: str = "Geneid",
+    mode: str = "stream",
+    workers: int = 1,
+    list_formats: list[str] | None = None,
+    existing: str | None = None,
+    list_normalize: list[str] | None = None,
 ):
     """
 
-    Merge multiple featureCounts outputs into a single CSV.
+    Merge multiple featureCounts outputs into a single count matrix.
+
+    Alongside the matrix, the same pass writes the gene metadata of the first file
+    (<prefix>_featureCounts_metadata.csv), the merged *.summary files if present
+    (<prefix>_featureCounts_summary.csv), and a manifest of the merged files
+    (<prefix>_featureCounts.manifest.json). If existing is provided, files recorded
+    in its manifest are skipped and only new samples are parsed and appended; if there
+    are none, its outputs are copied as is (see copy_count_matrix).
 
     Parameters
     ----------
@@ -79,25 +753,103 @@ def merge_featureCounts(
         Prefix for the output file
     gene_column_name: str
         Column name to merge on; default is "Geneid"
+    mode: str
+        "stream" to fill a preallocated matrix (default) or "merge" for chained pd.merge
+    workers: int
+        Number of worker processes used to parse files in "stream" mode; default is 1
+    list_formats: list[str] | None
+        Output formats passed to write_count_matrix; default is ["csv"]
+    existing: str | None
+        Existing merged count matrix to append to; default is None
+    list_normalize: list[str] | None
+        Normalized matrices to also write ("cpm", "tpm") as <prefix>_featureCounts_<method>; default is None
 
     """
-    iter = 0
-    for f in list_files:
-        df = pd.read_csv(f, sep="\t", comment="#")
-        if iter == 0:
-            df_count_mat = df.iloc[:, [0, 6]]
-            iter += 1
-        elif iter > 0:
-            df_temp = df.iloc[:, [0, 6]]
-            df_count_mat = pd.merge(df_count_mat, df_temp, how="left", on=gene_column_name)
-    df_count_mat.to_csv(os.path.join(os.getcwd(), f"{prefix}_featureCounts.csv"), index=False)
+    df_metadata, df_summary = None, None
+    dict_manifest = {}
+    if existing is not None:
+        path_existing = get_output_prefix(existing)
+        if os.path.exists(f"{path_existing}.manifest.json"):
+            with open(f"{path_existing}.manifest.json") as f:
+                dict_manifest = json.load(f)
+        list_samples_existing = list(dict_manifest)
+        list_files, list_records = filter_seen_files(list_files, dict_manifest)
+        if len(list_files) == 0:
+            logger.info(f"No new featureCounts files to append to {existing}")
+            if copy_count_matrix(path_existing, prefix, dict_manifest, list_formats, list_normalize):
+                write_manifest(dict_manifest, prefix)
+                return
+    else:
+        list_records = [get_file_record(f) for f in list_files]
+
+    if len(list_files) > 0:
+        if mode == "stream":
+            df_count_mat, df_metadata, df_summary = stream_featureCounts(list_files, gene_column_name, workers)
+        else:
+            iter = 0
+            list_summary = []
+            for f in list_files:
+                df = pd.read_csv(f, sep="\t", comment="#")
+                list_summary.append(read_summary(f))
+                if iter == 0:
+                    df_count_mat = df.iloc[:, [0, COUNT_COLUMN]]
+                    df_metadata = df.iloc[:, :COUNT_COLUMN]
+                    iter += 1
+                elif iter > 0:
+                    df_temp = df.iloc[:, [0, COUNT_COLUMN]]
+                    df_count_mat = pd.merge(df_count_mat, df_temp, how="left", on=gene_column_name)
+            df_summary = format_summary(list_summary, df_count_mat.columns[1:].tolist())
+        dict_manifest.update(dict(zip(df_count_mat.columns[1:], list_records, strict=True)))
+
+    if existing is not None:
+        df_existing = read_count_matrix(existing, gene_column_name)
+        if len(list_samples_existing) > 0:
+            check_manifest_samples(df_existing.columns[1:], list_samples_existing, existing)
+        if len(list_files) > 0:
+            df_count_mat = append_count_matrix(df_existing, df_count_mat, gene_column_name)
+        else:
+            df_count_mat = df_existing
+        if df_metadata is None and os.path.exists(f"{path_existing}_metadata.csv"):
+            df_metadata = pd.read_csv(f"{path_existing}_metadata.csv")
+        if os.path.exists(f"{path_existing}_summary.csv"):
+            df_summary_existing = pd.read_csv(f"{path_existing}_summary.csv", index_col=0)
+            if df_summary is not None:
+                df_summary = df_summary.loc[~df_summary.index.isin(df_summary_existing.index)]
+            df_summary = pd.concat([df_summary_existing, df_summary], axis=0)
+
+    path_prefix = os.path.join(os.getcwd(), f"{prefix}_featureCounts")
+    write_count_matrix(df_count_mat, prefix, list_formats)
+    if df_metadata is not None:
+        df_metadata.to_csv(f"{path_prefix}_metadata.csv", index=False)
+    if df_summary is not None:
+        df_summary.to_csv(f"{path_prefix}_summary.csv")
+
+    for method in list_normalize or []:
+        if method == "tpm" and df_metadata is None:
+            raise ValueError("TPM requires gene lengths from the featureCounts metadata")
+        lengths = None
+        if df_metadata is not None:
+            lengths = df_metadata.set_index(gene_column_name)["Length"].reindex(df_count_mat[gene_column_name])
+        df_norm = normalize_counts(df_count_mat, lengths, method)
+        write_count_matrix(df_norm, prefix, list_formats, suffix=f"featureCounts_{method}")
+
+    write_manifest(dict_manifest, prefix)
 
 
 def main():
     """Main function to merge featureCounts files."""
+    logging.basicConfig(format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO)
     arguments = parsearg_utils()
     file_list = convert_files2list(arguments.featureCounts)
-    merge_featureCounts(file_list, arguments.prefixFile)
+    merge_featureCounts(
+        file_list,
+        arguments.prefixFile,
+        mode=arguments.mode,
+        workers=arguments.workers,
+        list_formats=arguments.outputFormat,
+        existing=arguments.existing,
+        list_normalize=arguments.normalize,
+    )
 
 
 if __name__ == "__main__":
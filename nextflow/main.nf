@@ -30,6 +30,25 @@ params.fastp_json = "${params.outDir}/${params.dirFastp}/*fastp.json"
 params.fastqc_fastq = "${params.outDir}/${params.dirFastQC}/fastq/*/*"
 params.fastqc_fastp = "${params.outDir}/${params.dirFastQC}/fastp/*/*"
 
+// additional merged count matrix formats (parquet, npz, npy, csr); csv is always written
+params.countFormats = ""
+
+// existing merged count matrix to append new featureCounts samples to
+params.existingCounts = ""
+
+// normalized matrices to write alongside the merged counts (cpm, tpm)
+params.normalizeCounts = ""
+
+// transcripts mapping to more than one gene when collapsing counts to genes (split, first, all, drop)
+params.aggregateRule = "split"
+
+// number of concurrent API requests per QUERY_API_BATCH task
+params.apiWorkers = 4
+
+// database for ENST IDs; "BioMartPOST" sends the query in a POST body, "BioMartTranscript" ignores versions,
+// and "LocalGTF" maps every Ensembl ID (ENST and ENSG) offline from params.fileGTF
+params.transcriptDatabase = "BioMart"
+
 // bam
 params.bam = "${params.outDir}/${params.dirAlignment}/*.Aligned.sortedByCoord.out.bam"
 params.bam_log = "${params.outDir}/${params.dirAlignment}/*.Log.final.out"
@@ -75,9 +94,10 @@ include { RUN_MULTIQC as RUN_MULTIQC_FC    } from './modules/multiqc/main.nf'
 include { MERGE_FEATURECOUNTS              } from './modules/subread/featurecounts/main.nf' addParams(OUTPUT: "${params.outDir}/featurecounts")
 
 // add annotation
-include { QUERY_API as QUERY_BIOMART       } from './modules/api_clients/main.nf'
-include { QUERY_API as QUERY_UNIPROT       } from './modules/api_clients/main.nf'
-include { CONCAT_TSV                       } from './modules/api_clients/main.nf'           addParams(OUTPUT: "${params.outDir}/featurecounts")
+include { ROUTE_IDS                        } from './modules/api_clients/main.nf'
+include { QUERY_API_BATCH                  } from './modules/api_clients/main.nf'
+include { ANNOTATE_COUNTS                  } from './modules/api_clients/main.nf'           addParams(OUTPUT: "${params.outDir}/featurecounts")
+include { AGGREGATE_FEATURECOUNTS          } from './modules/subread/featurecounts/main.nf' addParams(OUTPUT: "${params.outDir}/featurecounts")
 
 /*
 ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -200,41 +220,49 @@ workflow FEATURECOUNTS_BAM {
     MERGE_FEATURECOUNTS (
         params.filePrefix,
         SUBREAD_FEATURECOUNTS.out.counts
+            .map { it -> it[1] }
+            .collect(),
+        SUBREAD_FEATURECOUNTS.out.summary
             .map { it -> it[1] }
             .collect()
     )
 }
 
 workflow ANNOTATE_CSV {
-    Channel
-        .fromPath (
-            "${params.outDir}/featurecounts/${params.filePrefix}_featureCounts.csv",
-            checkIfExists: true
-        )
-        .splitCsv( header: true )
-        .map { row -> row.Geneid }
-        .set { ch_featurecounts }
-
-    // if start with ENST, then use Ensembl BioMart to extract gene names; 500 IDs per request
-    ch_featurecounts
-        .filter(~/^ENST.*/)
-        .collate(350) // reduced from 500 to try to resolve 414 Request-URI Too Large Error
-        .set { ch_biomart }
-
-    // if does not start with ENST, then use UniProt to extract gene names
-    ch_featurecounts
-        .filter(~/^((?!ENST).)*$/)
-        .collate(5000) // 10,000: Total number of "mapped to" ids allowed with filtering; decreased to allow for multi-mapping
-        .set { ch_uniprot }
-
-    QUERY_BIOMART( ch_biomart, "BioMart" )
-    QUERY_UNIPROT( ch_uniprot, "UniProtBULK" )
-
-    CONCAT_TSV (
-        QUERY_BIOMART.out.geneTSV.concat(
-            QUERY_UNIPROT.out.geneTSV
+    // classify IDs by pattern (ENST, ENSG, RefSeq, UniProt, gene symbol) and write one ID file per database
+    // that can resolve them (see nf_rnaseq.router); versioned ENST IDs go to params.transcriptDatabase
+    counts_csv = file( "${params.outDir}/featurecounts/${params.filePrefix}_featureCounts.csv", checkIfExists: true )
+    // the gene metadata written by MERGE_FEATURECOUNTS has the same Geneid column without the sample columns
+    metadata_csv = file( "${params.outDir}/featurecounts/${params.filePrefix}_featureCounts_metadata.csv" )
+
+    ROUTE_IDS ( metadata_csv.exists() ? metadata_csv : counts_csv, params.transcriptDatabase )
+
+    // get_gene_name packs the IDs into batches and queries them concurrently (see nf_rnaseq.batching)
+    ROUTE_IDS.out.idFiles
+        .flatten()
+        .map { idFile -> [ idFile, idFile.name.replace("_ids.txt", "") ] }
+        .set { ch_routed }
+
+    QUERY_API_BATCH( ch_routed )
+
+    // join the JSONL gene names onto the merged matrix as <filePrefix>_featureCounts_annotated.csv
+    ANNOTATE_COUNTS (
+        counts_csv,
+        QUERY_API_BATCH.out.geneNames.concat(
+            ROUTE_IDS.out.unclassified
         ).collect()
     )
+
+    // collapse transcript counts to gene names with one sparse matrix product as <filePrefix>_featureCounts_gene
+    AGGREGATE_FEATURECOUNTS (
+        params.filePrefix,
+        counts_csv,
+        ANNOTATE_COUNTS.out.geneNames
+    )
+
+    // one JSON line of request timings, retries, and cache hits per task (see nf_rnaseq.metrics)
+    QUERY_API_BATCH.out.metrics
+        .collectFile( name: "api_metrics.jsonl", storeDir: "${params.outDir}/featurecounts" )
 }
 
 workflow.onComplete {
@@ -1,37 +1,71 @@
-process QUERY_API {
+process ROUTE_IDS {
+    label 'process_low'
+
+    conda "${params.condaEnv}"
+
+    input:
+    path(countsCSV)
+    val(transcriptDatabase)
+
+    output:
+    path("*_ids.txt"), optional: true, emit: idFiles
+    path("unclassified.jsonl"), emit: unclassified
+
+    script:
+    """
+    route_ids \\
+        -i ${countsCSV} \\
+        -t ${transcriptDatabase}
+    """
+}
+
+process QUERY_API_BATCH {
+    label 'process_low'
+
     conda "${params.condaEnv}"
 
     input:
-    val(inputIds)
-    val(database)
+    tuple path(idFile), val(database)
 
     output:
-    path("*.tsv"), emit: geneTSV
+    path("${database}.jsonl"), emit: geneNames
+    path("*.metrics.json"), emit: metrics
 
     script:
-    def uuid = UUID.randomUUID().toString()
+    def gtf = database.startsWith("LocalGTF") ? "-g ${params.fileGTF}" : ""
+    def stream = database == "UniProtBULK" ? "-s" : ""
     """
     get_gene_name \\
-        -i "${inputIds}" \\
+        -f ${idFile} \\
+        ${gtf} \\
         -d ${database} \\
         -c "${params.outDir}/requests_cache" \\
-        -t \\
-        > ${uuid}.tsv
+        -l "${params.outDir}/lookup_store.sqlite" \\
+        -w ${params.apiWorkers} \\
+        ${stream} \\
+        -m ${database}.metrics.json \\
+        -j \\
+        > ${database}.jsonl
     """
 }
 
-process CONCAT_TSV {
+process ANNOTATE_COUNTS {
+    label 'process_low'
+
     conda "${params.condaEnv}"
     publishDir "${params.OUTPUT}", mode: 'copy', overwrite: true
 
     input:
-    path(tsvFiles)
+    path(countsCSV)
+    path(geneNames)
 
     output:
-    path("gene_name_concat.tsv")
+    path("${countsCSV.baseName}_annotated.csv"), emit: annotated
+    path("gene_names.jsonl"), emit: geneNames
 
     script:
     """
-    echo -e "original_id\tgene_name\tsource" > gene_name_concat.tsv && grep -h . ${tsvFiles} >> gene_name_concat.tsv
+    cat ${geneNames} > gene_names.jsonl
+    annotate_featureCounts.py -c ${countsCSV} -a gene_names.jsonl -o ${countsCSV.baseName}_annotated.csv
     """
 }
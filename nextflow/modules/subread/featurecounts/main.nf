@@ -37,18 +37,48 @@ process SUBREAD_FEATURECOUNTS {
 }
 
 process MERGE_FEATURECOUNTS {
+    label 'process_medium'
+
     conda "${params.condaEnv}"
     publishDir "${params.OUTPUT}", mode: 'copy', overwrite: true
 
     input:
     val(filePrefix)
     path(featureCounts)
+    path(summaries)
+
+    output:
+    path("${filePrefix}_featureCounts.csv")                                                , emit: counts
+    path("${filePrefix}_featureCounts.{parquet,npz,npy,csr.npz,genes.txt,samples.txt}"), optional: true, emit: matrix
+    path("${filePrefix}_featureCounts.manifest.json")                                      , emit: manifest
+    path("${filePrefix}_featureCounts_metadata.csv")                                       , optional: true, emit: metadata
+    path("${filePrefix}_featureCounts_summary.csv")                                        , optional: true, emit: summary
+    path("${filePrefix}_featureCounts_{cpm,tpm}*")                                         , optional: true, emit: normalized
+
+    script:
+    def existing = params.existingCounts ? "-e ${params.existingCounts}" : ""
+    def normalize = params.normalizeCounts ? "-n ${params.normalizeCounts}" : ""
+    """
+    merge_featureCounts.py -f ${featureCounts} -p ${filePrefix} -w $task.cpus -o csv ${params.countFormats} ${existing} ${normalize}
+    """
+}
+
+process AGGREGATE_FEATURECOUNTS {
+    label 'process_low'
+
+    conda "${params.condaEnv}"
+    publishDir "${params.OUTPUT}", mode: 'copy', overwrite: true
+
+    input:
+    val(filePrefix)
+    path(countsCSV)
+    path(geneNames)
 
     output:
-    path("${filePrefix}_featureCounts.csv"), emit: counts
+    path("${filePrefix}_featureCounts_gene.{csv,parquet,npz,npy,csr.npz,genes.txt,samples.txt}"), emit: counts
 
     script:
     """
-    merge_featureCounts.py -f ${featureCounts} -p ${filePrefix}
+    aggregate_featureCounts.py -c ${countsCSV} -p ${filePrefix} -a ${geneNames} -r ${params.aggregateRule} -o csv ${params.countFormats}
     """
 }
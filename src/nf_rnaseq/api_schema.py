@@ -1,14 +1,29 @@
 import ast
 import logging
+import re
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 
 import requests
 
-from nf_rnaseq import requests_wrapper
+from nf_rnaseq import metrics, requests_wrapper
 
 logger = logging.getLogger(__name__)
 
+STATUS_BATCH_TOO_LARGE = (413, 414)
+"""tuple[int]: HTTP status codes indicating that a request carried too many identifiers."""
+RE_BATCH_LIMIT = re.compile(r"limit|maximum|exceed|too (?:many|large)", re.IGNORECASE)
+"""re.Pattern: Error message naming the identifier limit of an API (e.g., UniProt idmapping 400 or job ERROR)."""
+
+
+class BatchTooLargeError(Exception):
+    """Raised when an API rejects a request because the batch of identifiers is too large."""
+
+
+def is_batch_limit_error(message: str) -> bool:
+    """Check if an error message names the identifier limit, in which case a smaller batch may succeed."""
+    return RE_BATCH_LIMIT.search(message) is not None
+
 
 @dataclass
 class APIClient(ABC):
@@ -24,6 +39,8 @@ class APIClient(ABC):
     """str: URL base for API."""
 
     def __post_init__(self):
+        # set to False if any response fails or cannot be parsed so that its results are not stored
+        self.ok = True
         self.process_identifier()
 
     @staticmethod
@@ -34,12 +51,24 @@ class APIClient(ABC):
         except requests.exceptions.HTTPError as e:
             logging.error("Error at %s", "division", exc_info=e)
 
+    def check_batch_size(self, res: requests.Response) -> None:
+        """Raise BatchTooLargeError if a multi-identifier request was rejected as too large.
+
+        That is a status code in STATUS_BATCH_TOO_LARGE or a 400 whose message names the identifier limit; other
+        errors are not resolved by splitting the batch.
+        """
+        self.status_code = res.status_code
+        if len(self.list_identifier) <= 1:
+            return
+        if res.status_code in STATUS_BATCH_TOO_LARGE or (res.status_code == 400 and is_batch_limit_error(res.text)):
+            raise BatchTooLargeError(f"{res.status_code} for batch of {len(self.list_identifier)} identifiers")
+
     def process_identifier(self):
         """Process identifier string input to standardize, overwrite, and add as list."""
         # remove "[" and "]" added by NextFlow
         self.identifier = self.identifier.replace("[", "").replace("]", "")
-        # split on ", ", trim, and
-        self.list_identifier = [id.strip() for id in self.identifier.split(",")]
+        # split on ", ", trim, and drop duplicates
+        self.list_identifier = list(dict.fromkeys(id.strip() for id in self.identifier.split(",")))
         # join with "," to ensure no spaces
         self.identifier = ",".join(self.list_identifier)
 
@@ -61,8 +90,10 @@ class APIClientGET(APIClient):
     def __post_init__(self):
         super().__post_init__()
         self.create_query_url()
-        self.query_api()
-        self.maybe_get_gene_names()
+        with metrics.span("query_api", client=type(self).__name__):
+            self.query_api()
+        with metrics.span("parse", client=type(self).__name__):
+            self.maybe_get_gene_names()
 
     def query_api(self):
         """Get response from API which tries to save as json in instance; otherwise saves as text."""
@@ -73,7 +104,9 @@ class APIClientGET(APIClient):
         else:
             response = session.get(self.url_query, headers=ast.literal_eval(self.headers))
 
+        self.check_batch_size(response)
         self.check_response(response)
+        self.ok = self.ok and response.ok
         if self.check_if_job_ready():
             logger.info(f"\n{self.identifier}\n{self.json}\n")
         else:
@@ -105,24 +138,37 @@ class APIClientGET(APIClient):
 class APIClientPOST(APIClient):
     """Abstract class for API clients POST."""
 
+    expire_after: int = -1
+    """int: Seconds after which a cached POST response expires; -1 never expires and 0 disables caching."""
+
     def __post_init__(self):
         super().__post_init__()
         self.create_query_url()
-        self.query_api()
+        with metrics.span("query_api", client=type(self).__name__):
+            self.query_api()
         self.maybe_get_job_id()
 
     def query_api(self):
         """Get response from API which tries to save as json in instance; otherwise saves as text."""
-        response = requests.post(
+        session = requests_wrapper.get_cached_session()
+
+        # sort unique IDs so the cache key depends only on the ID set
+        response = session.post(
             self.url_query,
             data={
                 "from": self.term_in,
                 "to": self.term_out,
-                "ids": self.identifier,
+                "ids": ",".join(sorted(set(self.list_identifier))),
             },
+            expire_after=self.expire_after,
         )
 
+        # UniProt responds 400 when the number of IDs exceeds the idmapping limit
+        self.check_batch_size(response)
         self.check_response(response)
+        self.ok = self.ok and response.ok
+        # no job is submitted, e.g., for a bad from/to or a server-side failure
+        response.raise_for_status()
 
         try:
             self.json = response.json()
@@ -0,0 +1,133 @@
+import logging
+from collections.abc import Callable
+
+from nf_rnaseq import variables
+
+logger = logging.getLogger(__name__)
+
+
+def pack_by_count(
+    list_ids: list[str],
+    batch_size: int,
+) -> list[list[str]]:
+    """Split identifiers into batches of at most batch_size."""
+    return [list_ids[i : i + batch_size] for i in range(0, len(list_ids), batch_size)]
+
+
+def pack_by_url_length(
+    list_ids: list[str],
+    url_base: str,
+    term_in: str,
+    term_out: str,
+    max_url_length: int,
+) -> list[list[str]]:
+    """Greedily pack identifiers so the encoded BioMart query URL of each batch stays under max_url_length.
+
+    Parameters
+    ----------
+    list_ids : list[str]
+        List of identifiers to query
+    url_base : str
+        BioMart query template (see biomart.format_query_url)
+    term_in : str
+        Term from which to map
+    term_out : str
+        Term to which to map
+    max_url_length : int
+        Maximum length of the encoded URL
+
+    Returns
+    -------
+    list[list[str]]
+        Batches of identifiers
+
+    """
+    from requests.utils import requote_uri
+
+    from nf_rnaseq import biomart
+
+    # "," is not percent-encoded, so each additional ID adds its encoded length plus one
+    len_base = len(requote_uri(biomart.format_query_url(url_base, "", term_in, term_out)))
+
+    list_batches, list_batch, len_url = [], [], len_base
+    for id_in in list_ids:
+        len_id = len(requote_uri(id_in)) + (1 if list_batch else 0)
+        if list_batch and len_url + len_id > max_url_length:
+            list_batches.append(list_batch)
+            list_batch, len_url = [], len_base
+            len_id -= 1
+        list_batch.append(id_in)
+        len_url += len_id
+    if list_batch:
+        list_batches.append(list_batch)
+    return list_batches
+
+
+def pack_batches(
+    database: str,
+    list_ids: list[str],
+    batch_size: int | None = None,
+) -> list[list[str]]:
+    """Split identifiers into as few batches as the database allows.
+
+    Databases in variables.DICT_MAX_URL_LENGTH are packed by the encoded length of the GET query URL;
+    all others (or any database if batch_size is provided) are packed by variables.DICT_BATCH_SIZE.
+
+    Parameters
+    ----------
+    database : str
+        Database key in variables.DICT_DATABASES
+    list_ids : list[str]
+        List of identifiers to query
+    batch_size : int | None
+        Fixed number of identifiers per batch, overriding the database defaults
+
+    Returns
+    -------
+    list[list[str]]
+        Batches of identifiers
+
+    """
+    if batch_size is None and database in variables.DICT_MAX_URL_LENGTH:
+        dict_get = variables.DICT_DATABASES[database]["GET"]
+        return pack_by_url_length(
+            list_ids,
+            dict_get["url_base"],
+            dict_get["term_in"],
+            dict_get["term_out"],
+            variables.DICT_MAX_URL_LENGTH[database],
+        )
+    if batch_size is None:
+        batch_size = variables.DICT_BATCH_SIZE.get(database, 1)
+    return pack_by_count(list_ids, batch_size)
+
+
+def query_with_split(
+    query_fn: Callable[[list[str]], object],
+    list_ids: list[str],
+) -> list:
+    """Query a batch, splitting it in half and retrying each half if the API rejects it as too large.
+
+    Parameters
+    ----------
+    query_fn : Callable[[list[str]], object]
+        Function that queries a list of identifiers and returns an object, e.g., an API object with a result attr
+    list_ids : list[str]
+        Batch of identifiers
+
+    Returns
+    -------
+    list
+        Results of query_fn for the batch or, if it was split, for each sub-batch in order
+
+    """
+    from nf_rnaseq.api_schema import BatchTooLargeError
+
+    try:
+        return [query_fn(list_ids)]
+    except BatchTooLargeError as e:
+        if len(list_ids) <= 1:
+            raise
+        idx = len(list_ids) // 2
+        logger.warning(f"{e}; splitting into batches of {idx} and {len(list_ids) - idx}")
+        return query_with_split(query_fn, list_ids[:idx]) + query_with_split(query_fn, list_ids[idx:])
@@ -4,55 +4,79 @@ from io import StringIO
 
 import pandas as pd
 
+from nf_rnaseq import requests_wrapper, results
 from nf_rnaseq.api_schema import APIClientGET
 
 logger = logging.getLogger(__name__)
 
+BIOMART_ERROR = "Query ERROR"
+"""str: Start of the error message BioMart returns with status 200 when a query fails."""
+
+
+def format_query_url(
+    url_base: str,
+    identifier: str,
+    term_in: str,
+    term_out: str,
+) -> str:
+    """Fill the BioMart query template with comma delimited identifiers and terms."""
+    return url_base.replace("<IDS>", identifier).replace("<TERM_IN>", term_in).replace("<TERM_OUT>", term_out)
+
 
 @dataclass
 class BioMart(APIClientGET):
     """Class to interact with Ensembl BioMart API."""
 
     def __post_init__(self):
-        self.process_identifier()
-        self.create_query_url()
-        self.query_api()
-        self.maybe_get_gene_names()
+        super().__post_init__()
 
     def create_query_url(self):
         """Create URL for BioMart API query."""
-        self.url_query = (
-            self.url_base.replace("<IDS>", self.identifier)
-            .replace("<TERM_IN>", self.term_in)
-            .replace("<TERM_OUT>", self.term_out)
-        )
+        self.url_query = format_query_url(self.url_base, self.identifier, self.term_in, self.term_out)
 
     def check_if_job_ready(self):
         """Check if the job is ready; only necessary for POST + GET otherwise return False."""
         return False
 
     def maybe_get_gene_names(self):
-        """Get dataframe of transcript IDs and gene names from transcript IDs and add as list_gene_names attr."""
+        """Get transcript IDs and gene names from the TSV response and add as result attr."""
         try:
-            df = pd.read_csv(StringIO(self.text), sep="\t", header=None)
-            df.columns = ["in", "out"]
-            df_agg = df.groupby("in", sort=False).agg(list).reset_index()
-
-            # some input IDs are not in the output dataframe, so add back as [None] to the output
-            list_missing = [i for i in self.list_identifier if i not in df_agg["in"].tolist()]
-            df_missing = pd.DataFrame(
-                {
-                    "in": list_missing,
-                    "out": [[None] for i in range(len(list_missing))],
-                }
-            )
-            df_agg = pd.concat([df_agg, df_missing], axis=0)
-
-            list_check = [i for i in self.list_identifier if i in df_agg["in"].tolist()]
-            assert len(list_check) == len(self.list_identifier)
-
-            self.list_identifier = df_agg["in"].tolist()
-            self.list_gene_names = df_agg["out"].tolist()
+            df = pd.DataFrame(columns=["in", "out"])
+            if self.text.startswith(BIOMART_ERROR):
+                # the error message would otherwise be parsed as a row
+                logger.error(f"BioMart query failed: {self.text.strip()}")
+                self.ok = False
+            elif self.text.strip() != "":
+                df = pd.read_csv(StringIO(self.text), sep="\t", header=None, names=["in", "out"])
+
+            # some input IDs are not in the output, so add back as [None] to the output
+            self.result = results.aggregate_gene_names(self.list_identifier, df["in"], df["out"], fill_missing=None)
 
         except (KeyError, AttributeError) as e:
             logging.error("Error at %s", "division", exc_info=e)
+            self.ok = False
+            self.result = results.aggregate_gene_names(self.list_identifier, [], [], fill_missing=None)
+
+
+@dataclass
+class BioMartPOST(BioMart):
+    """Class to interact with Ensembl BioMart API by sending the query XML in a POST body instead of the URL."""
+
+    def create_query_url(self):
+        """Split the BioMart query template into the martservice URL and query XML with the sorted, unique IDs."""
+        identifier = ",".join(sorted(set(self.list_identifier)))
+        self.url_query, self.xml_query = format_query_url(self.url_base, identifier, self.term_in, self.term_out).split(
+            "?query=", 1
+        )
+
+    def query_api(self):
+        """POST the query XML through the shared cached session and save the TSV response as text."""
+        session = requests_wrapper.get_cached_session()
+        # the cache key includes the body, which depends only on the ID set
+        response = session.post(self.url_query, data={"query": self.xml_query})
+
+        self.check_batch_size(response)
+        self.check_response(response)
+        self.ok = self.ok and response.ok
+        self.text = response.text
+        logger.info(f"\n{self.identifier}\n{self.text}\n")
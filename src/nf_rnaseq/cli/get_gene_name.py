@@ -1,9 +1,13 @@
 #!/usr/bin/env python
 
 import argparse
+import json
 import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
-from nf_rnaseq import config, variables
+from nf_rnaseq import batching, config, lookup_store, metrics, normalize, variables
 from nf_rnaseq.log_config import add_logging_flags, configure_logging
 
 logger = logging.getLogger(__name__)
@@ -30,11 +34,27 @@ def parsearg_utils():
         default="",
     )
 
+    parser.add_argument(
+        "-l",
+        "--lookupStore",
+        help="Path to SQLite identifier lookup store checked before querying the API (type: str, default: '')",
+        type=str,
+        default="",
+    )
+
     parser.add_argument(
         "-d",
         "--database",
-        help="Database to use including BioMart, HGNC, and UniProt (type: str, no default)",
+        help="Database to use including BioMart, HGNC, LocalGTF, and UniProt (type: str, no default)",
+        type=str,
+    )
+
+    parser.add_argument(
+        "-g",
+        "--fileGTF",
+        help="Path to GTF file used by the LocalGTF database (type: str, default: '')",
         type=str,
+        default="",
     )
 
     parser.add_argument(
@@ -44,6 +64,46 @@ def parsearg_utils():
         type=str,
     )
 
+    parser.add_argument(
+        "-f",
+        "--inputFile",
+        help="File with one identifier per line to query in batches instead of --input (type: str, default: None)",
+        type=str,
+        default=None,
+    )
+
+    parser.add_argument(
+        "-b",
+        "--batchSize",
+        help="Identifiers per request with --inputFile; by default batches are packed by URL length or variables.DICT_BATCH_SIZE (type: int)",
+        type=int,
+        default=None,
+    )
+
+    parser.add_argument(
+        "-w",
+        "--workers",
+        help="Number of batches to query concurrently with --inputFile (type: int, default: 4)",
+        type=int,
+        default=4,
+    )
+
+    parser.add_argument(
+        "-s",
+        "--stream",
+        help="With --inputFile, write results page by page as they are retrieved; only for job-based databases such as UniProtBULK",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "-m",
+        "--metricsOut",
+        "--metrics-out",
+        help="Path to write request timings, retries, bytes, and cache hits; Prometheus text if it ends in .prom, otherwise JSON (type: str, default: None)",
+        type=str,
+        default=None,
+    )
+
     parser.add_argument(
         "-t",
         "--tsv",
@@ -51,34 +111,56 @@ def parsearg_utils():
         action="store_true",
     )
 
+    parser.add_argument(
+        "-j",
+        "--jsonl",
+        help="If flag included, write one JSON object per identifier with original_id, gene_name (list), and source instead of delimited rows",
+        action="store_true",
+    )
+
     parser = add_logging_flags(parser)
 
     return parser
 
 
-def main():
-    """Get HGNC gene name from string input."""
-    configure_logging()
-    args = parsearg_utils().parse_args()
+def query_api_client(
+    database: str,
+    inputs_ids: str,
+):
+    """Query a database in variables.DICT_DATABASES and return the API object with its result.
 
-    inputs_ids = args.input.replace("[", "").replace("]", "")
+    Parameters
+    ----------
+    database : str
+        Database key in variables.DICT_DATABASES
+    inputs_ids : str
+        Identifier or comma delimited list of identifiers
 
-    if args.cachePath != "":
-        logger.info(f"Using cache at {args.cachePath}.sqlite")
-        config.set_requests_cache(args.cachePath)
+    Returns
+    -------
+    APIClientGET
+        API object with result (results.GeneNameResult) and ok attributes
 
-    logger.info(f"Querying API for {args.database}")
+    """
     DICT_DATABASES = variables.DICT_DATABASES
     try:
-        if "POST" in DICT_DATABASES[args.database]:
-            dict_post = DICT_DATABASES[args.database]["POST"]
+        if "POST" in DICT_DATABASES[database] and "GET" not in DICT_DATABASES[database]:
+            dict_post = DICT_DATABASES[database]["POST"]
+            api_obj = dict_post["api_object"](
+                identifier=inputs_ids,
+                term_in=dict_post["term_in"],
+                term_out=dict_post["term_out"],
+                url_base=dict_post["url_base"],
+            )
+        elif "POST" in DICT_DATABASES[database]:
+            dict_post = DICT_DATABASES[database]["POST"]
             post_obj = dict_post["api_object"](
                 identifier=inputs_ids,
                 term_in=dict_post["term_in"],
                 term_out=dict_post["term_out"],
                 url_base=dict_post["url_base"],
             )
-            dict_get = DICT_DATABASES[args.database]["GET"]
+            dict_get = DICT_DATABASES[database]["GET"]
             api_obj = dict_get["api_object"](
                 identifier=inputs_ids,
                 term_in=dict_get["term_in"],
@@ -88,7 +170,7 @@ def main():
                 jobId=post_obj.jobId,
             )
         else:
-            dict_get = DICT_DATABASES[args.database]["GET"]
+            dict_get = DICT_DATABASES[database]["GET"]
             api_obj = dict_get["api_object"](
                 identifier=inputs_ids,
                 term_in=dict_get["term_in"],
@@ -97,21 +179,317 @@ def main():
                 headers=dict_get["headers"],
             )
     except KeyError as e:
-        raise UserWarning(f"Database {args.database} not in DICT_DATABASES.keys()") from e
+        raise UserWarning(f"Database {database} not in DICT_DATABASES.keys()") from e
+
+    return api_obj
+
+
+def get_lookup_terms(database: str) -> tuple[str, str, str]:
+    """Get the (database, term_in, term_out) key under which results are kept in the lookup store."""
+    try:
+        dict_api = variables.DICT_DATABASES[database]
+    except KeyError as e:
+        raise UserWarning(f"Database {database} not in DICT_DATABASES.keys()") from e
+    dict_api = dict_api.get("GET", dict_api.get("POST"))
+    return database, dict_api["term_in"], dict_api["term_out"]
+
+
+def query_with_lookup_store(
+    database: str,
+    list_ids: list[str],
+    query_fn,
+) -> list:
+    """Resolve identifiers from the lookup store first if one is set in config and query the rest.
+
+    Only identifiers missing from the lookup store are passed to query_fn. Their results are written back only if
+    every response succeeded and was parsed (api_obj.ok), and response identifiers that were not queried are dropped.
+
+    Parameters
+    ----------
+    database : str
+        Database key in variables.DICT_DATABASES
+    list_ids : list[str]
+        List of identifiers to query
+    query_fn : Callable[[list[str]], list]
+        Function that queries a list of identifiers and returns a list of API objects
+
+    Returns
+    -------
+    list[results.GeneNameResult]
+        Result of each API object; a single result in the order of list_ids if a store is set
+
+    """
+    store = lookup_store.maybe_get_lookup_store()
+    if store is None:
+        return [api_obj.result for api_obj in query_fn(list_ids)]
+
+    from nf_rnaseq import results
+
+    terms = get_lookup_terms(database)
+
+    result_store = store.get(*terms, list_ids)
+    set_found = set(result_store.identifiers.tolist())
+    list_missing = [i for i in list_ids if i not in set_found]
+    logger.info(f"{len(list_ids) - len(list_missing)} of {len(list_ids)} IDs found in lookup store")
+    metrics.inc("lookup_store_ids", len(list_ids) - len(list_missing), database=database, result="hit")
+    metrics.inc("lookup_store_ids", len(list_missing), database=database, result="miss")
+
+    list_results = [result_store]
+    if len(list_missing) > 0:
+        for api_obj in query_fn(list_missing):
+            result = api_obj.result.reindex(list_missing)
+            if api_obj.ok:
+                store.put(*terms, result)
+            else:
+                logger.warning(f"Not storing results of a failed {database} query for {len(result)} IDs")
+            list_results.append(result)
+
+    return [results.GeneNameResult.concat(list_results).reindex(list_ids)]
+
+
+def query_normalized_ids(
+    database: str,
+    list_ids: list[str],
+):
+    """Query identifiers that are already normalized, resolving them from the lookup store first if one is set.
+
+    Parameters
+    ----------
+    database : str
+        Database key in variables.DICT_DATABASES
+    list_ids : list[str]
+        Unique normalized identifiers (see normalize.normalize_ids)
+
+    Returns
+    -------
+    results.GeneNameResult
+        Gene names of the normalized identifiers
+
+    """
+    return query_with_lookup_store(
+        database,
+        list_ids,
+        lambda ids: [query_api_client(database, ",".join(ids))],
+    )[0]
+
+
+def query_database(
+    database: str,
+    inputs_ids: str,
+):
+    """Query a database, resolving identifiers from the lookup store first if one is set in config.
+
+    Identifiers are normalized and de-duplicated before querying (see normalize.normalize_ids) and the results
+    are mapped back to every original identifier.
+
+    Parameters
+    ----------
+    database : str
+        Database key in variables.DICT_DATABASES
+    inputs_ids : str
+        Identifier or comma delimited list of identifiers
+
+    Returns
+    -------
+    results.GeneNameResult
+        Gene names of the original identifiers
+
+    """
+    normalized = normalize.normalize_ids(database, inputs_ids.split(","))
+    return normalized.expand(query_normalized_ids(database, normalized.list_ids))
+
+
+def query_database_batches(
+    database: str,
+    list_ids: list[str],
+    batch_size: int | None = None,
+    workers: int = 4,
+) -> list:
+    """Split identifiers into batches and query them concurrently in a bounded thread pool.
+
+    Identifiers are normalized and de-duplicated once before batching (see normalize.normalize_ids). Batches rejected
+    as too large are split in half and retried (see batching.query_with_split). Databases that submit a job and
+    then poll for results (e.g., UniProtBULK) submit every job up front and poll them concurrently (see
+    scheduler.run_jobs).
+
+    Parameters
+    ----------
+    database : str
+        Database key in variables.DICT_DATABASES
+    list_ids : list[str]
+        List of identifiers to query
+    batch_size : int | None
+        Number of identifiers per request; if None, batches are packed by batching.pack_batches
+    workers : int
+        Maximum number of concurrent requests
+
+    Returns
+    -------
+    list[results.GeneNameResult]
+        Results for the original identifiers in the same order as the batches
+
+    """
+    normalized = normalize.normalize_ids(database, list_ids)
+
+    dict_api = variables.DICT_DATABASES.get(database, {})
+    if "POST" in dict_api and "GET" in dict_api:
+        from nf_rnaseq import scheduler
+
+        list_results = query_with_lookup_store(
+            database,
+            normalized.list_ids,
+            lambda ids: scheduler.run_jobs(database, ids, batch_size, workers),
+        )
+        return [normalized.expand(result) for result in list_results]
+
+    list_batches = batching.pack_batches(database, normalized.list_ids, batch_size)
+    logger.info(f"Querying {len(normalized.list_ids)} IDs in {len(list_batches)} batches with {workers} workers")
+
+    def query_fn(batch):
+        return query_normalized_ids(database, batch)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        list_results = executor.map(lambda batch: batching.query_with_split(query_fn, batch), list_batches)
+        return [normalized.expand(result) for list_batch in list_results for result in list_batch]
+
+
+def stream_database_batches(
+    database: str,
+    list_ids: list[str],
+    batch_size: int | None = None,
+    workers: int = 4,
+):
+    """Query a job-based database (e.g., UniProtBULK) and yield results page by page as they are retrieved.
+
+    Identifiers are normalized and de-duplicated first (see normalize.normalize_ids). Identifiers found in the
+    lookup store, if one is set in config, are yielded first; each page retrieved from the API is written back
+    to the store before it is yielded.
+
+    Parameters
+    ----------
+    database : str
+        Database key in variables.DICT_DATABASES with both POST and GET entries
+    list_ids : list[str]
+        List of identifiers to query
+    batch_size : int | None
+        Number of identifiers per job; if None, batches are packed by batching.pack_batches
+    workers : int
+        Maximum number of concurrent requests
+
+    Yields
+    ------
+    results.GeneNameResult
+        Gene names of the original identifiers
+
+    """
+    normalized = normalize.normalize_ids(database, list_ids)
+    list_ids = normalized.list_ids
+
+    store = lookup_store.maybe_get_lookup_store()
+    if store is not None:
+        terms = get_lookup_terms(database)
+        result_store = store.get(*terms, list_ids)
+        logger.info(f"{len(result_store)} of {len(list_ids)} IDs found in lookup store")
+        metrics.inc("lookup_store_ids", len(result_store), database=database, result="hit")
+        metrics.inc("lookup_store_ids", len(list_ids) - len(result_store), database=database, result="miss")
+        if len(result_store) > 0:
+            yield normalized.expand(result_store)
+        set_found = set(result_store.identifiers.tolist())
+        list_ids = [i for i in list_ids if i not in set_found]
+        del result_store, set_found
+
+    if len(list_ids) == 0:
+        return
+
+    from nf_rnaseq import scheduler
+
+    for api_obj in scheduler.run_jobs(database, list_ids, batch_size, workers, stream=True):
+        for result in api_obj.iter_results():
+            if store is not None and api_obj.ok:
+                store.put(*terms, result)
+            yield normalized.expand(result)
+
+
+def format_output(
+    result,
+    database: str,
+    delim: str = ",",
+) -> str:
+    """Format input IDs and gene names of a results.GeneNameResult as delimited rows."""
+    return "".join(
+        f"{id_in.ljust(20)}{delim}{str(id_out).ljust(20)}{delim}{database}\n"
+        for id_in, id_out in zip(*result.to_lists(), strict=True)
+    )
+
+
+def get_gene_name_list(gene_names) -> list[str]:
+    """Convert the gene name(s) of an identifier to a list without missing values (None or NaN)."""
+    if not isinstance(gene_names, list | tuple):
+        gene_names = [gene_names]
+    # NaN is the only value not equal to itself
+    return [name for name in gene_names if name is not None and name == name]
+
+
+def format_jsonl(
+    result,
+    database: str,
+) -> str:
+    """Format input IDs and gene names of a results.GeneNameResult as one JSON object per line; missing names are []."""
+    return "".join(
+        json.dumps({"original_id": id_in, "gene_name": get_gene_name_list(id_out), "source": database}) + "\n"
+        for id_in, id_out in zip(*result.to_lists(), strict=True)
+    )
+
+
+def write_output(
+    args: argparse.Namespace,
+    delim: str,
+) -> None:
+    """Query the database for the identifiers in args and write rows to stdout as each batch is formatted."""
+    if args.jsonl:
+        format_fn = format_jsonl
+    else:
+        format_fn = partial(format_output, delim=delim)
+
+    if args.inputFile is not None:
+        with open(args.inputFile) as f:
+            list_ids = [line.strip() for line in f if line.strip() != ""]
+        if args.stream:
+            list_results = stream_database_batches(args.database, list_ids, args.batchSize, args.workers)
+        else:
+            list_results = query_database_batches(args.database, list_ids, args.batchSize, args.workers)
+    else:
+        list_results = [query_database(args.database, args.input)]
+
+    for result in list_results:
+        sys.stdout.write(format_fn(result, args.database))
+
+
+def main():
+    """Get HGNC gene name from string input."""
+    configure_logging()
+    args = parsearg_utils().parse_args()
+
+    if args.cachePath != "":
+        logger.info(f"Using cache at {args.cachePath}.sqlite")
+        config.set_requests_cache(args.cachePath)
+
+    if args.lookupStore != "":
+        logger.info(f"Using lookup store at {args.lookupStore}")
+        config.set_lookup_store(args.lookupStore)
+
+    if args.fileGTF != "":
+        config.set_gtf(args.fileGTF)
 
     if args.tsv:
         delim = "\t"
     else:
         delim = ","
 
-    str_out = ""
-    for id_in, id_out in zip(
-        api_obj.list_identifier,
-        api_obj.list_gene_names,
-        strict=False,
-    ):
-        str1 = f"{id_in.ljust(20)}"
-        str2 = f"{str(id_out).ljust(20)}"
-        str_out += f"{str1}{delim}{str2}{delim}{args.database}\n"
-
-    print(str_out)
+    logger.info(f"Querying API for {args.database}")
+    try:
+        with metrics.span("get_gene_name", database=args.database):
+            write_output(args, delim)
+    finally:
+        if args.metricsOut is not None:
+            metrics.METRICS.write(args.metricsOut)
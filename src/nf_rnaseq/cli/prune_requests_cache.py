@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+
+import argparse
+import logging
+
+from nf_rnaseq import requests_wrapper
+from nf_rnaseq.log_config import add_logging_flags, configure_logging
+
+logger = logging.getLogger(__name__)
+
+
+def parsearg_utils():
+    """
+
+    Argparser to prune the shared requests cache.
+
+    Returns
+    -------
+    args: argparse.Namespace
+        Namespace object containing cache path and size cap
+
+    """
+    parser = argparse.ArgumentParser(description="Parser for prune_requests_cache.py.")
+
+    parser.add_argument(
+        "-c",
+        "--cachePath",
+        help="Path to requests cache as passed to get_gene_name (type: str, no default)",
+        type=str,
+        required=True,
+    )
+
+    parser.add_argument(
+        "-s",
+        "--maxSize",
+        help="Maximum size of stored responses in MB; least recently used responses are removed first (type: float, default: 1024)",
+        type=float,
+        default=1024,
+    )
+
+    parser = add_logging_flags(parser)
+
+    return parser
+
+
+def main():
+    """Remove expired and least recently used responses from the requests cache and compact it."""
+    configure_logging()
+    args = parsearg_utils().parse_args()
+    requests_wrapper.prune_cache(args.cachePath, int(args.maxSize * 1024 * 1024))
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+
+import argparse
+import json
+import logging
+import os
+
+from nf_rnaseq import router, variables
+from nf_rnaseq.log_config import add_logging_flags, configure_logging
+
+logger = logging.getLogger(__name__)
+
+
+def parsearg_utils():
+    """
+
+    Argparser to split identifiers into one file per database that can resolve them.
+
+    Returns
+    -------
+    args: argparse.Namespace
+        Namespace object containing input file, column, and output directory
+
+    """
+    parser = argparse.ArgumentParser(description="Parser for route_ids.py.")
+
+    parser.add_argument(
+        "-i",
+        "--input",
+        help="CSV/TSV with an identifier column (e.g., merged featureCounts) or file with one identifier per line (type: str, no default)",
+        type=str,
+        required=True,
+    )
+
+    parser.add_argument(
+        "-c",
+        "--column",
+        help="Identifier column of a CSV/TSV input (type: str, default: Geneid)",
+        type=str,
+        default="Geneid",
+    )
+
+    parser.add_argument(
+        "-t",
+        "--transcriptDatabase",
+        help="Database for versioned ENST IDs, e.g. BioMartPOST, or LocalGTF for every Ensembl ID (type: str, default: BioMart)",
+        type=str,
+        default="BioMart",
+    )
+
+    parser.add_argument(
+        "-o",
+        "--outDir",
+        help="Directory to write <database>_ids.txt files and unclassified.jsonl to (type: str, default: .)",
+        type=str,
+        default=".",
+    )
+
+    parser = add_logging_flags(parser)
+
+    return parser
+
+
+def read_ids(
+    path: str,
+    column: str = "Geneid",
+) -> list[str]:
+    """Read the identifier column of a CSV/TSV, or every non-empty line of any other file."""
+    if path.endswith((".csv", ".tsv")):
+        import pandas as pd
+
+        sep = "\t" if path.endswith(".tsv") else ","
+        df = pd.read_csv(path, sep=sep, usecols=[column], dtype=str)
+        return df[column].dropna().tolist()
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip() != ""]
+
+
+def main():
+    """Write the identifiers for each database to <database>_ids.txt; unclassified IDs are written as empty results."""
+    configure_logging()
+    args = parsearg_utils().parse_args()
+
+    if args.transcriptDatabase not in variables.DICT_DATABASES:
+        raise UserWarning(f"Database {args.transcriptDatabase} not in DICT_DATABASES.keys()")
+
+    dict_override = variables.DICT_TRANSCRIPT_DATABASE_ROUTES.get(
+        args.transcriptDatabase, {"ensembl_transcript_version": args.transcriptDatabase}
+    )
+    dict_routes = router.route_ids(read_ids(args.input, args.column), dict_override)
+
+    list_unclassified = dict_routes.pop(router.UNCLASSIFIED, [])
+    for database, list_ids in dict_routes.items():
+        with open(os.path.join(args.outDir, f"{database}_ids.txt"), "w") as f:
+            f.write("".join(f"{i}\n" for i in list_ids))
+
+    # same layout as get_gene_name -j so that every input ID appears in the annotation
+    with open(os.path.join(args.outDir, "unclassified.jsonl"), "w") as f:
+        for i in list_unclassified:
+            f.write(json.dumps({"original_id": i, "gene_name": [], "source": router.UNCLASSIFIED}) + "\n")
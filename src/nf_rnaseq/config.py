@@ -2,6 +2,10 @@ import os
 
 REQUESTS_CACHE_VAR = "REQUESTS_CACHE"
 """str: Environment variable for requests cache file prefix."""
+LOOKUP_STORE_VAR = "LOOKUP_STORE"
+"""str: Environment variable for identifier lookup store SQLite file."""
+GTF_VAR = "FILE_GTF"
+"""str: Environment variable for local GTF file used by the LocalGTF database."""
 
 
 def set_requests_cache(val: str) -> None:
@@ -33,3 +37,65 @@ def maybe_get_requests_cache() -> str | None:
         return os.environ[REQUESTS_CACHE_VAR]
     except KeyError:
         return None
+
+
+def set_lookup_store(val: str) -> None:
+    """Set the identifier lookup store path in environment variables.
+
+    Parameters
+    ----------
+    val : str
+        Lookup store path
+
+    Returns
+    -------
+    None
+
+    """
+    os.environ[LOOKUP_STORE_VAR] = val
+
+
+def maybe_get_lookup_store() -> str | None:
+    """Get the identifier lookup store path from the environment.
+
+    Returns
+    -------
+    str | None
+        Lookup store path as string if exists, otherwise None
+
+    """
+    try:
+        return os.environ[LOOKUP_STORE_VAR]
+    except KeyError:
+        return None
+
+
+def set_gtf(val: str) -> None:
+    """Set the local GTF path in environment variables.
+
+    Parameters
+    ----------
+    val : str
+        GTF file path
+
+    Returns
+    -------
+    None
+
+    """
+    os.environ[GTF_VAR] = val
+
+
+def maybe_get_gtf() -> str | None:
+    """Get the local GTF path from the environment.
+
+    Returns
+    -------
+    str | None
+        GTF file path as string if exists, otherwise None
+
+    """
+    try:
+        return os.environ[GTF_VAR]
+    except KeyError:
+        return None
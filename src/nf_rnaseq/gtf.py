@@ -0,0 +1,138 @@
+import gzip
+import logging
+import os
+import re
+from dataclasses import dataclass
+from functools import cache
+
+import numpy as np
+
+from nf_rnaseq import config, results
+from nf_rnaseq.api_schema import APIClientGET
+
+logger = logging.getLogger(__name__)
+
+re_gtf_attribute = re.compile(r'(\S+) "([^"]*)"')
+
+
+def open_gtf(path: str):
+    """Open a plain or gzipped GTF file for reading text."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt")
+    return open(path)
+
+
+def get_index_path(path_gtf: str, term_in: str, term_out: str) -> str:
+    """Get the path of the on-disk index for a GTF and pair of attributes."""
+    return f"{path_gtf}.{term_in}_{term_out}.tsv"
+
+
+def build_gtf_index(
+    path_gtf: str,
+    term_in: str,
+    term_out: str,
+) -> dict[str, str]:
+    """Stream a GTF file and keep only the term_in to term_out mapping.
+
+    If the GTF has a <term_in minus "_id">_version attribute (e.g., transcript_version in Ensembl GTFs),
+    the versioned identifier is indexed as well so that IDs with and without versions resolve.
+
+    Parameters
+    ----------
+    path_gtf : str
+        Path to GTF file (optionally gzipped)
+    term_in : str
+        GTF attribute from which to map (e.g., transcript_id)
+    term_out : str
+        GTF attribute to which to map (e.g., gene_name)
+
+    Returns
+    -------
+    dict[str, str]
+        Dictionary of {term_in: term_out}
+
+    """
+    term_version = term_in.removesuffix("_id") + "_version"
+    dict_index = {}
+    with open_gtf(path_gtf) as f:
+        for line in f:
+            if line.startswith("#") or term_in not in line:
+                continue
+            dict_attr = dict(re_gtf_attribute.findall(line.rstrip("\n").split("\t")[-1]))
+            if term_in not in dict_attr or term_out not in dict_attr:
+                continue
+            dict_index[dict_attr[term_in]] = dict_attr[term_out]
+            if term_version in dict_attr:
+                dict_index[f"{dict_attr[term_in]}.{dict_attr[term_version]}"] = dict_attr[term_out]
+    return dict_index
+
+
+@cache
+def load_gtf_index(
+    path_gtf: str,
+    term_in: str,
+    term_out: str,
+) -> dict[str, str]:
+    """Load the on-disk index for a GTF, building and saving it first if missing or older than the GTF.
+
+    Parameters
+    ----------
+    path_gtf : str
+        Path to GTF file (optionally gzipped)
+    term_in : str
+        GTF attribute from which to map (e.g., transcript_id)
+    term_out : str
+        GTF attribute to which to map (e.g., gene_name)
+
+    Returns
+    -------
+    dict[str, str]
+        Dictionary of {term_in: term_out}
+
+    """
+    path_index = get_index_path(path_gtf, term_in, term_out)
+    if os.path.exists(path_index) and os.path.getmtime(path_index) >= os.path.getmtime(path_gtf):
+        with open(path_index) as f:
+            return dict(line.rstrip("\n").split("\t", 1) for line in f)
+
+    logger.info(f"Building {term_in} to {term_out} index from {path_gtf}")
+    dict_index = build_gtf_index(path_gtf, term_in, term_out)
+    try:
+        with open(f"{path_index}.tmp", "w") as f:
+            f.writelines(f"{k}\t{v}\n" for k, v in dict_index.items())
+        os.replace(f"{path_index}.tmp", path_index)
+    except OSError as e:
+        logger.warning(f"Could not save GTF index to {path_index}: {e}")
+    return dict_index
+
+
+@dataclass
+class LocalGTF(APIClientGET):
+    """Class to map identifiers locally from a GTF file instead of a remote API."""
+
+    def __post_init__(self):
+        super().__post_init__()
+
+    def create_query_url(self):
+        """Use url_base as the GTF path, falling back to the GTF set in config."""
+        self.url_query = self.url_base if self.url_base is not None else config.maybe_get_gtf()
+        if self.url_query is None:
+            raise ValueError("LocalGTF requires a GTF path in url_base or config.set_gtf")
+
+    def query_api(self):
+        """Load the GTF index instead of querying an API."""
+        self.dict_index = load_gtf_index(self.url_query, self.term_in, self.term_out)
+
+    def check_if_job_ready(self):
+        """Check if the job is ready; only necessary for POST + GET otherwise return False."""
+        return False
+
+    def maybe_get_gene_names(self):
+        """Get gene names from the GTF index and add as result attr; missing IDs are [None]."""
+        gene_names = np.empty(len(self.list_identifier), dtype=object)
+        gene_names[:] = [self.dict_index.get(i) for i in self.list_identifier]
+        self.result = results.GeneNameResult(
+            identifiers=np.asarray(self.list_identifier, dtype=object),
+            gene_names=gene_names,
+            offsets=np.arange(len(gene_names) + 1, dtype=np.int64),
+        )
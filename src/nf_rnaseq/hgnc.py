@@ -2,42 +2,49 @@ import logging
 import os
 from dataclasses import dataclass
 
+from nf_rnaseq import results
 from nf_rnaseq.api_schema import APIClientGET
 
 logger = logging.getLogger(__name__)
 
+HGNC_OR = "+OR+"
+"""str: Boolean OR between terms in an HGNC REST query."""
+
 
 @dataclass
 class HGNC(APIClientGET):
-    """Class to interact with HGNC API."""
+    """Class to interact with HGNC API; comma delimited identifiers are fetched in one OR query."""
 
     def __post_init__(self):
-        self.process_identifier()
-        self.create_query_url()
-        self.query_api()
-        self.maybe_get_gene_names()
+        super().__post_init__()
 
     def create_query_url(self):
-        """Create URL for HGNC API query."""
-        self.url_query = os.path.join(self.url_base, self.term_in, self.identifier)
+        """Create URL for HGNC API query, combining identifiers with OR so a batch is a single request."""
+        self.url_query = os.path.join(self.url_base, self.term_in, HGNC_OR.join(sorted(set(self.list_identifier))))
 
     def check_if_job_ready(self):
         """Check if the job is ready; only necessary for POST + GET otherwise return False."""
         return False
 
     def maybe_get_gene_names(self):
-        """Get list of gene names from mane_select term and add as list_gene_names attr."""
+        """Get input IDs and gene names from the response docs and add as result attr."""
         try:
-            list_genes = self.maybe_extract_list_from_hgnc_response_docs(self.term_out)
-            self.list_gene_names = list_genes
-        except (KeyError, AttributeError) as e:
+            ids_in, names_out = self.maybe_extract_list_from_hgnc_response_docs(self.term_out)
+            # some input IDs are not in the output, so add back as [None] to the output
+            self.result = results.aggregate_gene_names(self.list_identifier, ids_in, names_out, fill_missing=None)
+        except (KeyError, AttributeError, TypeError) as e:
             logging.error("Error at %s", "division", exc_info=e)
+            self.ok = False
+            self.result = results.aggregate_gene_names(self.list_identifier, [], [], fill_missing=None)
 
     def maybe_extract_list_from_hgnc_response_docs(
         self,
         str_to_extract: str,
-    ) -> list[str] | None:
-        """Extract a list of values from the response documents of an HGNC REST API request.
+    ) -> tuple[list[str], list[str]] | None:
+        """Extract values from the response documents of an HGNC REST API request, split by queried identifier.
+
+        A document matches each queried identifier listed in its term_in field (e.g., both the Ensembl and RefSeq
+        IDs of mane_select), so one response to an OR query is split back into per-input rows.
 
         Parameters
         ----------
@@ -46,15 +53,22 @@ class HGNC(APIClientGET):
 
         Returns
         -------
-        list[str]
-            List of values extracted from the response documents
+        tuple[list[str], list[str]]
+            Input identifier and extracted value of each (identifier, document) match
 
         """
         try:
+            set_ids = set(self.list_identifier)
+            list_in, list_out = [], []
             if self.json["response"]["numFound"] >= 1:
-                list_output = [doc[str_to_extract] for doc in self.json["response"]["docs"]]
-            else:
-                list_output = []
-            return list_output
+                for doc in self.json["response"]["docs"]:
+                    values_in = doc.get(self.term_in, [])
+                    if isinstance(values_in, str):
+                        values_in = [values_in]
+                    for id_in in values_in:
+                        if id_in in set_ids:
+                            list_in.append(id_in)
+                            list_out.append(doc[str_to_extract])
+            return list_in, list_out
         except (KeyError, AttributeError) as e:
             logging.error("Error at %s", "division", exc_info=e)
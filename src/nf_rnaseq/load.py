@@ -1,11 +1,184 @@
 import ast
+import os
 
 import numpy as np
+import pandas as pd
+
+LIST_GENE_NAME_COLUMNS = ["original_id", "gene_name", "source"]
+"""list[str]: Columns of get_gene_name output."""
+
+SET_MISSING = {"", "None", "nan", "NaN"}
+"""set[str]: Gene names in delimited get_gene_name output that stand for a missing name."""
 
 
 def literal_eval_list(str_in):
-    """Convert string to list using ast.literal_eval."""
+    """Convert string to list using ast.literal_eval; see load_gene_names to read whole files quickly."""
     try:
         return ast.literal_eval(str_in.strip())
     except ValueError:
         return [np.nan]
+
+
+def read_gene_names_jsonl(list_paths: str | list[str]) -> pd.DataFrame:
+    """Read structured get_gene_name output (-j/--jsonl) without evaluating Python literals.
+
+    Parameters
+    ----------
+    list_paths : str | list[str]
+        Path(s) to JSONL files with one object per identifier
+
+    Returns
+    -------
+    pd.DataFrame
+        original_id, gene_name (list of names; empty if unmapped), and source columns; one row per identifier,
+        keeping the first occurrence of identifiers present in more than one file
+
+    """
+    if isinstance(list_paths, str):
+        list_paths = [list_paths]
+    list_df = [pd.read_json(path, lines=True, dtype=False) for path in list_paths if os.path.getsize(path) > 0]
+    if len(list_df) == 0:
+        return pd.DataFrame({"original_id": [], "gene_name": [], "source": []}, dtype=object)
+    df = pd.concat(list_df, ignore_index=True)[["original_id", "gene_name", "source"]]
+    return df.drop_duplicates("original_id", ignore_index=True)
+
+
+def read_gene_names_tsv(list_paths: str | list[str]) -> pd.DataFrame:
+    """Read delimited get_gene_name -t output (e.g., gene_name_concat.tsv) with vectorized string operations.
+
+    List reprs such as "['A', 'B']" are split on ", " rather than evaluated row by row with ast.literal_eval.
+
+    Parameters
+    ----------
+    list_paths : str | list[str]
+        Path(s) to tab delimited files, with or without an original_id/gene_name/source header
+
+    Returns
+    -------
+    pd.DataFrame
+        original_id, gene_name, and source columns with one row per (identifier, gene name); unmapped identifiers
+        have one row with a NaN gene_name, and only the first file listing an identifier is kept
+
+    """
+    if isinstance(list_paths, str):
+        list_paths = [list_paths]
+    list_df = []
+    for path in list_paths:
+        if os.path.getsize(path) == 0:
+            continue
+        with open(path) as f:
+            has_header = f.readline().startswith(LIST_GENE_NAME_COLUMNS[0])
+        list_df.append(
+            pd.read_csv(
+                path,
+                sep="\t",
+                header=None,
+                names=LIST_GENE_NAME_COLUMNS,
+                skiprows=1 if has_header else 0,
+                dtype=str,
+                keep_default_na=False,
+            )
+        )
+    if len(list_df) == 0:
+        return pd.DataFrame({column: [] for column in LIST_GENE_NAME_COLUMNS}, dtype=object)
+
+    df = pd.concat(list_df, ignore_index=True)
+    for column in LIST_GENE_NAME_COLUMNS:
+        df[column] = df[column].str.strip()
+    df = df.drop_duplicates("original_id", ignore_index=True)
+
+    # "['A', 'B']" -> "A", "B"; "[None]", "nan", and "[nan]" -> NaN
+    df["gene_name"] = df["gene_name"].str.strip("[]").str.split(", ")
+    df = df.explode("gene_name", ignore_index=True)
+    df["gene_name"] = df["gene_name"].str.strip("'\"")
+    df.loc[df["gene_name"].isin(SET_MISSING), "gene_name"] = np.nan
+    return df
+
+
+def load_gene_names(list_paths: str | list[str]) -> pd.DataFrame:
+    """Load get_gene_name output as a compact exploded table of categorical columns.
+
+    The format is inferred from the extension of the first path: .jsonl or .json for get_gene_name -j (see
+    read_gene_names_jsonl), .parquet for tables written by write_gene_names, and otherwise tab delimited
+    get_gene_name -t output (see read_gene_names_tsv).
+
+    Parameters
+    ----------
+    list_paths : str | list[str]
+        Path(s) to annotation output
+
+    Returns
+    -------
+    pd.DataFrame
+        original_id, gene_name, and source as categorical columns with one row per (identifier, gene name);
+        unmapped identifiers have one row with a NaN gene_name
+
+    """
+    if isinstance(list_paths, str):
+        list_paths = [list_paths]
+
+    # explode turns the empty gene name list of an unmapped identifier into a single NaN row
+    if list_paths[0].endswith(".parquet"):
+        df = pd.concat([pd.read_parquet(path) for path in list_paths], ignore_index=True)
+    elif list_paths[0].endswith((".jsonl", ".json")):
+        df = read_gene_names_jsonl(list_paths).explode("gene_name", ignore_index=True)
+    else:
+        df = read_gene_names_tsv(list_paths)
+    return df[LIST_GENE_NAME_COLUMNS].astype({column: "category" for column in LIST_GENE_NAME_COLUMNS})
+
+
+def write_gene_names(
+    df: pd.DataFrame,
+    path: str,
+) -> None:
+    """Write an exploded gene name table from load_gene_names to Parquet (requires pyarrow or fastparquet)."""
+    df.to_parquet(path, index=False)
+
+
+DICT_BINARY_EXT = {"npy": ".npy", "npz": ".npz", "csr": ".csr.npz"}
+"""dict[str, str]: Extension of each binary count matrix format written by merge_featureCounts.py."""
+
+
+def load_count_matrix(
+    path_prefix: str,
+    mmap_mode: str | None = "r",
+    fmt: str | None = None,
+):
+    """Load a binary count matrix written by merge_featureCounts.py without parsing CSV.
+
+    Parameters
+    ----------
+    path_prefix : str
+        Path to output without extension (e.g., <outDir>/featurecounts/<prefix>_featureCounts)
+    mmap_mode : str | None
+        Memory-map mode passed to np.load for .npy output so slices can be read lazily; default is "r"
+    fmt : str | None
+        Format to load ("npy", "npz", or "csr"); if None, the first of .npy, .npz, and .csr.npz found
+
+    Returns
+    -------
+    tuple[np.ndarray | scipy.sparse.csr_matrix, np.ndarray, np.ndarray]
+        Count matrix (genes x samples), gene IDs, and sample names
+
+    """
+    list_fmt = list(DICT_BINARY_EXT) if fmt is None else [fmt]
+    fmt = next((i for i in list_fmt if os.path.exists(f"{path_prefix}{DICT_BINARY_EXT[i]}")), None)
+    if fmt == "npy":
+        mat_counts = np.load(f"{path_prefix}.npy", mmap_mode=mmap_mode)
+    elif fmt == "npz":
+        with np.load(f"{path_prefix}.npz") as npz:
+            return npz["counts"], npz["genes"], npz["samples"]
+    elif fmt == "csr":
+        from scipy import sparse
+
+        mat_counts = sparse.load_npz(f"{path_prefix}.csr.npz")
+    else:
+        list_ext = ", ".join(DICT_BINARY_EXT[i] for i in list_fmt)
+        raise FileNotFoundError(f"No {list_ext} count matrix found for {path_prefix}")
+
+    with open(f"{path_prefix}.genes.txt") as f:
+        genes = np.array(f.read().splitlines())
+    with open(f"{path_prefix}.samples.txt") as f:
+        samples = np.array(f.read().splitlines())
+
+    return mat_counts, genes, samples
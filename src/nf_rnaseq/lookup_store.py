@@ -0,0 +1,150 @@
+import json
+import logging
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from nf_rnaseq import config
+
+logger = logging.getLogger(__name__)
+
+SQLITE_MAX_VARIABLES = 900
+"""int: Maximum number of identifiers bound in a single SQLite query."""
+
+
+@dataclass
+class LookupStore:
+    """SQLite store of identifier to gene name mappings shared across runs and processes.
+
+    Only identifiers that mapped to a gene are stored; misses are queried again on the next run since they may
+    come from a transient failure or a database release that does not have them yet.
+    """
+
+    path: str
+    """str: Path to the SQLite database file."""
+
+    def __post_init__(self):
+        with self.connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS mapping (
+                    database TEXT NOT NULL,
+                    term_in TEXT NOT NULL,
+                    term_out TEXT NOT NULL,
+                    identifier TEXT NOT NULL,
+                    gene_name TEXT,
+                    PRIMARY KEY (database, term_in, term_out, identifier)
+                )
+                """
+            )
+
+    @contextmanager
+    def connect(self):
+        """Open a connection that commits on success and is closed on exit; one per call keeps threads safe."""
+        conn = sqlite3.connect(self.path, timeout=60)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(
+        self,
+        database: str,
+        term_in: str,
+        term_out: str,
+        list_identifier: list[str],
+    ):
+        """Get stored gene names for identifiers.
+
+        Parameters
+        ----------
+        database : str
+            Database key in variables.DICT_DATABASES
+        term_in : str
+            Term from which to map
+        term_out : str
+            Term to which to map
+        list_identifier : list[str]
+            Identifiers to look up
+
+        Returns
+        -------
+        results.GeneNameResult
+            Gene names of the identifiers found in the store; misses stored by earlier versions are ignored
+
+        """
+        import numpy as np
+
+        from nf_rnaseq import results
+
+        list_in, list_out = [], []
+        with self.connect() as conn:
+            for i in range(0, len(list_identifier), SQLITE_MAX_VARIABLES):
+                list_chunk = list_identifier[i : i + SQLITE_MAX_VARIABLES]
+                cursor = conn.execute(
+                    f"""
+                    SELECT identifier, gene_name FROM mapping
+                    WHERE database = ? AND term_in = ? AND term_out = ?
+                    AND identifier IN ({",".join("?" * len(list_chunk))})
+                    """,
+                    [database, term_in, term_out, *list_chunk],
+                )
+                for id_in, id_out in cursor:
+                    list_in.append(id_in)
+                    list_out.append(json.loads(id_out))
+        result = results.GeneNameResult.from_lists(list_in, list_out)
+        return result.take(np.flatnonzero(result.has_gene_name()))
+
+    def put(
+        self,
+        database: str,
+        term_in: str,
+        term_out: str,
+        result,
+    ) -> None:
+        """Store gene names for identifiers that mapped to at least one gene, replacing any existing entries.
+
+        Parameters
+        ----------
+        database : str
+            Database key in variables.DICT_DATABASES
+        term_in : str
+            Term from which to map
+        term_out : str
+            Term to which to map
+        result : results.GeneNameResult
+            Gene names of the queried identifiers as returned by the API client
+
+        Returns
+        -------
+        None
+
+        """
+        import numpy as np
+
+        list_identifier, list_gene_names = result.take(np.flatnonzero(result.has_gene_name())).to_lists()
+        with self.connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO mapping VALUES (?, ?, ?, ?, ?)",
+                [
+                    (database, term_in, term_out, id_in, json.dumps(id_out))
+                    for id_in, id_out in zip(list_identifier, list_gene_names, strict=True)
+                ],
+            )
+
+
+def maybe_get_lookup_store() -> LookupStore | None:
+    """Get the lookup store set in config, if any.
+
+    Returns
+    -------
+    LookupStore | None
+        Lookup store if a path is set in config, otherwise None
+
+    """
+    path = config.maybe_get_lookup_store()
+    if path is None:
+        return None
+    return LookupStore(path)
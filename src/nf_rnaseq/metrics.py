@@ -0,0 +1,205 @@
+import json
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_PREFIX = "nf_rnaseq"
+"""str: Prefix of metric names in Prometheus text output."""
+
+
+@dataclass
+class Metrics:
+    """Thread-safe registry of counters and timing spans, keyed by metric name and labels.
+
+    Counters and span totals are additive, so files written by separate processes (e.g., one per Nextflow task)
+    can be aggregated by summing values with the same name and labels.
+    """
+
+    counters: dict = field(default_factory=dict)
+    """dict[tuple[str, tuple], float]: Counter values keyed by (name, sorted label items)."""
+    spans: dict = field(default_factory=dict)
+    """dict[tuple[str, tuple], list[float]]: [count, total seconds, max seconds] keyed by (name, sorted label items)."""
+
+    def __post_init__(self):
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_key(name: str, labels: dict) -> tuple[str, tuple]:
+        """Get the registry key for a metric name and labels."""
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Increment a counter.
+
+        Parameters
+        ----------
+        name : str
+            Metric name
+        value : float
+            Amount to add; default is 1
+        **labels
+            Label names and values
+
+        """
+        key = self.get_key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """Record the duration of one occurrence of a span.
+
+        Parameters
+        ----------
+        name : str
+            Span name
+        seconds : float
+            Duration in seconds
+        **labels
+            Label names and values
+
+        """
+        key = self.get_key(name, labels)
+        with self.lock:
+            list_span = self.spans.setdefault(key, [0, 0.0, 0.0])
+            list_span[0] += 1
+            list_span[1] += seconds
+            list_span[2] = max(list_span[2], seconds)
+
+    @contextmanager
+    def span(self, name: str, **labels):
+        """Time the enclosed block, including blocks that raise.
+
+        Parameters
+        ----------
+        name : str
+            Span name
+        **labels
+            Label names and values
+
+        """
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0, **labels)
+
+    def reset(self) -> None:
+        """Remove all recorded metrics."""
+        with self.lock:
+            self.counters.clear()
+            self.spans.clear()
+
+    def to_dict(self) -> dict:
+        """Convert to a JSON-serializable dictionary of counters and spans."""
+        with self.lock:
+            return {
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self.counters.items())
+                ],
+                "spans": [
+                    {"name": name, "labels": dict(labels), "count": count, "sum_seconds": total, "max_seconds": max_}
+                    for (name, labels), (count, total, max_) in sorted(self.spans.items())
+                ],
+            }
+
+    def to_prometheus(self) -> str:
+        """Convert to Prometheus text exposition format; counters end in _total and spans are summaries."""
+
+        def format_labels(labels):
+            if len(labels) == 0:
+                return ""
+            str_labels = ",".join(f'{k}="{v}"' for k, v in labels.items())
+            return f"{{{str_labels}}}"
+
+        def format_name(name):
+            return f"{PROMETHEUS_PREFIX}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}"
+
+        dict_metrics = self.to_dict()
+        list_lines, set_types = [], set()
+        for counter in dict_metrics["counters"]:
+            name = f"{format_name(counter['name'])}_total"
+            if name not in set_types:
+                list_lines.append(f"# TYPE {name} counter")
+                set_types.add(name)
+            list_lines.append(f"{name}{format_labels(counter['labels'])} {counter['value']}")
+        for span in dict_metrics["spans"]:
+            name = f"{format_name(span['name'])}_seconds"
+            if name not in set_types:
+                list_lines.append(f"# TYPE {name} summary")
+                set_types.add(name)
+            labels = format_labels(span["labels"])
+            list_lines.append(f"{name}_count{labels} {span['count']}")
+            list_lines.append(f"{name}_sum{labels} {span['sum_seconds']}")
+        return "\n".join(list_lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Write metrics as Prometheus text if path ends in .prom, otherwise as a single line of JSON.
+
+        Parameters
+        ----------
+        path : str
+            Output path
+
+        """
+        with open(path, "w") as f:
+            if path.endswith(".prom"):
+                f.write(self.to_prometheus())
+            else:
+                f.write(json.dumps(self.to_dict()) + "\n")
+        logger.info(f"Wrote metrics to {path}")
+
+
+METRICS = Metrics()
+"""Metrics: Process-wide metrics registry."""
+
+
+def span(name: str, **labels):
+    """Time the enclosed block in the process-wide registry (see Metrics.span)."""
+    return METRICS.span(name, **labels)
+
+
+def inc(name: str, value: float = 1, **labels) -> None:
+    """Increment a counter in the process-wide registry (see Metrics.inc)."""
+    METRICS.inc(name, value, **labels)
+
+
+def record_response(response, *args, **kwargs):
+    """Record HTTP status, bytes, retries, latency, and cache hit/miss of a response; used as a requests hook.
+
+    Parameters
+    ----------
+    response : requests.Response | requests_cache.CachedResponse
+        Response, which may have been served from the requests cache
+
+    Returns
+    -------
+    requests.Response
+        Unmodified response
+
+    """
+    from_cache = getattr(response, "from_cache", False)
+    # CachedSession dispatches hooks again after requests.Session.send has already done so for cache misses
+    if not from_cache and getattr(response, "metrics_recorded", False):
+        return response
+
+    labels = {"host": urlsplit(response.url).netloc, "method": response.request.method}
+    METRICS.inc("http_requests", status=response.status_code, cache="hit" if from_cache else "miss", **labels)
+    if from_cache:
+        return response
+
+    response.metrics_recorded = True
+
+    METRICS.inc("http_bytes", len(response.content), **labels)
+    METRICS.observe("http_request", response.elapsed.total_seconds(), **labels)
+    # urllib3 attaches the Retry object, whose history holds one entry per retried attempt
+    retries = getattr(getattr(response, "raw", None), "retries", None)
+    if retries is not None and len(retries.history) > 0:
+        METRICS.inc("http_retries", len(retries.history), **labels)
+    return response
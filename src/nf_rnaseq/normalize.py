@@ -0,0 +1,94 @@
+import logging
+import re
+from dataclasses import dataclass, field
+
+from nf_rnaseq import variables
+
+logger = logging.getLogger(__name__)
+
+RE_VERSION = re.compile(r"\.\d+(?:_PAR_Y)?$")
+"""re.Pattern: Version suffix of Ensembl and RefSeq identifiers (e.g., .15 in ENST00000456328.15)."""
+RE_PAR_Y = re.compile(r"_PAR_Y$")
+"""re.Pattern: GENCODE suffix of identifiers on the pseudoautosomal region of chrY (e.g., ENSG00000182378.14_PAR_Y)."""
+
+
+def normalize_id(
+    identifier: str,
+    strip_version: bool = False,
+    strip_par_y: bool = False,
+    uppercase: bool = False,
+) -> str:
+    """Normalize a single identifier; surrounding whitespace and brackets added by Nextflow are always removed."""
+    identifier = identifier.replace("[", "").replace("]", "").strip()
+    if uppercase:
+        identifier = identifier.upper()
+    if strip_version:
+        identifier = RE_VERSION.sub("", identifier)
+    if strip_par_y:
+        identifier = RE_PAR_Y.sub("", identifier)
+    return identifier
+
+
+@dataclass
+class NormalizedIDs:
+    """Unique normalized identifiers to query and the original inputs each one stands for."""
+
+    list_ids: list[str] = field(default_factory=list)
+    """list[str]: Unique normalized identifiers in order of first appearance."""
+    dict_originals: dict[str, list[str]] = field(default_factory=dict)
+    """dict[str, list[str]]: Unique original identifiers for each normalized identifier."""
+
+    def expand(self, result):
+        """Map the results of a query for normalized identifiers back to every original identifier.
+
+        Parameters
+        ----------
+        result : results.GeneNameResult
+            Gene names of normalized identifiers
+
+        Returns
+        -------
+        results.GeneNameResult
+            Gene names for each original identifier; identifiers not in dict_originals are kept as is
+
+        """
+        import numpy as np
+
+        list_originals = [self.dict_originals.get(id_norm, [id_norm]) for id_norm in result.identifiers.tolist()]
+        result = result.take(np.repeat(np.arange(len(result)), [len(i) for i in list_originals]))
+        result.identifiers = np.asarray([i for originals in list_originals for i in originals], dtype=object)
+        return result
+
+
+def normalize_ids(
+    database: str,
+    list_ids: list[str],
+) -> NormalizedIDs:
+    """De-duplicate identifiers after applying the normalization set for a database in variables.DICT_NORMALIZE.
+
+    Parameters
+    ----------
+    database : str
+        Database key in variables.DICT_DATABASES
+    list_ids : list[str]
+        Identifiers as given in the input
+
+    Returns
+    -------
+    NormalizedIDs
+        Unique normalized identifiers and the mapping back to the original identifiers
+
+    """
+    dict_options = variables.DICT_NORMALIZE.get(database, {})
+    dict_originals = {}
+    for id_orig in list_ids:
+        id_orig = id_orig.replace("[", "").replace("]", "").strip()
+        if id_orig == "":
+            continue
+        list_orig = dict_originals.setdefault(normalize_id(id_orig, **dict_options), [])
+        if id_orig not in list_orig:
+            list_orig.append(id_orig)
+
+    if len(dict_originals) < len(list_ids):
+        logger.info(f"Normalized {len(list_ids)} IDs to {len(dict_originals)} unique IDs for {database}")
+    return NormalizedIDs(list(dict_originals), dict_originals)
@@ -0,0 +1,264 @@
+import logging
+import random
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter, Retry
+from requests.exceptions import RequestException
+
+from nf_rnaseq import metrics, variables
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_AFTER = 300
+"""int: Maximum seconds a Retry-After header can pause a host."""
+CIRCUIT_FAILURES = 10
+"""int: Consecutive 429/5xx responses from a host after which its circuit opens."""
+CIRCUIT_COOLDOWN = 60
+"""int: Seconds a host's circuit stays open before a single trial request is let through; its response closes
+or reopens the circuit."""
+CIRCUIT_MAX_WAIT = 600
+"""int: Maximum seconds acquire waits for a host's open circuit to close before raising CircuitOpenError."""
+CIRCUIT_POLL_INTERVAL = 1
+"""int: Seconds between checks of an open circuit, so waiting callers see the trial request resolve early."""
+STATUS_FAILURE = (429, 500, 501, 502, 503, 504)
+"""tuple[int]: Status codes counted as failures by the circuit breaker and retried by RateLimitedAdapter."""
+
+
+class CircuitOpenError(RequestException):
+    """Raised instead of sending a request to a host whose circuit breaker is open."""
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given in seconds or as an HTTP date; None if missing or invalid."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RateLimiter:
+    """Per-host token bucket, Retry-After pause, and circuit breaker shared by processes through a SQLite file.
+
+    Hosts in variables.DICT_RATE_LIMIT are limited to their (requests per second, burst); other hosts are only
+    paused by Retry-After and the circuit breaker.
+    """
+
+    path: str
+    """str: Path to the SQLite database file (e.g., next to the requests cache)."""
+
+    def __post_init__(self):
+        # journal mode cannot be changed inside a transaction
+        with closing(sqlite3.connect(self.path, timeout=60, isolation_level=None)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+        with self.connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS host (
+                    host TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    blocked_until REAL NOT NULL DEFAULT 0,
+                    failures INTEGER NOT NULL DEFAULT 0,
+                    open_until REAL NOT NULL DEFAULT 0
+                )
+                """
+            )
+
+    @contextmanager
+    def connect(self):
+        """Open a connection in an immediate transaction so read-modify-write of a host is atomic across processes."""
+        conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def get_state(conn: sqlite3.Connection, host: str, now: float) -> list:
+        """Get [tokens, updated, blocked_until, failures, open_until] for a host, starting with a full bucket."""
+        row = conn.execute(
+            "SELECT tokens, updated, blocked_until, failures, open_until FROM host WHERE host = ?", (host,)
+        ).fetchone()
+        if row is None:
+            return [variables.DICT_RATE_LIMIT.get(host, (None, 1))[1], now, 0.0, 0, 0.0]
+        return list(row)
+
+    @staticmethod
+    def set_state(conn: sqlite3.Connection, host: str, state: list) -> None:
+        """Save the state of a host."""
+        conn.execute(
+            "INSERT OR REPLACE INTO host (host, tokens, updated, blocked_until, failures, open_until) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (host, *state),
+        )
+
+    def acquire(self, host: str) -> None:
+        """Wait until a request may be sent to host.
+
+        While the host's circuit is open, or half-open with the trial request claimed by another caller, the circuit
+        is polled until it closes or the cooldown ends and this caller claims the trial request.
+
+        Parameters
+        ----------
+        host : str
+            Host (netloc) of the request
+
+        Raises
+        ------
+        CircuitOpenError
+            If the host's circuit breaker stays open for more than CIRCUIT_MAX_WAIT seconds
+
+        """
+        rate, burst = variables.DICT_RATE_LIMIT.get(host, (None, None))
+        t0, waited = time.perf_counter(), False
+        while True:
+            now = time.time()
+            with self.connect() as conn:
+                state = self.get_state(conn, host, now)
+                tokens, updated, blocked_until, _, open_until = state
+                if open_until > now:
+                    if time.perf_counter() - t0 >= CIRCUIT_MAX_WAIT:
+                        raise CircuitOpenError(f"Circuit open for {host} for another {open_until - now:.0f} s")
+                    wait = min(open_until - now, CIRCUIT_POLL_INTERVAL)
+                elif blocked_until > now:
+                    wait = blocked_until - now
+                elif rate is None:
+                    wait = 0.0
+                else:
+                    tokens = min(burst, tokens + (now - updated) * rate)
+                    wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+                    state[0], state[1] = tokens - 1 if tokens >= 1 else tokens, now
+                if wait == 0 and open_until > 0:
+                    # half-open: claim the trial request, keeping the circuit open for others until it is recorded
+                    state[4] = now + CIRCUIT_COOLDOWN
+                if rate is not None or state[4] != open_until:
+                    self.set_state(conn, host, state)
+            if wait == 0:
+                break
+            # jitter keeps waiting processes from sending in lockstep
+            time.sleep(wait * random.uniform(1.0, 1.2))
+            waited = True
+
+        if waited:
+            metrics.METRICS.observe("rate_limit_wait", time.perf_counter() - t0, host=host)
+
+    def record(self, host: str, status_code: int, retry_after: float | None = None) -> None:
+        """Record a response, pausing the host on Retry-After and opening its circuit after repeated failures.
+
+        Parameters
+        ----------
+        host : str
+            Host (netloc) of the request
+        status_code : int
+            HTTP status code of the response
+        retry_after : float | None
+            Seconds from the Retry-After header, if any
+
+        """
+        now = time.time()
+        with self.connect() as conn:
+            state = self.get_state(conn, host, now)
+            if status_code in STATUS_FAILURE:
+                state[3] += 1
+            else:
+                # a response from the host, e.g., to the half-open trial request, closes the circuit
+                state[3], state[4] = 0, 0.0
+
+            if retry_after is not None and status_code in STATUS_FAILURE:
+                state[0] = 0.0
+                state[2] = max(state[2], now + min(retry_after, MAX_RETRY_AFTER))
+            elif status_code == 429:
+                # throttled without Retry-After: pause the host with exponential backoff
+                state[0] = 0.0
+                state[2] = max(state[2], now + min(2 ** (state[3] - 1), MAX_RETRY_AFTER))
+
+            if state[3] >= CIRCUIT_FAILURES:
+                logger.warning(f"{host} failed {state[3]} consecutive requests; pausing for {CIRCUIT_COOLDOWN} s")
+                metrics.inc("circuit_opened", host=host)
+                state[4] = now + CIRCUIT_COOLDOWN
+                # half-open: one more failure after the cooldown opens the circuit again
+                state[3] = CIRCUIT_FAILURES - 1
+            self.set_state(conn, host, state)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTPAdapter that waits for the shared rate limiter before each attempt and retries with jittered backoff.
+
+    Status retries are done here rather than by urllib3 so that every attempt passes through the rate limiter;
+    urllib3 still retries connection and read errors.
+
+    Parameters
+    ----------
+    limiter : RateLimiter | None
+        Shared rate limiter; if None, only Retry-After headers of this request's responses are honored
+    retries : int
+        Number of retries
+    backoff_factor : float
+        Backoff factor; the wait before retry n is backoff_factor * 2 ** n with jitter
+    status_forcelist : tuple[int]
+        Tuple of status codes to force a retry
+    **kwargs
+        Additional keyword arguments for requests.adapters.HTTPAdapter
+
+    """
+
+    def __init__(
+        self,
+        limiter: RateLimiter | None = None,
+        retries: int = 5,
+        backoff_factor: float = 0.3,
+        status_forcelist: tuple[int] = STATUS_FAILURE,
+        **kwargs,
+    ):
+        self.limiter = limiter
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.status_forcelist = status_forcelist
+        retry = Retry(total=retries, backoff_factor=backoff_factor, allowed_methods=False)
+        super().__init__(max_retries=retry, **kwargs)
+
+    def send(self, request, **kwargs):
+        """Send a request, waiting on the rate limiter before and retrying after a status in status_forcelist."""
+        host = urlsplit(request.url).netloc
+        for attempt in range(self.retries + 1):
+            if self.limiter is not None:
+                self.limiter.acquire(host)
+            response = super().send(request, **kwargs)
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if self.limiter is not None:
+                self.limiter.record(host, response.status_code, retry_after)
+            if response.status_code not in self.status_forcelist or attempt == self.retries:
+                return response
+
+            metrics.inc("http_retries", host=host, method=request.method)
+            response.close()
+            if self.limiter is not None and response.status_code == 429:
+                # the limiter pauses the host for every process
+                continue
+            if retry_after is not None:
+                time.sleep(min(retry_after, MAX_RETRY_AFTER))
+            else:
+                time.sleep(self.backoff_factor * 2**attempt * random.uniform(0.5, 1.5))
+
+
+def get_rate_limiter_path(cache_location: str) -> str:
+    """Get the path of the rate limiter database next to a requests cache."""
+    return f"{cache_location.removesuffix('.sqlite')}_rate_limit.sqlite"
@@ -1,21 +1,187 @@
+import atexit
 import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import closing, contextmanager
 from functools import cache
 
-from requests.adapters import HTTPAdapter, Retry
-from requests_cache import CachedSession
+from requests import Request
+from requests_cache import DO_NOT_CACHE, CachedSession
+from requests_cache.backends.base import BaseCache
+from requests_cache.backends.sqlite import SQLiteDict, SQLitePickleDict
+from requests_cache.serializers import SerializerPipeline, Stage, pickle_serializer
 
-from nf_rnaseq import config
+from nf_rnaseq import config, metrics, rate_limiter, variables
 
 logger = logging.getLogger(__name__)
 
+ALLOWABLE_METHODS = ("GET", "HEAD", "POST")
+"""tuple[str]: HTTP methods whose responses are saved in the requests cache."""
+SQLITE_TIMEOUT = 60
+"""int: Seconds a connection waits for a lock on the shared cache before raising (SQLite busy timeout)."""
+SINGLE_FLIGHT_TIMEOUT = 300
+"""int: Seconds after which another process's claim on an in-flight request is considered abandoned."""
+SINGLE_FLIGHT_POLLING_INTERVAL = 0.2
+"""float: Seconds between checks for a response being fetched by another process."""
+ACCESS_FLUSH_SIZE = 100
+"""int: Number of buffered cache accesses written to the access table at once."""
+
+
+def maybe_decompress(value: bytes) -> bytes:
+    """Decompress a cached value unless it was written uncompressed by an earlier version (pickles start 0x80)."""
+    if bytes(value[:1]) == b"\x80":
+        return value
+    return zlib.decompress(value)
+
+
+COMPRESSED_SERIALIZER = SerializerPipeline(
+    [*pickle_serializer.stages, Stage(zlib, dumps="compress", loads=maybe_decompress)],
+    is_binary=True,
+)
+"""SerializerPipeline: Pickle serializer followed by zlib compression."""
+
+
+class SharedSQLiteDict(SQLitePickleDict):
+    """SQLite responses table shared by concurrent processes.
+
+    Uses WAL mode so readers do not block the writer, and records when each key was last read or written in an
+    access table used for LRU eviction (see prune_cache). Accesses are buffered to avoid a write per cache hit.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.dict_access = {}
+        super().__init__(*args, **kwargs)
+        atexit.register(self.flush_access)
+
+    def init_db(self):
+        """Create the responses, access, and inflight tables and enable WAL mode."""
+        super().init_db()
+        with self._lock, self.connection(commit=True) as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("CREATE TABLE IF NOT EXISTS access (key PRIMARY KEY, accessed REAL)")
+            con.execute("CREATE TABLE IF NOT EXISTS inflight (key PRIMARY KEY, owner TEXT, started REAL)")
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.record_access(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.record_access(key)
+
+    def record_access(self, key: str) -> None:
+        """Buffer the time at which key was accessed, flushing once ACCESS_FLUSH_SIZE accesses are buffered."""
+        with self._lock:
+            self.dict_access[key] = time.time()
+            n_access = len(self.dict_access)
+        if n_access >= ACCESS_FLUSH_SIZE:
+            self.flush_access()
+
+    def flush_access(self) -> None:
+        """Write buffered access times to the access table."""
+        with self._lock:
+            list_access, self.dict_access = list(self.dict_access.items()), {}
+        if len(list_access) > 0:
+            with self.connection(commit=True) as con:
+                con.executemany("INSERT OR REPLACE INTO access (key, accessed) VALUES (?, ?)", list_access)
+
+
+class SharedSQLiteCache(BaseCache):
+    """SQLite cache backend with compressed responses that is safe to share between processes.
+
+    Parameters
+    ----------
+    db_path : str
+        Database file path; .sqlite is appended if there is no extension
+    **kwargs
+        Additional keyword arguments for requests_cache.backends.base.BaseCache and sqlite3.connect
+
+    """
+
+    def __init__(self, db_path: str, **kwargs):
+        kwargs.setdefault("timeout", SQLITE_TIMEOUT)
+        kwargs.setdefault("serializer", COMPRESSED_SERIALIZER)
+        super().__init__(cache_name=db_path, **kwargs)
+        self.responses = SharedSQLiteDict(db_path, table_name="responses", **kwargs)
+        self.redirects = SQLiteDict(db_path, table_name="redirects", **kwargs)
+
+    @property
+    def db_path(self) -> str:
+        """Database file path."""
+        return self.responses.db_path
+
+    def bulk_delete(self, keys):
+        """Remove responses, their redirects, and their access times."""
+        self.responses.bulk_delete(keys=keys)
+        self.redirects.bulk_delete(keys=keys)
+        self.redirects.bulk_delete(values=keys)
+        with self.responses.connection(commit=True) as con:
+            con.execute("DELETE FROM access WHERE key NOT IN (SELECT key FROM responses)")
+
+    @contextmanager
+    def single_flight(self, key: str):
+        """Claim key so that other processes wait for its response to be cached instead of sending the same request.
+
+        Returns once key is claimed or cached; claims older than SINGLE_FLIGHT_TIMEOUT are taken over.
+
+        Parameters
+        ----------
+        key : str
+            Cache key of the request
+
+        """
+        owner = f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+        claimed = False
+        while True:
+            now = time.time()
+            with self.responses.connection(commit=True) as con:
+                con.execute("DELETE FROM inflight WHERE key = ? AND started < ?", (key, now - SINGLE_FLIGHT_TIMEOUT))
+                cursor = con.execute(
+                    "INSERT OR IGNORE INTO inflight (key, owner, started) VALUES (?, ?, ?)",
+                    (key, owner, now),
+                )
+                claimed = cursor.rowcount == 1
+            if claimed or self.contains(key=key):
+                break
+            metrics.inc("single_flight_waits")
+            time.sleep(SINGLE_FLIGHT_POLLING_INTERVAL)
+
+        try:
+            yield
+        finally:
+            if claimed:
+                with self.responses.connection(commit=True) as con:
+                    con.execute("DELETE FROM inflight WHERE key = ? AND owner = ?", (key, owner))
+
+
+class SharedCachedSession(CachedSession):
+    """CachedSession that fetches each uncached key in only one process at a time (see SharedSQLiteCache)."""
+
+    def send(self, request, expire_after=None, **kwargs):
+        """Send a prepared request, waiting for any other process already fetching the same response."""
+        if expire_after == DO_NOT_CACHE or not isinstance(self.cache, SharedSQLiteCache):
+            return super().send(request, expire_after=expire_after, **kwargs)
+
+        key = self.cache.create_key(request, **kwargs)
+        if self.cache.contains(key=key):
+            return super().send(request, expire_after=expire_after, **kwargs)
+        with self.cache.single_flight(key):
+            return super().send(request, expire_after=expire_after, **kwargs)
+
 
 def add_retry_to_session(
     session,
     retries=5,
     backoff_factor=0.3,
-    status_forcelist=(429, 500, 501, 502, 503, 504),
+    status_forcelist=rate_limiter.STATUS_FAILURE,
+    limiter=None,
 ):
-    """Add retry logic to a session.
+    """Add retry logic and, if a limiter is given, shared per-host rate limiting to a session.
 
     Parameters
     ----------
@@ -27,6 +193,8 @@ def add_retry_to_session(
         Backoff factor
     status_forcelist: tuple[int]
         Tuple of status codes to force a retry
+    limiter: rate_limiter.RateLimiter | None
+        Rate limiter shared across processes
 
     Returns
     -------
@@ -34,13 +202,12 @@ def add_retry_to_session(
         Session object with retry logic
 
     """
-    retry = Retry(
-        total=retries,
+    adapter = rate_limiter.RateLimitedAdapter(
+        limiter=limiter,
+        retries=retries,
         backoff_factor=backoff_factor,
         status_forcelist=status_forcelist,
-        allowed_methods=False,
     )
-    adapter = HTTPAdapter(max_retries=retry)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     return session
@@ -50,6 +217,12 @@ def add_retry_to_session(
 def get_cached_session():
     """Get a cached session.
 
+    POST responses are cacheable so that bulk jobs submitted for the same ID set
+    (e.g., UniProt idmapping) are reused; the cache key includes the request body.
+    The SQLite cache is shared by concurrent processes (see SharedSQLiteCache),
+    responses expire per database (see variables.DICT_EXPIRE_AFTER), and requests
+    are rate limited per host across processes (see rate_limiter.RateLimiter).
+
     Returns
     -------
     requests.Session
@@ -58,8 +231,96 @@ def get_cached_session():
     """
     cache_location = config.maybe_get_requests_cache()
     if cache_location is not None:
-        session = CachedSession(cache_location, allowable_codes=(200, 404, 400), backend="sqlite")
+        session = SharedCachedSession(
+            backend=SharedSQLiteCache(cache_location),
+            allowable_codes=(200, 404, 400),
+            allowable_methods=ALLOWABLE_METHODS,
+            urls_expire_after=variables.DICT_EXPIRE_AFTER,
+        )
+    else:
+        session = CachedSession(allowable_methods=ALLOWABLE_METHODS, backend="memory")
+    session.hooks["response"].append(metrics.record_response)
+
+    if cache_location is not None:
+        limiter = rate_limiter.RateLimiter(rate_limiter.get_rate_limiter_path(cache_location))
     else:
-        session = CachedSession(backend="memory")
+        limiter = None
+    return add_retry_to_session(session, limiter=limiter)
+
+
+def is_cached(session, url: str) -> bool:
+    """Check if a GET request for url is in the session cache.
+
+    Unlike session.cache.contains(url=...), the cache key includes the environment's verify setting
+    (e.g., REQUESTS_CA_BUNDLE) exactly as session.get does.
+
+    Parameters
+    ----------
+    session: requests_cache.CachedSession
+        Cached session object
+    url: str
+        URL of the GET request
+
+    Returns
+    -------
+    bool
+        True if a response for the request is cached
+
+    """
+    verify = session.merge_environment_settings(url, {}, None, None, None)["verify"]
+    key = session.cache.create_key(request=Request("GET", url), verify=verify)
+    return session.cache.contains(key=key)
+
+
+def prune_cache(
+    cache_location: str,
+    max_bytes: int,
+) -> int:
+    """Remove expired responses, then least recently used responses until the cache is under max_bytes, and compact.
+
+    Parameters
+    ----------
+    cache_location : str
+        Requests cache path (see config.set_requests_cache)
+    max_bytes : int
+        Maximum total size of stored (compressed) responses
+
+    Returns
+    -------
+    int
+        Number of responses removed
+
+    """
+    cache = SharedSQLiteCache(cache_location)
+    n_before = len(cache.responses)
+    cache.delete(expired=True)
+    # checking expiration reads every response; these are not uses, so do not record them as accesses
+    cache.responses.dict_access.clear()
+
+    with cache.responses.connection() as con:
+        list_rows = con.execute(
+            """
+            SELECT responses.key, length(responses.value)
+            FROM responses LEFT JOIN access ON responses.key = access.key
+            ORDER BY COALESCE(access.accessed, 0) DESC
+            """
+        ).fetchall()
+
+    n_bytes, list_evict = 0, []
+    for key, size in list_rows:
+        n_bytes += size
+        if n_bytes > max_bytes:
+            list_evict.append(key)
+    if len(list_evict) > 0:
+        cache.bulk_delete(list_evict)
+
+    with cache.responses.connection(commit=True) as con:
+        con.execute("DELETE FROM access WHERE key NOT IN (SELECT key FROM responses)")
+    # VACUUM cannot run inside a transaction
+    with closing(sqlite3.connect(cache.db_path, timeout=SQLITE_TIMEOUT, isolation_level=None)) as con:
+        con.execute("VACUUM")
+        con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
 
-    return add_retry_to_session(session)
+    n_removed = n_before - len(cache.responses)
+    logger.info(f"Removed {n_removed} of {n_before} responses from {cache.db_path}")
+    return n_removed
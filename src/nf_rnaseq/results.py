@@ -0,0 +1,177 @@
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class GeneNameResult:
+    """Columnar gene name mapping: the names of identifiers[i] are gene_names[offsets[i] : offsets[i + 1]]."""
+
+    identifiers: np.ndarray
+    """np.ndarray: Unique input identifiers in order of first appearance in the response, then missing inputs."""
+    gene_names: np.ndarray
+    """np.ndarray: Flat array of gene names grouped by identifier."""
+    offsets: np.ndarray
+    """np.ndarray: Start of each identifier's gene names in gene_names, with a final entry of len(gene_names)."""
+
+    def __len__(self):
+        return len(self.identifiers)
+
+    @classmethod
+    def from_lists(
+        cls,
+        list_identifier: list[str],
+        list_gene_names: list,
+    ) -> "GeneNameResult":
+        """Build from parallel lists of identifiers and gene name(s); a gene name that is not a list is one name.
+
+        Parameters
+        ----------
+        list_identifier : list[str]
+            Identifiers
+        list_gene_names : list
+            List of gene names (or a single gene name) for each identifier
+
+        Returns
+        -------
+        GeneNameResult
+            Columnar mapping of identifiers to gene names
+
+        """
+        list_gene_names = [i if isinstance(i, list | tuple) else [i] for i in list_gene_names]
+        gene_names = np.empty(sum(len(i) for i in list_gene_names), dtype=object)
+        gene_names[:] = [name for names in list_gene_names for name in names]
+        return cls(
+            identifiers=np.asarray(list_identifier, dtype=object),
+            gene_names=gene_names,
+            offsets=np.concatenate([[0], np.cumsum([len(i) for i in list_gene_names])]).astype(np.int64),
+        )
+
+    @classmethod
+    def concat(cls, list_results: list["GeneNameResult"]) -> "GeneNameResult":
+        """Concatenate results in order."""
+        if len(list_results) == 0:
+            return cls.from_lists([], [])
+        list_offsets, start = [np.zeros(1, dtype=np.int64)], 0
+        for result in list_results:
+            list_offsets.append(result.offsets[1:] + start)
+            start += result.offsets[-1]
+        return cls(
+            identifiers=np.concatenate([result.identifiers for result in list_results]),
+            gene_names=np.concatenate([result.gene_names for result in list_results]),
+            offsets=np.concatenate(list_offsets),
+        )
+
+    def take(self, indices) -> "GeneNameResult":
+        """Select identifiers and their gene names by position without building per-identifier lists.
+
+        Parameters
+        ----------
+        indices : array-like
+            Positions of the identifiers to select, in output order; may repeat
+
+        Returns
+        -------
+        GeneNameResult
+            Columnar mapping of the selected identifiers to gene names
+
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        starts = self.offsets[:-1][indices]
+        counts = self.offsets[1:][indices] - starts
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        # position of each selected gene name in gene_names
+        idx_names = np.repeat(starts - offsets[:-1], counts) + np.arange(offsets[-1])
+        return GeneNameResult(
+            identifiers=self.identifiers[indices], gene_names=self.gene_names[idx_names], offsets=offsets
+        )
+
+    def reindex(self, list_identifier) -> "GeneNameResult":
+        """Select the given identifiers in order; identifiers not in the result are dropped."""
+        index = pd.Index(self.identifiers, dtype=object)
+        positions = np.flatnonzero(~index.duplicated())
+        indices = pd.Index(self.identifiers[positions], dtype=object).get_indexer(list_identifier)
+        return self.take(positions[indices[indices >= 0]])
+
+    def has_gene_name(self) -> np.ndarray:
+        """Check for each identifier if any of its gene names is not missing (None or NaN).
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask over identifiers
+
+        """
+        cumsum = np.concatenate([[0], np.cumsum(pd.notna(self.gene_names))])
+        return (cumsum[self.offsets[1:]] - cumsum[self.offsets[:-1]]) > 0
+
+    def to_lists(self) -> tuple[list[str], list[list]]:
+        """Convert to parallel lists of identifiers and lists of gene names.
+
+        Returns
+        -------
+        tuple[list[str], list[list]]
+            Identifiers and list of gene names for each identifier
+
+        """
+        gene_names = self.gene_names.tolist()
+        offsets = self.offsets.tolist()
+        return self.identifiers.tolist(), [gene_names[i:j] for i, j in zip(offsets[:-1], offsets[1:], strict=True)]
+
+
+def aggregate_gene_names(
+    list_identifier: list[str],
+    ids_in,
+    names_out,
+    fill_missing=None,
+    unique: bool = False,
+) -> GeneNameResult:
+    """Group (input ID, gene name) pairs from an API response by input ID in linear time.
+
+    Parameters
+    ----------
+    list_identifier : list[str]
+        Identifiers that were queried; any not in ids_in are added with a single fill_missing gene name
+    ids_in : array-like
+        Input identifier of each response row; rows with a missing (NaN) identifier are dropped
+    names_out : array-like
+        Gene name of each response row
+    fill_missing : Any
+        Gene name for queried identifiers missing from the response; default is None
+    unique : bool
+        If True, drop duplicate (input ID, gene name) pairs; default is False
+
+    Returns
+    -------
+    GeneNameResult
+        Columnar mapping of identifiers to gene names
+
+    """
+    ids_in = np.asarray(ids_in, dtype=object)
+    names_out = np.asarray(names_out, dtype=object)
+    if unique and len(ids_in) > 0:
+        mask = ~pd.DataFrame({"in": ids_in, "out": names_out}).duplicated().to_numpy()
+        ids_in, names_out = ids_in[mask], names_out[mask]
+
+    codes, uniques = pd.factorize(ids_in, sort=False)
+    # missing identifiers are coded -1, which np.bincount rejects
+    mask = codes >= 0
+    codes, names_out = codes[mask], names_out[mask]
+    uniques = np.asarray(uniques, dtype=object)
+    counts = np.bincount(codes, minlength=len(uniques))
+
+    # hash-based membership test for queried IDs absent from the response
+    index_query = pd.Index(list_identifier, dtype=object)
+    missing = pd.unique(index_query[~index_query.isin(uniques)].to_numpy())
+
+    return GeneNameResult(
+        identifiers=np.concatenate([uniques, np.asarray(missing, dtype=object)]),
+        gene_names=np.concatenate(
+            [names_out[np.argsort(codes, kind="stable")], np.full(len(missing), fill_missing, dtype=object)]
+        ),
+        offsets=np.concatenate([[0], np.cumsum(counts), len(codes) + np.arange(1, len(missing) + 1)]).astype(np.int64),
+    )
@@ -0,0 +1,77 @@
+import logging
+import re
+from functools import cache
+
+import numpy as np
+import pandas as pd
+
+from nf_rnaseq import variables
+
+logger = logging.getLogger(__name__)
+
+UNCLASSIFIED = "unclassified"
+"""str: Class of identifiers that match no pattern in variables.DICT_ID_ROUTES; these are not queried."""
+
+
+@cache
+def get_route_regex() -> re.Pattern:
+    """Compile the patterns in variables.DICT_ID_ROUTES into one full-match regex with a named group per class."""
+    str_groups = "|".join(f"(?P<{name}>{pattern})" for name, (pattern, _) in variables.DICT_ID_ROUTES.items())
+    return re.compile(f"^(?:{str_groups})$")
+
+
+def classify_ids(list_ids) -> np.ndarray:
+    """Classify every identifier in one vectorized pass of the compiled route regex.
+
+    Parameters
+    ----------
+    list_ids : array-like
+        Identifiers (e.g., the Geneid column of the merged featureCounts matrix)
+
+    Returns
+    -------
+    np.ndarray
+        Class in variables.DICT_ID_ROUTES of each identifier, or UNCLASSIFIED
+
+    """
+    regex = get_route_regex()
+    list_classes = list(regex.groupindex)
+    # one column per class, non-null where that alternative matched
+    df_match = pd.Series(list_ids, dtype=object).str.extract(regex, expand=True)[list_classes]
+    mat_match = df_match.notna().to_numpy()
+    arr_classes = np.asarray(list_classes, dtype=object)[mat_match.argmax(axis=1)]
+    arr_classes[~mat_match.any(axis=1)] = UNCLASSIFIED
+    return arr_classes
+
+
+def route_ids(
+    list_ids,
+    dict_override: dict[str, str] | None = None,
+) -> dict[str, list[str]]:
+    """Group unique identifiers by the database that can resolve their class.
+
+    Parameters
+    ----------
+    list_ids : array-like
+        Identifiers to route
+    dict_override : dict[str, str] | None
+        Database to use instead of the default for a class (e.g., {"ensembl_transcript_version": "LocalGTF"})
+
+    Returns
+    -------
+    dict[str, list[str]]
+        Identifiers in order of first appearance per database in variables.DICT_DATABASES, and UNCLASSIFIED
+
+    """
+    dict_route = {name: database for name, (_, database) in variables.DICT_ID_ROUTES.items()}
+    dict_route.update(dict_override or {})
+    dict_route[UNCLASSIFIED] = UNCLASSIFIED
+
+    arr_ids = pd.unique(pd.Series(list_ids, dtype=object).str.strip()).astype(object)
+    arr_databases = pd.Series(classify_ids(arr_ids)).map(dict_route).to_numpy()
+
+    dict_out = {}
+    for database in pd.unique(arr_databases):
+        dict_out[database] = arr_ids[arr_databases == database].tolist()
+        logger.info(f"Routing {len(dict_out[database])} IDs to {database}")
+    return dict_out
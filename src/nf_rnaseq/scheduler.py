@@ -0,0 +1,130 @@
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from nf_rnaseq import batching, metrics, variables
+from nf_rnaseq.api_schema import is_batch_limit_error
+from nf_rnaseq.uniprot import POLLING_MAX_ATTEMPTS, get_polling_interval
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    """Submitted job awaiting results."""
+
+    list_ids: list[str]
+    """list[str]: Identifiers in the job."""
+    jobId: str
+    """str: Job ID returned by the POST request."""
+    attempt: int = 0
+    """int: Number of status polls so far."""
+    next_poll: float = 0.0
+    """float: time.monotonic() at which to poll next."""
+    submitted: float = field(default_factory=time.monotonic)
+    """float: time.monotonic() at which the job was submitted."""
+
+
+def run_jobs(
+    database: str,
+    list_ids: list[str],
+    batch_size: int | None = None,
+    workers: int = 4,
+    polling_interval: float = 5,
+    stream: bool = False,
+) -> list:
+    """Submit every job of a POST + GET database up front, then poll all outstanding jobs concurrently.
+
+    Each job is polled with exponential backoff and jitter and its results are downloaded as soon as it
+    finishes, so wall time approaches that of the slowest job rather than the sum of all jobs. Jobs that fail
+    with an error naming the identifier limit are split in half and resubmitted; any other job error is raised.
+
+    Parameters
+    ----------
+    database : str
+        Database key in variables.DICT_DATABASES with both POST and GET entries (e.g., UniProtBULK)
+    list_ids : list[str]
+        List of identifiers to query
+    batch_size : int | None
+        Number of identifiers per job; if None, batches are packed by batching.pack_batches
+    workers : int
+        Maximum number of concurrent requests
+    polling_interval : float
+        Base interval in seconds between status polls of a job
+    stream : bool
+        If True, results are not downloaded; iterate them page by page with the returned objects' iter_results()
+
+    Returns
+    -------
+    list[APIClientGET]
+        API objects with result (results.GeneNameResult) and ok attributes in batch order
+
+    """
+    dict_post = variables.DICT_DATABASES[database]["POST"]
+    dict_get = variables.DICT_DATABASES[database]["GET"]
+
+    dict_kwargs = {"stream": True} if stream else {}
+
+    def submit(batch):
+        post_obj = dict_post["api_object"](
+            identifier=",".join(batch),
+            term_in=dict_post["term_in"],
+            term_out=dict_post["term_out"],
+            url_base=dict_post["url_base"],
+        )
+        return Job(list_ids=batch, jobId=post_obj.jobId)
+
+    def download(job):
+        return dict_get["api_object"](
+            identifier=",".join(job.list_ids),
+            term_in=dict_get["term_in"],
+            term_out=dict_get["term_out"],
+            url_base=dict_get["url_base"],
+            headers=dict_get["headers"],
+            jobId=job.jobId,
+            **dict_kwargs,
+        )
+
+    def get_status(job):
+        return dict_get["api_object"].get_job_status(os.path.join(dict_get["url_base"], job.jobId))
+
+    list_batches = batching.pack_batches(database, list_ids, batch_size)
+    logger.info(f"Submitting {len(list_ids)} IDs in {len(list_batches)} {database} jobs")
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        # keys are tuples so that halves of split jobs sort between their neighbors
+        dict_jobs = {}
+        for idx, list_job in enumerate(executor.map(lambda b: batching.query_with_split(submit, b), list_batches)):
+            dict_jobs.update({(idx, j): job for j, job in enumerate(list_job)})
+
+        dict_futures = {}
+        while dict_jobs:
+            now = time.monotonic()
+            list_due = [key for key, job in dict_jobs.items() if job.next_poll <= now]
+            list_status = executor.map(lambda k: get_status(dict_jobs[k]), list_due)
+            for key, (status, message) in zip(list_due, list_status, strict=True):
+                job = dict_jobs.pop(key)
+                if status == "FINISHED":
+                    metrics.METRICS.observe("job_wait", time.monotonic() - job.submitted, database=database)
+                    dict_futures[key] = executor.submit(download, job)
+                elif status == "ERROR" and len(job.list_ids) > 1 and is_batch_limit_error(message):
+                    idx = len(job.list_ids) // 2
+                    logger.warning(
+                        f"{job.jobId}: {message}; resubmitting as jobs of {idx} and {len(job.list_ids) - idx}"
+                    )
+                    metrics.inc("jobs_split", database=database)
+                    for j, batch in enumerate([job.list_ids[:idx], job.list_ids[idx:]]):
+                        dict_jobs[(*key, j)] = submit(batch)
+                else:
+                    job.attempt += 1
+                    if job.attempt >= POLLING_MAX_ATTEMPTS or status == "ERROR":
+                        raise Exception(f"{job.jobId}: {status} {message}")
+                    job.next_poll = now + get_polling_interval(job.attempt, polling_interval)
+                    dict_jobs[key] = job
+
+            if dict_jobs:
+                time.sleep(max(0.0, min(job.next_poll for job in dict_jobs.values()) - time.monotonic()))
+
+        return [dict_futures[key].result() for key in sorted(dict_futures)]
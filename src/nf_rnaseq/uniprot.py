@@ -1,19 +1,47 @@
 import logging
 import os
+import random
 import re
 import time
 from dataclasses import dataclass
 
 import numpy as np
-import pandas as pd
-import requests
+from requests_cache import DO_NOT_CACHE
 
-from nf_rnaseq.api_schema import APIClientGET, APIClientPOST
+from nf_rnaseq import metrics, requests_wrapper, results
+from nf_rnaseq.api_schema import APIClientGET, APIClientPOST, BatchTooLargeError, is_batch_limit_error
 
 logger = logging.getLogger(__name__)
 
 re_next_link = re.compile(r'<(.+)>; rel="next"')
 
+UNIPROT_JOB_EXPIRE_AFTER = 7 * 24 * 60 * 60
+"""int: Seconds UniProt retains idmapping job results, after which a cached job ID is no longer valid."""
+POLLING_MAX_INTERVAL = 60
+"""int: Maximum seconds between job status polls."""
+POLLING_MAX_ATTEMPTS = 20
+"""int: Maximum number of job status polls before giving up."""
+
+
+def get_polling_interval(attempt: int, polling_interval: float) -> float:
+    """Get the exponential backoff interval with jitter for a job status poll.
+
+    Parameters
+    ----------
+    attempt : int
+        Number of polls so far (starting at 1)
+    polling_interval : float
+        Base interval in seconds
+
+    Returns
+    -------
+    float
+        Seconds to wait before the next poll
+
+    """
+    # jitter keeps concurrently submitted jobs from polling in lockstep
+    return min(POLLING_MAX_INTERVAL, polling_interval * 2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+
 
 @dataclass
 class UniProt(APIClientGET):
@@ -31,12 +59,16 @@ class UniProt(APIClientGET):
         return False
 
     def maybe_get_gene_names(self):
-        """Get list of gene names from UniProt ID and add as list_gene_names attr."""
+        """Get list of gene names from UniProt ID and add as result attr."""
         try:
             list_genes = [str(gene["geneName"]["value"]) for gene in self.json["genes"]]
-            self.list_gene_names = list_genes
         except (KeyError, AttributeError) as e:
             logging.error("Error at %s", "division", exc_info=e)
+            self.ok = False
+            list_genes = []
+        self.result = results.aggregate_gene_names(
+            self.list_identifier, [self.identifier] * len(list_genes), list_genes, fill_missing=None
+        )
 
 
 @dataclass
@@ -45,6 +77,8 @@ class UniProtGET(APIClientGET):
 
     jobId: str | None = None
     """str: Job ID for bulk download; applies to UniProt bulk downloading."""
+    stream: bool = False
+    """bool: If True, only wait for the job; results are read page by page with iter_results()."""
 
     def __post_init__(self):
         super().__post_init__()
@@ -53,6 +87,11 @@ class UniProtGET(APIClientGET):
         """Create URL for UniProt API query."""
         self.url_query = os.path.join(self.url_base, self.jobId)
 
+    def query_api(self):
+        """Poll the job and retrieve results through the shared session; status responses are never cached."""
+        if self.check_if_job_ready():
+            logger.info(f"\n{self.identifier}\n{self.json}\n")
+
     @staticmethod
     def get_next_link(headers):
         """Get next link from headers."""
@@ -64,10 +103,12 @@ class UniProtGET(APIClientGET):
 
     def get_batch(self):
         """Get batches of json from UniProt API."""
+        session = requests_wrapper.get_cached_session()
         batch_url = self.url_query
         while batch_url:
-            response = requests.get(batch_url)
+            response = session.get(batch_url)
             self.check_response(response)
+            self.ok = self.ok and response.ok
             yield response
             batch_url = self.get_next_link(response.headers)
 
@@ -85,56 +126,122 @@ class UniProtGET(APIClientGET):
         dict_temp = {"results": list_results, "failedIds": list(set_failedIds)}
         return dict_temp
 
+    def iter_results(self):
+        """Yield gene names page by page without materializing all pages; memory is bounded by one page.
+
+        Rows of the last identifier on a page are held back until the next page in case they continue there.
+        Failed IDs and queried IDs absent from every page map to NaN and are yielded last.
+
+        Yields
+        ------
+        results.GeneNameResult
+            Columnar mapping of the identifiers completed on each page
+
+        """
+        # failedIds occur on each page so need to use a set instead of list
+        set_failedIds = set()
+        # identifiers already yielded, to find queried IDs in neither results nor failedIds
+        set_yielded = set()
+        ids_carry, names_carry = [], []
+        for batch in self.get_batch():
+            batch_json = batch.json()
+            set_failedIds.update(batch_json.get("failedIds", []))
+            list_results = batch_json.get("results", [])
+            if len(list_results) == 0:
+                continue
+            ids_in = ids_carry + [i["from"] for i in list_results]
+            names_out = names_carry + [i["to"] for i in list_results]
+            idx = len(ids_in) - 1
+            while idx > 0 and ids_in[idx - 1] == ids_in[-1]:
+                idx -= 1
+            ids_carry, names_carry = ids_in[idx:], names_out[idx:]
+            if idx > 0:
+                set_yielded.update(ids_in[:idx])
+                yield results.aggregate_gene_names([], ids_in[:idx], names_out[:idx], unique=True)
+        list_missing = [i for i in self.list_identifier if i not in set_yielded and i not in set_failedIds]
+        yield results.aggregate_gene_names(
+            sorted(set_failedIds) + list_missing, ids_carry, names_carry, fill_missing=np.nan, unique=True
+        )
+
+    @staticmethod
+    def get_job_status(url_status: str) -> tuple[str, str]:
+        """Get the status of a job without caching it; "FINISHED" if results are available or cached.
+
+        Parameters
+        ----------
+        url_status : str
+            Job status URL
+
+        Returns
+        -------
+        tuple[str, str]
+            "FINISHED" if results are ready, otherwise the jobStatus reported by UniProt (e.g., "RUNNING", "ERROR"),
+            and the error messages of the job, if any
+
+        """
+        session = requests_wrapper.get_cached_session()
+        # results cached by a previous run are used directly
+        if requests_wrapper.is_cached(session, url_status):
+            return "FINISHED", ""
+
+        response = session.get(url_status, expire_after=DO_NOT_CACHE)
+        UniProtGET.check_response(response)
+        j = response.json()
+        if "results" in j or "failedIds" in j:
+            status = "FINISHED"
+        else:
+            status = j.get("jobStatus", "UNKNOWN")
+        metrics.inc("job_polls", client="UniProtGET", status=status)
+        message = "; ".join(str(error.get("message", error)) for error in j.get("errors", []))
+        return status, message
+
     def check_if_job_ready(self):
-        """Check if the job is ready and add json if so."""
+        """Poll the job with exponential backoff and add json once it is ready."""
         i = 0
         while True:
-            response = requests.get(self.url_query)
-            self.check_response(response)
-            j = response.json()
-            if "results" in j or "failedIds" in j:
-                self.json = self.concatenate_json_batches()
+            status, message = self.get_job_status(self.url_query)
+            if status == "FINISHED":
+                if self.stream:
+                    self.json = None
+                else:
+                    self.json = self.concatenate_json_batches()
                 logger.info(f"\n{self.jobId}\n{self.json}")
                 return True
+            elif status == "ERROR" and len(self.list_identifier) > 1 and is_batch_limit_error(message):
+                # e.g., the number of mapped IDs exceeds the idmapping limit
+                raise BatchTooLargeError(f"{self.jobId}: {status} {message}")
             else:
                 i += 1
-                if i >= 10:
-                    raise Exception(f"{self.jobId}: {j['jobStatus']}")
+                if i >= POLLING_MAX_ATTEMPTS or status == "ERROR":
+                    raise Exception(f"{self.jobId}: {status} {message}")
                 else:
-                    time.sleep(self.polling_interval)
+                    time.sleep(get_polling_interval(i, self.polling_interval))
 
     def maybe_get_gene_names(self):
-        """Get list of gene names from UniProt ID and add as list_gene_names attr."""
-        list_identifier = []
-        list_gene_names = []
-
-        str_results = "results"
-        if str_results in self.json:
-            list_results = self.json[str_results]
-            list_identifier.extend([i["from"] for i in list_results])
-            list_gene_names.extend([i["to"] for i in list_results])
+        """Get unique gene names per UniProt ID and add as result attr; failed IDs map to NaN."""
+        if self.stream:
+            return
+        list_results = self.json.get("results", [])
+        list_failed = self.json.get("failedIds", [])
 
-        str_failedIds = "failedIds"
-        if str_failedIds in self.json:
-            list_failed = self.json[str_failedIds]
-            list_identifier.extend(list_failed)
-            list_gene_names.extend(list(np.repeat(np.nan, len(list_failed))))
+        ids_in = np.empty(len(list_results) + len(list_failed), dtype=object)
+        names_out = np.full(len(ids_in), np.nan, dtype=object)
+        ids_in[: len(list_results)] = [i["from"] for i in list_results]
+        names_out[: len(list_results)] = [i["to"] for i in list_results]
+        ids_in[len(list_results) :] = list_failed
 
-        df = pd.DataFrame({"in": list_identifier, "out": list_gene_names})
-        df_agg = df.groupby("in", sort=False).agg(set).reset_index()
-        df_agg["out"] = df_agg["out"].apply(lambda x: list(x))
-
-        # list_check = [i for i in self.list_identifier if i in df_agg["in"].tolist()]
-        # assert len(list_check) == len(self.list_identifier)
-
-        self.list_identifier = df_agg["in"].tolist()
-        self.list_gene_names = df_agg["out"].tolist()
+        self.result = results.aggregate_gene_names(
+            self.list_identifier, ids_in, names_out, fill_missing=np.nan, unique=True
+        )
 
 
 @dataclass
 class UniProtPOST(APIClientPOST):
     """Class to interact with UniProt API bulk download for list of identifiers via POST."""
 
+    expire_after: int = UNIPROT_JOB_EXPIRE_AFTER
+    """int: Seconds after which the cached job ID expires; matches UniProt's job retention."""
+
     def __post_init__(self):
         super().__post_init__()
 
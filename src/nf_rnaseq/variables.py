@@ -1,27 +1,135 @@
-from nf_rnaseq import biomart, hgnc, uniprot
+import importlib
+
+
+class LazyImport:
+    """Reference to a class in a module that is imported the first time the class is called or accessed.
+
+    Keeps get_gene_name startup from importing every client and its dependencies (e.g., pandas, numpy) when only
+    one database is queried.
+    """
+
+    def __init__(self, module: str, name: str):
+        self.module = module
+        self.name = name
+        self.obj = None
+
+    def load(self):
+        """Import the module and return the referenced object."""
+        if self.obj is None:
+            self.obj = getattr(importlib.import_module(self.module), self.name)
+        return self.obj
+
+    def __call__(self, *args, **kwargs):
+        """Instantiate the referenced class."""
+        return self.load()(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        return f"LazyImport({self.module}.{self.name})"
+
+
+URL_BIOMART = 'http://www.ensembl.org/biomart/martservice?query=<?xml version="1.0" encoding="UTF-8"?><!DOCTYPE Query><Query  virtualSchemaName = "default" formatter = "TSV" header = "0" uniqueRows = "0" count = "" datasetConfigVersion = "0.6" ><Dataset name = "hsapiens_gene_ensembl" interface = "default" ><Filter name = "<TERM_IN>" value = "<IDS>"/><Attribute name = "<TERM_IN>" /><Attribute name = "<TERM_OUT>" /></Dataset></Query>'
+"""str: BioMart martservice query template; <TERM_IN>, <TERM_OUT>, and <IDS> are filled per batch."""
 
 DICT_DATABASES = {
     "BioMart": {
         "GET": {
-            "api_object": biomart.BioMart,
+            "api_object": LazyImport("nf_rnaseq.biomart", "BioMart"),
             "term_in": "ensembl_transcript_id_version",
             "term_out": "external_gene_name",
-            "url_base": 'http://www.ensembl.org/biomart/martservice?query=<?xml version="1.0" encoding="UTF-8"?><!DOCTYPE Query><Query  virtualSchemaName = "default" formatter = "TSV" header = "0" uniqueRows = "0" count = "" datasetConfigVersion = "0.6" ><Dataset name = "hsapiens_gene_ensembl" interface = "default" ><Filter name = "<TERM_IN>" value = "<IDS>"/><Attribute name = "<TERM_IN>" /><Attribute name = "<TERM_OUT>" /></Dataset></Query>',
+            "url_base": URL_BIOMART,
+            "headers": None,
+        },
+    },
+    "BioMartTranscript": {
+        "GET": {
+            "api_object": LazyImport("nf_rnaseq.biomart", "BioMart"),
+            "term_in": "ensembl_transcript_id",
+            "term_out": "external_gene_name",
+            "url_base": URL_BIOMART,
+            "headers": None,
+        },
+    },
+    "BioMartGene": {
+        "GET": {
+            "api_object": LazyImport("nf_rnaseq.biomart", "BioMart"),
+            "term_in": "ensembl_gene_id",
+            "term_out": "external_gene_name",
+            "url_base": URL_BIOMART,
+            "headers": None,
+        },
+    },
+    "BioMartGeneVersion": {
+        "GET": {
+            "api_object": LazyImport("nf_rnaseq.biomart", "BioMart"),
+            "term_in": "ensembl_gene_id_version",
+            "term_out": "external_gene_name",
+            "url_base": URL_BIOMART,
+            "headers": None,
+        },
+    },
+    # BioMart stores RefSeq mRNA accessions without versions
+    "BioMartRefSeq": {
+        "GET": {
+            "api_object": LazyImport("nf_rnaseq.biomart", "BioMart"),
+            "term_in": "refseq_mrna",
+            "term_out": "external_gene_name",
+            "url_base": URL_BIOMART,
             "headers": None,
         },
     },
+    # single POST request with the query XML in the body, avoiding URL length limits
+    "BioMartPOST": {
+        "POST": {
+            "api_object": LazyImport("nf_rnaseq.biomart", "BioMartPOST"),
+            "term_in": "ensembl_transcript_id_version",
+            "term_out": "external_gene_name",
+            "url_base": URL_BIOMART,
+        },
+    },
     "HGNC": {
         "GET": {
-            "api_object": hgnc.HGNC,
+            "api_object": LazyImport("nf_rnaseq.hgnc", "HGNC"),
             "term_in": "mane_select",
             "term_out": "symbol",
             "url_base": "https://rest.genenames.org/fetch",
             "headers": "{'Accept': 'application/json'}",
         }
     },
+    # checks that gene symbols are approved HGNC symbols
+    "HGNCSymbol": {
+        "GET": {
+            "api_object": LazyImport("nf_rnaseq.hgnc", "HGNC"),
+            "term_in": "symbol",
+            "term_out": "symbol",
+            "url_base": "https://rest.genenames.org/fetch",
+            "headers": "{'Accept': 'application/json'}",
+        }
+    },
+    "LocalGTF": {
+        "GET": {
+            "api_object": LazyImport("nf_rnaseq.gtf", "LocalGTF"),
+            "term_in": "transcript_id",
+            "term_out": "gene_name",
+            # None uses the GTF path set by config.set_gtf
+            "url_base": None,
+            "headers": None,
+        },
+    },
+    "LocalGTFGene": {
+        "GET": {
+            "api_object": LazyImport("nf_rnaseq.gtf", "LocalGTF"),
+            "term_in": "gene_id",
+            "term_out": "gene_name",
+            "url_base": None,
+            "headers": None,
+        },
+    },
     "UniProt": {
         "GET": {
-            "api_object": uniprot.UniProt,
+            "api_object": LazyImport("nf_rnaseq.uniprot", "UniProt"),
             "term_in": "UniProtKB_AC-ID",
             "term_out": "Gene_Name",
             "url_base": "https://rest.uniprot.org/uniprotkb",
@@ -30,13 +138,13 @@ DICT_DATABASES = {
     },
     "UniProtBULK": {
         "POST": {
-            "api_object": uniprot.UniProtPOST,
+            "api_object": LazyImport("nf_rnaseq.uniprot", "UniProtPOST"),
             "term_in": "UniProtKB_AC-ID",
             "term_out": "Gene_Name",
             "url_base": "https://rest.uniprot.org/idmapping/run",
         },
         "GET": {
-            "api_object": uniprot.UniProtGET,
+            "api_object": LazyImport("nf_rnaseq.uniprot", "UniProtGET"),
             "term_in": "UniProtKB_AC-ID",
             "term_out": "Gene_Name",
             "url_base": "https://rest.uniprot.org/idmapping/status",
@@ -44,3 +152,94 @@ DICT_DATABASES = {
         },
     },
 }
+
+DICT_BATCH_SIZE = {
+    # used only if a fixed batch size is requested; otherwise packed by DICT_MAX_URL_LENGTH
+    "BioMart": 350,
+    "BioMartTranscript": 350,
+    "BioMartGene": 350,
+    "BioMartGeneVersion": 350,
+    "BioMartRefSeq": 350,
+    "BioMartPOST": 5000,
+    # identifiers are combined into one OR query per request; keeps the URL well under 8 kB
+    "HGNC": 200,
+    "HGNCSymbol": 200,
+    "LocalGTF": 100000,
+    "LocalGTFGene": 100000,
+    "UniProt": 1,
+    # 10,000: Total number of "mapped to" ids allowed with filtering; decreased to allow for multi-mapping
+    "UniProtBULK": 5000,
+}
+"""dict[str, int]: Default number of identifiers per request for each database in DICT_DATABASES."""
+
+DICT_MAX_URL_LENGTH = {
+    # Ensembl returns 414 Request-URI Too Large above ~8 kB
+    "BioMart": 8000,
+    "BioMartTranscript": 8000,
+    "BioMartGene": 8000,
+    "BioMartGeneVersion": 8000,
+    "BioMartRefSeq": 8000,
+}
+"""dict[str, int]: Maximum encoded GET URL length for databases whose batches are packed by URL length."""
+
+DICT_EXPIRE_AFTER = {
+    # UniProtBULK: idmapping job IDs and results are retained for 7 days
+    "rest.uniprot.org/idmapping/*": 7 * 24 * 60 * 60,
+    # UniProt
+    "rest.uniprot.org/uniprotkb/*": 30 * 24 * 60 * 60,
+    # BioMart and BioMartPOST: Ensembl releases roughly quarterly
+    "www.ensembl.org/biomart/*": 30 * 24 * 60 * 60,
+    # HGNC
+    "rest.genenames.org/*": 30 * 24 * 60 * 60,
+}
+"""dict[str, int]: Seconds cached responses are kept per database URL pattern; the first matching pattern applies."""
+
+DICT_RATE_LIMIT = {
+    # conservative limits shared by all get_gene_name processes using the same requests cache
+    "rest.uniprot.org": (10, 20),
+    "www.ensembl.org": (5, 10),
+    "rest.genenames.org": (10, 10),
+}
+"""dict[str, tuple[float, int]]: (Requests per second, burst) per host; other hosts are not rate limited."""
+
+DICT_ID_ROUTES = {
+    # GENCODE appends _PAR_Y to transcripts on the pseudoautosomal region of chrY
+    "ensembl_transcript_version": (r"ENST\d{11}\.\d+(?:_PAR_Y)?", "BioMart"),
+    "ensembl_transcript": (r"ENST\d{11}", "BioMartTranscript"),
+    "ensembl_gene_version": (r"ENSG\d{11}\.\d+(?:_PAR_Y)?", "BioMartGeneVersion"),
+    "ensembl_gene": (r"ENSG\d{11}", "BioMartGene"),
+    # BioMartRefSeq strips versions; refseq_mrna only covers NM_, so NR_ IDs are left unclassified
+    "refseq_version": (r"NM_\d+\.\d+", "BioMartRefSeq"),
+    "refseq": (r"NM_\d+", "BioMartRefSeq"),
+    # https://www.uniprot.org/help/accession_numbers with optional isoform suffix
+    "uniprot": (r"(?:[OPQ][0-9][A-Z0-9]{3}[0-9]|[A-NR-Z][0-9](?:[A-Z][A-Z0-9]{2}[0-9]){1,2})(?:-\d+)?", "UniProtBULK"),
+    "gene_symbol": (r"[A-Za-z][A-Za-z0-9]*(?:[-.@][A-Za-z0-9]+)*", "HGNCSymbol"),
+}
+"""dict[str, tuple[str, str]]: (Full-match regex, database in DICT_DATABASES) per identifier class; the first matching class applies."""
+
+DICT_TRANSCRIPT_DATABASE_ROUTES = {
+    # offline: every Ensembl class is mapped from the GTF so that no Ensembl ID is sent to BioMart
+    "LocalGTF": {
+        "ensembl_transcript_version": "LocalGTF",
+        "ensembl_transcript": "LocalGTF",
+        "ensembl_gene_version": "LocalGTFGene",
+        "ensembl_gene": "LocalGTFGene",
+    },
+}
+"""dict[str, dict[str, str]]: Routes replaced by route_ids -t per database; any other database replaces only ensembl_transcript_version."""
+
+DICT_NORMALIZE = {
+    # Ensembl, RefSeq, and UniProt identifiers are upper case
+    # BioMart does not know the GENCODE _PAR_Y suffix; chrY copies share the gene name of the chrX original
+    "BioMart": {"strip_par_y": True, "uppercase": True},
+    "BioMartPOST": {"strip_par_y": True, "uppercase": True},
+    "BioMartGeneVersion": {"strip_par_y": True, "uppercase": True},
+    # term_in is unversioned, so every version of an identifier shares one request and cache entry
+    "BioMartTranscript": {"strip_version": True, "uppercase": True},
+    "BioMartGene": {"strip_version": True, "uppercase": True},
+    "BioMartRefSeq": {"strip_version": True, "uppercase": True},
+    "HGNC": {"uppercase": True},
+    "UniProt": {"uppercase": True},
+    "UniProtBULK": {"uppercase": True},
+}
+"""dict[str, dict[str, bool]]: Keyword arguments of normalize.normalize_id per database; IDs are always de-duplicated."""
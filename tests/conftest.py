@@ -0,0 +1,90 @@
+import importlib.util
+import json
+import os
+import sys
+
+import pytest
+import requests
+
+from nf_rnaseq import requests_wrapper
+
+PATH_ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+
+def load_script(path: str):
+    """Import a script by its path relative to the repository root and register it in sys.modules by file name."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, os.path.join(PATH_ROOT, path))
+        module = importlib.util.module_from_spec(spec)
+        # register so that functions can be pickled for process pools
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
+@pytest.fixture(scope="session")
+def merge_featureCounts():
+    return load_script(os.path.join("nextflow", "bin", "merge_featureCounts.py"))
+
+
+@pytest.fixture(scope="session")
+def annotate_featureCounts():
+    return load_script(os.path.join("nextflow", "bin", "annotate_featureCounts.py"))
+
+
+@pytest.fixture(scope="session")
+def aggregate_featureCounts(merge_featureCounts):
+    # aggregate_featureCounts.py imports merge_featureCounts from the same directory
+    return load_script(os.path.join("nextflow", "bin", "aggregate_featureCounts.py"))
+
+
+@pytest.fixture(scope="session")
+def benchmark_api():
+    return load_script(os.path.join("benchmarks", "benchmark_api.py"))
+
+
+class FakeSession:
+    """Session returning a canned response per URL, or the same response for every URL, and recording requests."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.list_requests = []
+
+    def request(self, method, url, **kwargs):
+        self.list_requests.append((method, url, kwargs))
+        if isinstance(self.responses, dict):
+            return self.responses[url]
+        return self.responses
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+
+@pytest.fixture
+def make_response():
+    """Build a requests.Response with a JSON or text body."""
+
+    def make(status_code: int = 200, json_body=None, text: str = "", headers: dict | None = None):
+        response = requests.Response()
+        response.status_code = status_code
+        response._content = (json.dumps(json_body) if json_body is not None else text).encode()
+        response.headers.update(headers or {})
+        return response
+
+    return make
+
+
+@pytest.fixture
+def fake_session(monkeypatch):
+    """Replace the shared cached session with a FakeSession of the given responses."""
+
+    def patch(responses):
+        session = FakeSession(responses)
+        monkeypatch.setattr(requests_wrapper, "get_cached_session", lambda: session)
+        return session
+
+    return patch
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from nf_rnaseq import results
+from nf_rnaseq.cli import get_gene_name
+
+
+@pytest.fixture
+def paths(tmp_path):
+    result = results.GeneNameResult.from_lists(
+        ["ENST1.1", "ENST2.1", "ENST3.1", "ENST4.1"],
+        [["GENE1"], ["GENE1", "GENE2"], [None], ["GENE2"]],
+    )
+    (tmp_path / "gene_names.jsonl").write_text(get_gene_name.format_jsonl(result, "BioMart"))
+    pd.DataFrame(
+        {"Geneid": ["ENST1.1", "ENST2.1", "ENST3.1", "ENST4.1"], "S1": [1, 10, 100, 1000], "S2": [2, 20, 200, 2000]}
+    ).to_csv(tmp_path / "test_featureCounts.csv", index=False)
+    return str(tmp_path / "test_featureCounts.csv"), [str(tmp_path / "gene_names.jsonl")]
+
+
+@pytest.mark.parametrize(
+    "rule, drop_unmapped, expected",
+    [
+        ("split", False, {"ENST3.1": [100, 200], "GENE1": [6, 12], "GENE2": [1005, 2010]}),
+        ("first", False, {"ENST3.1": [100, 200], "GENE1": [11, 22], "GENE2": [1000, 2000]}),
+        ("all", True, {"GENE1": [11, 22], "GENE2": [1010, 2020]}),
+        ("drop", True, {"GENE1": [1, 2], "GENE2": [1000, 2000]}),
+    ],
+)
+def test_aggregate_rules(aggregate_featureCounts, paths, tmp_path, monkeypatch, rule, drop_unmapped, expected):
+    monkeypatch.chdir(tmp_path)
+    path_counts, list_annotation = paths
+
+    aggregate_featureCounts.aggregate_featureCounts(
+        path_counts, "test", list_annotation=list_annotation, rule=rule, drop_unmapped=drop_unmapped
+    )
+
+    df = pd.read_csv(tmp_path / "test_featureCounts_gene.csv", index_col=0)
+    assert df.columns.tolist() == ["S1", "S2"]
+    assert {gene: row.tolist() for gene, row in df.iterrows()} == expected
+
+
+def test_aggregate_from_gtf_matches_annotation(aggregate_featureCounts, paths, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path_counts, _ = paths
+    with open(tmp_path / "test.gtf", "w") as f:
+        for transcript_id, gene_name in [("ENST1", "GENE1"), ("ENST2", "GENE1"), ("ENST4", "GENE2")]:
+            f.write(
+                f'chr1\tHAVANA\ttranscript\t1\t100\t.\t+\t.\tgene_id "G"; transcript_id "{transcript_id}"; '
+                f'transcript_version "1"; gene_name "{gene_name}";\n'
+            )
+
+    df = aggregate_featureCounts.aggregate_featureCounts(
+        path_counts, "test", path_gtf=str(tmp_path / "test.gtf"), drop_unmapped=True
+    )
+
+    assert df["gene"].tolist() == ["GENE1", "GENE2"]
+    np.testing.assert_array_equal(df[["S1", "S2"]].to_numpy(), [[11, 22], [1000, 2000]])
@@ -0,0 +1,39 @@
+import sys
+
+import pandas as pd
+
+from nf_rnaseq import results
+from nf_rnaseq.cli import get_gene_name
+
+
+def test_jsonl_output_joins_onto_count_matrix(annotate_featureCounts, tmp_path, monkeypatch):
+    result = results.GeneNameResult.from_lists(
+        ["ENST1.1", "ENST2.1", "ENST3.1"],
+        [["GENE1"], ["GENE2A", "GENE2B"], [None]],
+    )
+    (tmp_path / "BioMart.jsonl").write_text(get_gene_name.format_jsonl(result, "BioMart"))
+    (tmp_path / "unclassified.jsonl").write_text("")
+    pd.DataFrame({"Geneid": ["ENST3.1", "ENST2.1", "ENST4.1", "ENST1.1"], "S1": [1, 2, 3, 4]}).to_csv(
+        tmp_path / "test_featureCounts.csv", index=False
+    )
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "annotate_featureCounts.py",
+            "-c",
+            str(tmp_path / "test_featureCounts.csv"),
+            "-a",
+            str(tmp_path / "BioMart.jsonl"),
+            str(tmp_path / "unclassified.jsonl"),
+        ],
+    )
+    annotate_featureCounts.main()
+
+    df = pd.read_csv(tmp_path / "test_featureCounts_annotated.csv")
+    assert df.columns.tolist() == ["Geneid", "gene_name", "source", "S1"]
+    assert df["Geneid"].tolist() == ["ENST3.1", "ENST2.1", "ENST4.1", "ENST1.1"]
+    assert df["gene_name"].fillna("").tolist() == ["", "GENE2A;GENE2B", "", "GENE1"]
+    assert df["source"].fillna("").tolist() == ["BioMart", "BioMart", "", "BioMart"]
+    assert df["S1"].tolist() == [1, 2, 3, 4]
@@ -0,0 +1,45 @@
+from requests.utils import requote_uri
+
+from nf_rnaseq import batching, biomart, variables
+from nf_rnaseq.api_schema import BatchTooLargeError
+
+
+def test_pack_by_url_length_respects_limit():
+    dict_get = variables.DICT_DATABASES["BioMart"]["GET"]
+    list_ids = [f"ENST{i:011d}.{i % 20}" for i in range(2000)]
+
+    list_batches = batching.pack_by_url_length(
+        list_ids, dict_get["url_base"], dict_get["term_in"], dict_get["term_out"], 8000
+    )
+
+    assert [i for batch in list_batches for i in batch] == list_ids
+    list_len = [
+        len(
+            requote_uri(
+                biomart.format_query_url(
+                    dict_get["url_base"], ",".join(batch), dict_get["term_in"], dict_get["term_out"]
+                )
+            )
+        )
+        for batch in list_batches
+    ]
+    assert max(list_len) <= 8000
+    # batches are packed tightly: adding the next ID would exceed the limit
+    assert all(length + len(batch[0]) + 1 > 8000 for length, batch in zip(list_len[:-1], list_batches[1:], strict=True))
+
+
+def test_query_with_split_halves_rejected_batches():
+    list_calls = []
+
+    def query_fn(list_ids):
+        list_calls.append(len(list_ids))
+        if len(list_ids) > 3:
+            raise BatchTooLargeError("414")
+        return list_ids
+
+    list_ids = [str(i) for i in range(10)]
+    list_results = batching.query_with_split(query_fn, list_ids)
+
+    assert [i for result in list_results for i in result] == list_ids
+    assert max(len(result) for result in list_results) <= 3
+    assert list_calls[0] == 10
@@ -0,0 +1,22 @@
+import pytest
+
+
+@pytest.fixture
+def emulator(benchmark_api):
+    emulator_config = benchmark_api.EmulatorConfig(rate_429=0.3, job_delay=0.05, page_size=7, seed=1)
+    with benchmark_api.APIEmulator(emulator_config) as emulator:
+        yield emulator
+
+
+@pytest.mark.parametrize("database", ["BioMart", "BioMartPOST", "HGNC", "UniProtBULK"])
+def test_benchmark_against_emulator(benchmark_api, emulator, database, tmp_path):
+    list_rows = benchmark_api.run_benchmark(
+        emulator, database, 20, batch_size=10, workers=2, polling_interval=0.01, cache_dir=str(tmp_path)
+    )
+
+    cold, warm = list_rows
+    assert cold["ids"] == warm["ids"] == 20
+    assert cold["cache_hit_rate"] == 0
+    assert warm["cache_hit_rate"] == 1
+    assert warm["http_requests"] == 0
+    assert emulator.counts[429] > 0
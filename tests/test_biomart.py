@@ -0,0 +1,40 @@
+from nf_rnaseq import biomart, variables
+
+
+def test_biomart_post_sends_sorted_ids_in_body(fake_session, make_response):
+    session = fake_session(make_response(text="ENST2.1\tGENE2\nENST1.1\tGENE1\nENST1.1\tGENE1B\n"))
+
+    dict_post = variables.DICT_DATABASES["BioMartPOST"]["POST"]
+    api_obj = biomart.BioMartPOST(
+        identifier="[ENST2.1, ENST1.1, ENST3.1, ENST1.1]",
+        term_in=dict_post["term_in"],
+        term_out=dict_post["term_out"],
+        url_base=dict_post["url_base"],
+    )
+
+    method, url, kwargs = session.list_requests[0]
+    assert (method, url) == ("POST", "http://www.ensembl.org/biomart/martservice")
+    assert 'value = "ENST1.1,ENST2.1,ENST3.1"' in kwargs["data"]["query"]
+    assert dict(zip(*api_obj.result.to_lists(), strict=True)) == {
+        "ENST2.1": ["GENE2"],
+        "ENST1.1": ["GENE1", "GENE1B"],
+        "ENST3.1": [None],
+    }
+
+
+def test_biomart_error_body_is_not_parsed(fake_session, make_response):
+    fake_session(make_response(text="Query ERROR: caught BioMart::Exception::Database: Error during query execution\n"))
+
+    dict_post = variables.DICT_DATABASES["BioMartPOST"]["POST"]
+    api_obj = biomart.BioMartPOST(
+        identifier="ENST1.1,ENST2.1",
+        term_in=dict_post["term_in"],
+        term_out=dict_post["term_out"],
+        url_base=dict_post["url_base"],
+    )
+
+    assert not api_obj.ok
+    assert dict(zip(*api_obj.result.to_lists(), strict=True)) == {
+        "ENST1.1": [None],
+        "ENST2.1": [None],
+    }
@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+
+from nf_rnaseq import config, normalize, results
+from nf_rnaseq.cli import get_gene_name
+
+
+def fake_query_database(database, inputs_ids):
+    list_ids = inputs_ids.split(",")
+    return results.GeneNameResult.from_lists(list_ids, [f"GENE_{i}" for i in list_ids])
+
+
+def test_query_database_batches_preserves_order(monkeypatch):
+    list_normalized = []
+    normalize_ids = normalize.normalize_ids
+    monkeypatch.setattr(normalize, "normalize_ids", lambda *args: list_normalized.append(args) or normalize_ids(*args))
+    monkeypatch.setattr(
+        get_gene_name,
+        "query_api_client",
+        lambda database, inputs_ids: SimpleNamespace(ok=True, result=fake_query_database(database, inputs_ids)),
+    )
+    list_ids = [f"ID{i}" for i in range(23)]
+
+    list_results = get_gene_name.query_database_batches("BioMart", list_ids, batch_size=5, workers=3)
+
+    assert [len(result) for result in list_results] == [5, 5, 5, 5, 3]
+    assert [i for result in list_results for i in result.identifiers] == list_ids
+    # normalized once for the whole list, not again per batch
+    assert len(list_normalized) == 1
+
+    str_out = "".join(get_gene_name.format_output(result, "BioMart", "\t") for result in list_results)
+    assert len(str_out.splitlines()) == len(list_ids)
+
+
+def test_query_database_uses_lookup_store(monkeypatch, tmp_path):
+    list_queried = []
+
+    def fake_query_api_client(database, inputs_ids):
+        list_queried.append(inputs_ids)
+        return SimpleNamespace(ok=True, result=fake_query_database(database, inputs_ids))
+
+    monkeypatch.setattr(get_gene_name, "query_api_client", fake_query_api_client)
+    monkeypatch.setenv(config.LOOKUP_STORE_VAR, str(tmp_path / "lookup.sqlite"))
+
+    get_gene_name.query_database("BioMart", "ID1,ID2")
+    result = get_gene_name.query_database("BioMart", "[ID2, ID3, ID1]")
+
+    assert list_queried == ["ID1,ID2", "ID3"]
+    assert result.to_lists() == (["ID2", "ID3", "ID1"], [["GENE_ID2"], ["GENE_ID3"], ["GENE_ID1"]])
+
+
+def test_lookup_store_keeps_only_successful_hits(monkeypatch, tmp_path):
+    list_queried = []
+
+    def fake_query_api_client(database, inputs_ids):
+        list_queried.append(inputs_ids)
+        list_ids = inputs_ids.split(",")
+        if len(list_queried) == 1:
+            # a failed query, with an unrelated identifier parsed from the error body
+            result = results.GeneNameResult.from_lists([*list_ids, "ERROR"], [None] * 3)
+            return SimpleNamespace(ok=False, result=result)
+        list_gene_names = ["GENE_ID1" if i == "ID1" else None for i in list_ids]
+        return SimpleNamespace(ok=True, result=results.GeneNameResult.from_lists(list_ids, list_gene_names))
+
+    monkeypatch.setattr(get_gene_name, "query_api_client", fake_query_api_client)
+    monkeypatch.setenv(config.LOOKUP_STORE_VAR, str(tmp_path / "lookup.sqlite"))
+
+    result = get_gene_name.query_database("BioMart", "ID1,ID2")
+    assert result.identifiers.tolist() == ["ID1", "ID2"]
+    get_gene_name.query_database("BioMart", "ID1,ID2")
+    get_gene_name.query_database("BioMart", "ID1,ID2")
+
+    # nothing stored from the failed query and the miss ID2 is queried again
+    assert list_queried == ["ID1,ID2", "ID1,ID2", "ID2"]
+
+
+def test_stream_database_batches_uses_lookup_store(monkeypatch, tmp_path):
+    from nf_rnaseq import scheduler
+
+    list_queried = []
+
+    def fake_run_jobs(database, list_ids, batch_size, workers, stream=False):
+        list_queried.append(list_ids)
+        result = fake_query_database(database, ",".join(list_ids))
+        return [
+            SimpleNamespace(ok=True, iter_results=lambda: iter([result.take([0]), result.take(range(1, len(result)))]))
+        ]
+
+    monkeypatch.setattr(scheduler, "run_jobs", fake_run_jobs)
+    monkeypatch.setenv(config.LOOKUP_STORE_VAR, str(tmp_path / "lookup.sqlite"))
+
+    list(get_gene_name.stream_database_batches("UniProtBULK", ["P1", "P2"]))
+    list_results = list(get_gene_name.stream_database_batches("UniProtBULK", ["P3", "P2", "P1"]))
+
+    assert list_queried == [["P1", "P2"], ["P3"]]
+    result = results.GeneNameResult.concat(list_results)
+    assert dict(zip(*result.to_lists(), strict=True)) == {"P1": ["GENE_P1"], "P2": ["GENE_P2"], "P3": ["GENE_P3"]}
@@ -0,0 +1,56 @@
+import gzip
+import os
+
+import pytest
+
+from nf_rnaseq import gtf
+
+GTF_LINES = [
+    "#!genome-build GRCh38.p14",
+    '1\tensembl\tgene\t1\t100\t.\t+\t.\tgene_id "ENSG00000000001"; gene_version "1"; gene_name "GENE1";',
+    '1\tensembl\ttranscript\t1\t100\t.\t+\t.\tgene_id "ENSG00000000001"; transcript_id "ENST00000000001"; transcript_version "3"; gene_name "GENE1";',
+    '1\tensembl\texon\t1\t50\t.\t+\t.\tgene_id "ENSG00000000001"; transcript_id "ENST00000000001"; transcript_version "3"; gene_name "GENE1";',
+    '2\tensembl\ttranscript\t1\t100\t.\t-\t.\tgene_id "ENSG00000000002"; transcript_id "ENST00000000002"; transcript_version "1"; gene_name "GENE2";',
+]
+
+
+@pytest.fixture(params=["annotation.gtf", "annotation.gtf.gz"])
+def path_gtf(request, tmp_path):
+    path = str(tmp_path / request.param)
+    with gzip.open(path, "wt") if path.endswith(".gz") else open(path, "w") as f:
+        f.write("\n".join(GTF_LINES) + "\n")
+    gtf.load_gtf_index.cache_clear()
+    return path
+
+
+def test_local_gtf_maps_transcripts(path_gtf):
+    api_obj = gtf.LocalGTF(
+        identifier="[ENST00000000001.3, ENST00000000002, ENST00000000003.1]",
+        term_in="transcript_id",
+        term_out="gene_name",
+        url_base=path_gtf,
+    )
+
+    assert api_obj.result.to_lists() == (
+        ["ENST00000000001.3", "ENST00000000002", "ENST00000000003.1"],
+        [["GENE1"], ["GENE2"], [None]],
+    )
+    assert os.path.exists(gtf.get_index_path(path_gtf, "transcript_id", "gene_name"))
+
+
+def test_local_gtf_maps_genes(path_gtf):
+    api_obj = gtf.LocalGTF(
+        identifier="ENSG00000000001.1,ENSG00000000002",
+        term_in="gene_id",
+        term_out="gene_name",
+        url_base=path_gtf,
+    )
+
+    assert api_obj.result.to_lists() == (["ENSG00000000001.1", "ENSG00000000002"], [["GENE1"], ["GENE2"]])
+
+
+def test_gtf_index_is_reused(path_gtf):
+    dict_built = gtf.load_gtf_index(path_gtf, "transcript_id", "gene_name")
+    gtf.load_gtf_index.cache_clear()
+    dict_loaded = gtf.load_gtf_index(path_gtf, "transcript_id", "gene_name")
+    assert dict_loaded == dict_built
@@ -0,0 +1,28 @@
+from nf_rnaseq import hgnc, variables
+
+
+def test_hgnc_batch_is_one_or_query_split_by_input(fake_session, make_response):
+    list_docs = [
+        {"symbol": "GENE1", "mane_select": ["ENST1.1", "NM_1.1"]},
+        {"symbol": "GENE2", "mane_select": ["ENST2.1", "NM_2.1"]},
+    ]
+    session = fake_session(make_response(json_body={"response": {"numFound": len(list_docs), "docs": list_docs}}))
+
+    dict_get = variables.DICT_DATABASES["HGNC"]["GET"]
+    api_obj = hgnc.HGNC(
+        identifier="[NM_2.1, ENST1.1, NM_3.1, NM_1.1]",
+        term_in=dict_get["term_in"],
+        term_out=dict_get["term_out"],
+        url_base=dict_get["url_base"],
+        headers=dict_get["headers"],
+    )
+
+    assert [url for _, url, _ in session.list_requests] == [
+        "https://rest.genenames.org/fetch/mane_select/ENST1.1+OR+NM_1.1+OR+NM_2.1+OR+NM_3.1"
+    ]
+    assert dict(zip(*api_obj.result.to_lists(), strict=True)) == {
+        "ENST1.1": ["GENE1"],
+        "NM_1.1": ["GENE1"],
+        "NM_2.1": ["GENE2"],
+        "NM_3.1": [None],
+    }
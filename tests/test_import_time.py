@@ -0,0 +1,32 @@
+import json
+import subprocess
+import sys
+
+# fails if an eager import of a client module creeps back into the get_gene_name startup path
+MAX_IMPORT_SECONDS = 1.0
+HEAVY_MODULES = ("numpy", "pandas", "requests", "requests_cache")
+
+CODE = """
+import json, sys, time
+t0 = time.perf_counter()
+import nf_rnaseq.cli.get_gene_name
+from nf_rnaseq import variables
+dict_databases = variables.DICT_DATABASES
+t1 = time.perf_counter()
+print(json.dumps({"seconds": t1 - t0, "modules": sorted(m for m in %r if m in sys.modules)}))
+"""
+
+
+def test_get_gene_name_cold_start():
+    out = subprocess.run([sys.executable, "-c", CODE % (HEAVY_MODULES,)], capture_output=True, text=True, check=True)
+    dict_out = json.loads(out.stdout)
+    assert dict_out["modules"] == []
+    assert dict_out["seconds"] < MAX_IMPORT_SECONDS
+
+
+def test_lazy_import_loads_client_on_use():
+    from nf_rnaseq import hgnc, variables
+
+    api_object = variables.DICT_DATABASES["HGNC"]["GET"]["api_object"]
+    assert api_object.load() is hgnc.HGNC
+    assert api_object.process_identifier is hgnc.HGNC.process_identifier
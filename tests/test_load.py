@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from nf_rnaseq import load, results
+from nf_rnaseq.cli import get_gene_name
+
+RESULT = results.GeneNameResult.from_lists(
+    ["ENST1.1", "ENST2.1", "ENST3.1", "P1"],
+    [["GENE1"], ["GENE2A", "GENE2B"], [None], float("nan")],
+)
+
+EXPECTED = pd.DataFrame(
+    {
+        "original_id": ["ENST1.1", "ENST2.1", "ENST2.1", "ENST3.1", "P1"],
+        "gene_name": ["GENE1", "GENE2A", "GENE2B", None, None],
+        "source": ["BioMart"] * 5,
+    }
+)
+
+
+@pytest.mark.parametrize("output", ["tsv", "jsonl"])
+def test_load_gene_names(output, tmp_path):
+    path = tmp_path / f"BioMart.{output}"
+    if output == "tsv":
+        path.write_text(get_gene_name.format_output(RESULT, "BioMart", "\t"))
+    else:
+        path.write_text(get_gene_name.format_jsonl(RESULT, "BioMart"))
+
+    df = load.load_gene_names(str(path))
+
+    assert (df.dtypes == "category").all()
+    pd.testing.assert_frame_equal(df.astype(object), EXPECTED.astype(object))
+
+
+def test_load_gene_names_parquet_roundtrip(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "BioMart.jsonl"
+    path.write_text(get_gene_name.format_jsonl(RESULT, "BioMart"))
+
+    df = load.load_gene_names(str(path))
+    load.write_gene_names(df, str(tmp_path / "gene_names.parquet"))
+
+    pd.testing.assert_frame_equal(load.load_gene_names(str(tmp_path / "gene_names.parquet")), df)
@@ -0,0 +1,222 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def write_featureCounts(path, sample, genes, counts):
+    with open(path, "w") as f:
+        f.write('# Program:featureCounts v2.0.6; Command:"featureCounts" "-o" "out"\n')
+        f.write(f"Geneid\tChr\tStart\tEnd\tStrand\tLength\t{sample}\n")
+        for gene, count in zip(genes, counts, strict=True):
+            f.write(f"{gene}\tchr1\t1\t100\t+\t{len(gene) * 10}\t{count}\n")
+    with open(f"{path}.summary", "w") as f:
+        f.write(f"Status\t{sample}\nAssigned\t{sum(counts)}\nUnassigned_NoFeatures\t{len(genes)}\n")
+    return str(path)
+
+
+@pytest.fixture
+def list_files(tmp_path):
+    rng = np.random.default_rng(0)
+    genes = [f"ENST{i:011d}.1" for i in range(50)]
+    list_out = []
+    for i in range(4):
+        list_out.append(
+            write_featureCounts(
+                tmp_path / f"S{i}.featureCounts.txt",
+                f"S{i}.Aligned.sortedByCoord.out.bam",
+                genes,
+                rng.integers(0, 1000, len(genes)),
+            )
+        )
+    return list_out
+
+
+def read_output(path, prefix):
+    with open(os.path.join(path, f"{prefix}_featureCounts.csv"), "rb") as f:
+        return f.read()
+
+
+def test_stream_matches_merge(merge_featureCounts, list_files, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    merge_featureCounts.merge_featureCounts(list_files, "merge", mode="merge")
+    merge_featureCounts.merge_featureCounts(list_files, "stream", mode="stream")
+    assert read_output(tmp_path, "merge") == read_output(tmp_path, "stream")
+
+
+def test_stream_reindexes_out_of_order_genes(merge_featureCounts, list_files, tmp_path, monkeypatch):
+    genes = [f"ENST{i:011d}.1" for i in range(50)]
+    list_files.append(
+        write_featureCounts(
+            tmp_path / "S_reordered.featureCounts.txt",
+            "S_reordered.bam",
+            genes[::-1][:-1],
+            range(49),
+        )
+    )
+    monkeypatch.chdir(tmp_path)
+    merge_featureCounts.merge_featureCounts(list_files, "merge", mode="merge")
+    merge_featureCounts.merge_featureCounts(list_files, "stream", mode="stream")
+    assert read_output(tmp_path, "merge") == read_output(tmp_path, "stream")
+
+
+def test_stream_and_merge_read_the_same_count_column(merge_featureCounts, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    list_files = []
+    for i in range(2):
+        path = tmp_path / f"S{i}.featureCounts.txt"
+        with open(path, "w") as f:
+            f.write(f"Geneid\tChr\tStart\tEnd\tStrand\tLength\tS{i}.bam\tS{i}_extra.bam\n")
+            f.write(f"ENST1\tchr1\t1\t100\t+\t100\t{i}\t{i + 10}\n")
+        list_files.append(str(path))
+
+    merge_featureCounts.merge_featureCounts(list_files, "merge", mode="merge")
+    merge_featureCounts.merge_featureCounts(list_files, "stream", mode="stream")
+    assert read_output(tmp_path, "stream") == read_output(tmp_path, "merge")
+    assert read_output(tmp_path, "stream") == b"Geneid,S0.bam,S1.bam\nENST1,0,1\n"
+
+
+def test_stream_workers_matches_serial(merge_featureCounts, list_files, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    merge_featureCounts.merge_featureCounts(list_files, "serial", workers=1)
+    merge_featureCounts.merge_featureCounts(list_files, "parallel", workers=2)
+    assert read_output(tmp_path, "serial") == read_output(tmp_path, "parallel")
+
+
+def test_binary_formats_roundtrip(merge_featureCounts, list_files, tmp_path, monkeypatch):
+    from nf_rnaseq.load import load_count_matrix
+
+    monkeypatch.chdir(tmp_path)
+    merge_featureCounts.merge_featureCounts(list_files, "test", list_formats=["csv", "npy", "npz", "csr"])
+    df = pd.read_csv(tmp_path / "test_featureCounts.csv")
+
+    path_prefix = str(tmp_path / "test_featureCounts")
+    mat_npy, genes, samples = load_count_matrix(path_prefix)
+    assert isinstance(mat_npy, np.memmap)
+    np.testing.assert_array_equal(mat_npy, df.iloc[:, 1:].to_numpy())
+    np.testing.assert_array_equal(genes, df["Geneid"].to_numpy())
+    np.testing.assert_array_equal(samples, df.columns[1:].to_numpy())
+
+    os.remove(f"{path_prefix}.npy")
+    mat_npz, genes_npz, _ = load_count_matrix(path_prefix)
+    np.testing.assert_array_equal(mat_npz, mat_npy)
+    np.testing.assert_array_equal(genes_npz, genes)
+
+    os.remove(f"{path_prefix}.npz")
+    mat_csr, _, _ = load_count_matrix(path_prefix)
+    np.testing.assert_array_equal(mat_csr.toarray(), mat_npz)
+
+
+def test_incremental_appends_only_new_samples(merge_featureCounts, list_files, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    merge_featureCounts.merge_featureCounts(list_files, "full")
+    merge_featureCounts.merge_featureCounts(list_files[:2], "batch1")
+    merge_featureCounts.merge_featureCounts(
+        list_files,
+        "batch2",
+        existing=str(tmp_path / "batch1_featureCounts.csv"),
+    )
+    assert read_output(tmp_path, "full") == read_output(tmp_path, "batch2")
+
+    with open(tmp_path / "batch2_featureCounts.manifest.json") as f:
+        dict_manifest = json.load(f)
+    assert len(dict_manifest) == len(list_files)
+
+
+def test_incremental_skips_hashing_staged_symlinks(merge_featureCounts, list_files, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    merge_featureCounts.merge_featureCounts(list_files[:2], "batch1")
+
+    # Nextflow stages the same files as symlinks in a new work directory on every run
+    path_work = tmp_path / "work"
+    path_work.mkdir()
+    list_staged = []
+    for f in list_files:
+        path_link = path_work / os.path.basename(f)
+        path_link.symlink_to(f)
+        list_staged.append(str(path_link))
+
+    list_hashed = []
+    get_file_record = merge_featureCounts.get_file_record
+    monkeypatch.setattr(merge_featureCounts, "get_file_record", lambda f: list_hashed.append(f) or get_file_record(f))
+    merge_featureCounts.merge_featureCounts(
+        list_staged,
+        "batch2",
+        existing=str(tmp_path / "batch1_featureCounts.csv"),
+    )
+    assert list_hashed == list_staged[2:]
+
+
+def test_incremental_reads_csr_and_copies_unchanged(merge_featureCounts, list_files, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    merge_featureCounts.merge_featureCounts(list_files, "full")
+    merge_featureCounts.merge_featureCounts(list_files[:2], "batch1", list_formats=["csr"])
+    merge_featureCounts.merge_featureCounts(
+        list_files,
+        "batch2",
+        existing=str(tmp_path / "batch1_featureCounts.csr.npz"),
+    )
+    assert read_output(tmp_path, "full") == read_output(tmp_path, "batch2")
+
+    merge_featureCounts.merge_featureCounts(
+        list_files,
+        "batch3",
+        existing=str(tmp_path / "batch2_featureCounts.csv"),
+    )
+    assert read_output(tmp_path, "full") == read_output(tmp_path, "batch3")
+    assert os.path.exists(tmp_path / "batch3_featureCounts_summary.csv")
+
+
+def test_incremental_ignores_stale_binary_output(merge_featureCounts, list_files, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path_existing = str(tmp_path / "run_featureCounts.csv")
+    merge_featureCounts.merge_featureCounts(list_files[:1], "run", list_formats=["csv", "npy"])
+    # the csv and manifest are overwritten, the npy of the first run is left as is
+    merge_featureCounts.merge_featureCounts(list_files[:2], "run", existing=path_existing)
+    merge_featureCounts.merge_featureCounts(list_files[:3], "run", existing=path_existing)
+    merge_featureCounts.merge_featureCounts(list_files[:3], "full")
+    assert read_output(tmp_path, "run") == read_output(tmp_path, "full")
+
+    # a stale npy is not copied when there are no new files
+    merge_featureCounts.merge_featureCounts(list_files[:3], "copy", list_formats=["csv", "npy"], existing=path_existing)
+    assert np.load(tmp_path / "copy_featureCounts.npy").shape[1] == 3
+
+    with pytest.raises(ValueError, match="do not match its manifest"):
+        merge_featureCounts.merge_featureCounts(list_files, "run", existing=str(tmp_path / "run_featureCounts.npy"))
+
+
+def test_incremental_rejects_mismatched_genes(merge_featureCounts, list_files, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    merge_featureCounts.merge_featureCounts(list_files, "batch1")
+    path_new = write_featureCounts(tmp_path / "new.featureCounts.txt", "new.bam", ["ENSTX"], [1])
+    with pytest.raises(ValueError):
+        merge_featureCounts.merge_featureCounts(
+            [path_new],
+            "batch2",
+            existing=str(tmp_path / "batch1_featureCounts.csv"),
+        )
+
+
+def test_metadata_summary_and_normalization(merge_featureCounts, list_files, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    merge_featureCounts.merge_featureCounts(list_files, "test", list_normalize=["cpm", "tpm"])
+
+    df_counts = pd.read_csv(tmp_path / "test_featureCounts.csv")
+    df_metadata = pd.read_csv(tmp_path / "test_featureCounts_metadata.csv")
+    assert df_metadata.columns.tolist() == ["Geneid", "Chr", "Start", "End", "Strand", "Length"]
+    assert df_metadata["Geneid"].tolist() == df_counts["Geneid"].tolist()
+
+    df_summary = pd.read_csv(tmp_path / "test_featureCounts_summary.csv", index_col=0)
+    assert df_summary.index.tolist() == df_counts.columns[1:].tolist()
+    np.testing.assert_array_equal(df_summary["Assigned"], df_counts.iloc[:, 1:].sum(axis=0))
+    assert ((df_summary["Assigned_rate"] > 0) & (df_summary["Assigned_rate"] <= 1)).all()
+
+    counts = df_counts.iloc[:, 1:].to_numpy()
+    df_cpm = pd.read_csv(tmp_path / "test_featureCounts_cpm.csv")
+    np.testing.assert_allclose(df_cpm.iloc[:, 1:], counts / counts.sum(axis=0) * 1e6)
+
+    rpk = counts / (df_metadata["Length"].to_numpy()[:, None] / 1e3)
+    df_tpm = pd.read_csv(tmp_path / "test_featureCounts_tpm.csv")
+    np.testing.assert_allclose(df_tpm.iloc[:, 1:], rpk / rpk.sum(axis=0) * 1e6)
@@ -0,0 +1,65 @@
+import json
+from datetime import timedelta
+from types import SimpleNamespace
+
+from nf_rnaseq import metrics
+
+
+def make_response(from_cache=False, n_retries=0):
+    return SimpleNamespace(
+        url="https://rest.uniprot.org/idmapping/status/job1",
+        request=SimpleNamespace(method="GET"),
+        status_code=200,
+        from_cache=from_cache,
+        content=b"{}",
+        elapsed=timedelta(milliseconds=250),
+        raw=SimpleNamespace(retries=SimpleNamespace(history=[None] * n_retries)),
+    )
+
+
+def test_record_response_counts_cache_bytes_and_retries(monkeypatch):
+    registry = metrics.Metrics()
+    monkeypatch.setattr(metrics, "METRICS", registry)
+
+    metrics.record_response(make_response(n_retries=2))
+    metrics.record_response(make_response(from_cache=True))
+
+    labels = (("host", "rest.uniprot.org"), ("method", "GET"))
+    assert registry.counters[("http_requests", (("cache", "miss"), *labels, ("status", "200")))] == 1
+    assert registry.counters[("http_requests", (("cache", "hit"), *labels, ("status", "200")))] == 1
+    assert registry.counters[("http_bytes", labels)] == 2
+    assert registry.counters[("http_retries", labels)] == 2
+    assert registry.spans[("http_request", labels)] == [1, 0.25, 0.25]
+
+
+def test_write_json_and_prometheus(tmp_path):
+    registry = metrics.Metrics()
+    registry.inc("job_polls", client="UniProtGET", status="RUNNING")
+    registry.inc("job_polls", client="UniProtGET", status="RUNNING")
+    with registry.span("query_api", client="BioMart"):
+        pass
+
+    registry.write(str(tmp_path / "metrics.json"))
+    with open(tmp_path / "metrics.json") as f:
+        dict_metrics = json.loads(f.readline())
+    assert dict_metrics["counters"] == [
+        {"name": "job_polls", "labels": {"client": "UniProtGET", "status": "RUNNING"}, "value": 2}
+    ]
+    assert dict_metrics["spans"][0]["count"] == 1
+
+    registry.write(str(tmp_path / "metrics.prom"))
+    with open(tmp_path / "metrics.prom") as f:
+        list_lines = f.read().splitlines()
+    assert 'nf_rnaseq_job_polls_total{client="UniProtGET",status="RUNNING"} 2' in list_lines
+    assert 'nf_rnaseq_query_api_seconds_count{client="BioMart"} 1' in list_lines
+
+
+def test_record_response_counts_each_miss_once(monkeypatch):
+    registry = metrics.Metrics()
+    monkeypatch.setattr(metrics, "METRICS", registry)
+
+    response = make_response()
+    metrics.record_response(response)
+    metrics.record_response(response)
+
+    assert sum(registry.counters.values()) == 1 + len(response.content)
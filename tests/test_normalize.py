@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+from nf_rnaseq import normalize, results
+from nf_rnaseq.cli import get_gene_name
+
+
+def test_normalize_ids_strips_versions_and_maps_back():
+    list_ids = ["[ENST00000456328.15", " enst00000456328.16", "ENST00000456328.15", "ENST00000450305.2]"]
+
+    normalized = normalize.normalize_ids("BioMartTranscript", list_ids)
+
+    assert normalized.list_ids == ["ENST00000456328", "ENST00000450305"]
+    result = normalized.expand(results.GeneNameResult.from_lists(["ENST00000450305", "ENST00000456328"], ["B", "A"]))
+    assert dict(zip(*result.to_lists(), strict=True)) == {
+        "ENST00000450305.2": ["B"],
+        "ENST00000456328.15": ["A"],
+        "enst00000456328.16": ["A"],
+    }
+
+
+def test_normalize_ids_strips_par_y_for_versioned_biomart():
+    normalized = normalize.normalize_ids("BioMart", ["ENST00000381192.10_PAR_Y", "ENST00000381192.10"])
+
+    assert normalized.list_ids == ["ENST00000381192.10"]
+    result = normalized.expand(results.GeneNameResult.from_lists(["ENST00000381192.10"], ["SHOX"]))
+    assert result.to_lists() == (["ENST00000381192.10_PAR_Y", "ENST00000381192.10"], [["SHOX"], ["SHOX"]])
+
+
+def test_normalize_ids_keeps_versions_for_versioned_terms():
+    normalized = normalize.normalize_ids("BioMart", ["ENST00000456328.15", "ENST00000456328.16"])
+    assert normalized.list_ids == ["ENST00000456328.15", "ENST00000456328.16"]
+
+
+def test_query_database_sends_each_normalized_id_once(monkeypatch):
+    list_queried = []
+
+    def fake_query_api_client(database, inputs_ids):
+        list_queried.append(inputs_ids)
+        list_ids = inputs_ids.split(",")
+        return SimpleNamespace(
+            ok=True, result=results.GeneNameResult.from_lists(list_ids, [f"GENE_{i}" for i in list_ids])
+        )
+
+    monkeypatch.setattr(get_gene_name, "query_api_client", fake_query_api_client)
+
+    result = get_gene_name.query_database("BioMartGene", "[ENSG00000223972.4, ENSG00000223972.5, ENSG00000223972.5]")
+
+    assert list_queried == ["ENSG00000223972"]
+    assert result.to_lists() == (["ENSG00000223972.4", "ENSG00000223972.5"], [["GENE_ENSG00000223972"]] * 2)
@@ -0,0 +1,102 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from nf_rnaseq import rate_limiter, variables
+
+
+@pytest.fixture
+def path_limiter(tmp_path):
+    return str(tmp_path / "rate_limit.sqlite")
+
+
+def test_token_bucket_delays_after_burst(path_limiter, monkeypatch):
+    monkeypatch.setitem(variables.DICT_RATE_LIMIT, "example.org", (20, 2))
+    limiter = rate_limiter.RateLimiter(path_limiter)
+
+    t0 = time.perf_counter()
+    for _ in range(6):
+        limiter.acquire("example.org")
+    # 2 requests from the burst, then 4 at 20 per second
+    assert time.perf_counter() - t0 >= 0.2
+
+
+def test_retry_after_is_shared_between_limiters(path_limiter):
+    rate_limiter.RateLimiter(path_limiter).record("example.org", 429, retry_after=0.3)
+
+    t0 = time.perf_counter()
+    rate_limiter.RateLimiter(path_limiter).acquire("example.org")
+    assert time.perf_counter() - t0 >= 0.3
+
+
+def test_circuit_opens_after_consecutive_failures(path_limiter, monkeypatch):
+    monkeypatch.setattr(rate_limiter, "CIRCUIT_MAX_WAIT", 0.2)
+    monkeypatch.setattr(rate_limiter, "CIRCUIT_POLL_INTERVAL", 0.05)
+    limiter = rate_limiter.RateLimiter(path_limiter)
+    for _ in range(rate_limiter.CIRCUIT_FAILURES):
+        limiter.record("example.org", 503)
+
+    t0 = time.perf_counter()
+    with pytest.raises(rate_limiter.CircuitOpenError):
+        limiter.acquire("example.org")
+    assert time.perf_counter() - t0 >= 0.2
+    limiter.acquire("example.com")
+
+
+def test_half_open_circuit_holds_other_callers_until_trial_resolves(path_limiter, monkeypatch):
+    monkeypatch.setattr(rate_limiter, "CIRCUIT_COOLDOWN", 0.2)
+    monkeypatch.setattr(rate_limiter, "CIRCUIT_POLL_INTERVAL", 0.05)
+    limiter = rate_limiter.RateLimiter(path_limiter)
+    for _ in range(rate_limiter.CIRCUIT_FAILURES):
+        limiter.record("example.org", 501)
+    time.sleep(0.25)
+
+    # this caller claims the trial request; the others wait for its response instead of raising
+    limiter.acquire("example.org")
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list_futures = [
+            executor.submit(lambda: rate_limiter.RateLimiter(path_limiter).acquire("example.org") or time.monotonic())
+            for _ in range(4)
+        ]
+        time.sleep(0.1)
+        assert not any(future.done() for future in list_futures)
+        t_record = time.monotonic()
+        limiter.record("example.org", 200)
+        list_done = [future.result() for future in list_futures]
+    # released by the closed circuit, well before the claimed trial's cooldown ends
+    assert all(t_record <= t < t_record + 0.15 for t in list_done)
+
+
+def test_failed_trial_reopens_circuit(path_limiter, monkeypatch):
+    monkeypatch.setattr(rate_limiter, "CIRCUIT_COOLDOWN", 0.1)
+    monkeypatch.setattr(rate_limiter, "CIRCUIT_MAX_WAIT", 0)
+    limiter = rate_limiter.RateLimiter(path_limiter)
+    for _ in range(rate_limiter.CIRCUIT_FAILURES):
+        limiter.record("example.org", 503)
+    time.sleep(0.15)
+
+    limiter.acquire("example.org")
+    limiter.record("example.org", 503)
+    with pytest.raises(rate_limiter.CircuitOpenError):
+        limiter.acquire("example.org")
+
+
+def test_parse_retry_after():
+    assert rate_limiter.parse_retry_after("5") == 5
+    assert rate_limiter.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert rate_limiter.parse_retry_after("soon") is None
+    assert rate_limiter.parse_retry_after(None) is None
+
+
+def test_adapter_retries_429_through_limiter(benchmark_api, path_limiter):
+    emulator_config = benchmark_api.EmulatorConfig(rate_429=0.5, retry_after=0, seed=2)
+    with benchmark_api.APIEmulator(emulator_config) as emulator:
+        session = requests.Session()
+        adapter = rate_limiter.RateLimitedAdapter(rate_limiter.RateLimiter(path_limiter), retries=10)
+        session.mount("http://", adapter)
+        list_responses = [session.get(f"{emulator.url}/fetch/mane_select/NM_{i:06d}.1") for i in range(10)]
+
+    assert [response.status_code for response in list_responses] == [200] * 10
+    assert emulator.counts[429] > 0
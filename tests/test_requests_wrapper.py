@@ -0,0 +1,55 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from nf_rnaseq import config, requests_wrapper
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    monkeypatch.setenv(config.REQUESTS_CACHE_VAR, str(tmp_path / "requests_cache"))
+    requests_wrapper.get_cached_session.cache_clear()
+    yield requests_wrapper.get_cached_session()
+    requests_wrapper.get_cached_session.cache_clear()
+
+
+@pytest.fixture
+def emulator(benchmark_api):
+    with benchmark_api.APIEmulator(benchmark_api.EmulatorConfig(latency=0.3)) as emulator:
+        yield emulator
+
+
+def test_single_flight_sends_one_request_per_key(session, emulator):
+    url = f"{emulator.url}/fetch/mane_select/NM_000001.1"
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list_responses = list(executor.map(lambda _: session.get(url), range(4)))
+
+    assert [response.status_code for response in list_responses] == [200] * 4
+    assert sum(emulator.counts.values()) == 1
+    assert sum(getattr(response, "from_cache", False) for response in list_responses) == 3
+
+
+def test_responses_are_compressed(session, emulator, tmp_path):
+    session.get(f"{emulator.url}/fetch/mane_select/NM_000001.1")
+    with sqlite3.connect(tmp_path / "requests_cache.sqlite") as con:
+        (value,) = con.execute("SELECT value FROM responses").fetchone()
+        assert con.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    assert value[:1] == b"\x78"
+    assert requests_wrapper.maybe_decompress(b"\x80\x05legacy") == b"\x80\x05legacy"
+
+
+def test_prune_cache_evicts_least_recently_used(session, emulator, tmp_path):
+    emulator.config.latency = 0
+    list_urls = [f"{emulator.url}/fetch/mane_select/NM_{i:06d}.1" for i in range(5)]
+    for url in list_urls:
+        session.get(url)
+    session.get(list_urls[0])
+    session.cache.responses.flush_access()
+    with session.cache.responses.connection() as con:
+        max_size = max(size for (size,) in con.execute("SELECT length(value) FROM responses"))
+
+    n_removed = requests_wrapper.prune_cache(str(tmp_path / "requests_cache"), 2 * max_size)
+
+    assert n_removed == 3
+    assert [requests_wrapper.is_cached(session, url) for url in list_urls] == [True, False, False, False, True]
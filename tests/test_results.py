@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from nf_rnaseq import results
+
+
+def test_aggregate_gene_names_matches_groupby():
+    rng = np.random.default_rng(0)
+    list_identifier = [f"ENST{i}" for i in range(200)]
+    ids_in = rng.choice(list_identifier[:150], 400).tolist()
+    names_out = [f"GENE{i}" for i in rng.integers(0, 50, 400)]
+
+    result = results.aggregate_gene_names(list_identifier, ids_in, names_out)
+    list_ids, list_names = result.to_lists()
+
+    df_agg = pd.DataFrame({"in": ids_in, "out": names_out}).groupby("in", sort=False).agg(list).reset_index()
+    list_missing = [i for i in list_identifier if i not in df_agg["in"].tolist()]
+    assert list_ids == df_agg["in"].tolist() + list_missing
+    assert list_names == df_agg["out"].tolist() + [[None]] * len(list_missing)
+    assert result.offsets[-1] == len(result.gene_names)
+
+
+def test_aggregate_gene_names_unique_and_empty():
+    result = results.aggregate_gene_names(["A", "B", "C"], ["A", "A", "B"], ["X", "X", np.nan], unique=True)
+    list_ids, list_names = result.to_lists()
+    assert list_ids == ["A", "B", "C"]
+    assert list_names[0] == ["X"]
+    assert np.isnan(list_names[1][0])
+    assert list_names[2] == [None]
+
+    result_empty = results.aggregate_gene_names(["A"], [], [], fill_missing=np.nan)
+    assert len(result_empty) == 1
+    assert result_empty.offsets.tolist() == [0, 1]
+
+
+def test_aggregate_gene_names_drops_missing_ids_in():
+    result = results.aggregate_gene_names(["A", "B"], ["A", np.nan, "A", None], ["X", "Y", "Z", "W"])
+    assert result.to_lists() == (["A", "B"], [["X", "Z"], [None]])
+
+
+def test_take_reindex_and_concat():
+    result = results.GeneNameResult.from_lists(["A", "B", "C"], [["X", "Y"], [None], "Z"])
+
+    assert result.take([2, 0, 2]).to_lists() == (["C", "A", "C"], [["Z"], ["X", "Y"], ["Z"]])
+    assert result.reindex(["C", "D", "A"]).to_lists() == (["C", "A"], [["Z"], ["X", "Y"]])
+    assert result.has_gene_name().tolist() == [True, False, True]
+    concat = results.GeneNameResult.concat([result.take([1]), result.take([])])
+    assert concat.to_lists() == (["B"], [[None]])
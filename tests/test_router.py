@@ -0,0 +1,82 @@
+import sys
+
+from nf_rnaseq import router, variables
+from nf_rnaseq.cli import route_ids
+
+LIST_IDS = [
+    "ENST00000456328.2",
+    "ENST00000456328",
+    "ENSG00000223972.5",
+    "ENSG00000223972",
+    "NM_000546.6",
+    "NM_000546",
+    "NR_024540.1",
+    "P04637",
+    "A0A024RBG1",
+    "Q9NZK5-2",
+    "TP53",
+    "HLA-DRB1",
+    "not an ID",
+]
+
+
+def test_classify_ids():
+    assert router.classify_ids(LIST_IDS).tolist() == [
+        "ensembl_transcript_version",
+        "ensembl_transcript",
+        "ensembl_gene_version",
+        "ensembl_gene",
+        "refseq_version",
+        "refseq",
+        router.UNCLASSIFIED,
+        "uniprot",
+        "uniprot",
+        "uniprot",
+        "gene_symbol",
+        "gene_symbol",
+        router.UNCLASSIFIED,
+    ]
+
+
+def test_route_ids_dedups_and_routes_to_registered_databases():
+    dict_routes = router.route_ids(LIST_IDS + ["ENST00000456328.2"], {"ensembl_transcript_version": "LocalGTF"})
+
+    assert dict_routes["LocalGTF"] == ["ENST00000456328.2"]
+    assert dict_routes["UniProtBULK"] == ["P04637", "A0A024RBG1", "Q9NZK5-2"]
+    assert dict_routes["BioMartRefSeq"] == ["NM_000546.6", "NM_000546"]
+    assert dict_routes[router.UNCLASSIFIED] == ["NR_024540.1", "not an ID"]
+    assert set(dict_routes) - {router.UNCLASSIFIED} <= set(variables.DICT_DATABASES)
+    assert sum(len(list_ids) for list_ids in dict_routes.values()) == len(LIST_IDS)
+
+
+def test_route_ids_cli_writes_one_file_per_database(tmp_path, monkeypatch):
+    path_csv = tmp_path / "test_featureCounts.csv"
+    path_csv.write_text("Geneid,S1\n" + "".join(f"{i},1\n" for i in LIST_IDS))
+    monkeypatch.setattr(sys, "argv", ["route_ids", "-i", str(path_csv), "-o", str(tmp_path)])
+
+    route_ids.main()
+
+    assert (tmp_path / "BioMart_ids.txt").read_text() == "ENST00000456328.2\n"
+    assert (tmp_path / "HGNCSymbol_ids.txt").read_text() == "TP53\nHLA-DRB1\n"
+    assert (tmp_path / "unclassified.jsonl").read_text() == (
+        '{"original_id": "NR_024540.1", "gene_name": [], "source": "unclassified"}\n'
+        '{"original_id": "not an ID", "gene_name": [], "source": "unclassified"}\n'
+    )
+
+
+def test_route_ids_cli_local_gtf_takes_every_ensembl_id(tmp_path, monkeypatch):
+    path_csv = tmp_path / "test_featureCounts.csv"
+    path_csv.write_text("Geneid,S1\n" + "".join(f"{i},1\n" for i in LIST_IDS))
+    monkeypatch.setattr(sys, "argv", ["route_ids", "-i", str(path_csv), "-o", str(tmp_path), "-t", "LocalGTF"])
+
+    route_ids.main()
+
+    assert (tmp_path / "LocalGTF_ids.txt").read_text() == "ENST00000456328.2\nENST00000456328\n"
+    assert (tmp_path / "LocalGTFGene_ids.txt").read_text() == "ENSG00000223972.5\nENSG00000223972\n"
+    assert sorted(path.name for path in tmp_path.glob("*_ids.txt")) == [
+        "BioMartRefSeq_ids.txt",
+        "HGNCSymbol_ids.txt",
+        "LocalGTFGene_ids.txt",
+        "LocalGTF_ids.txt",
+        "UniProtBULK_ids.txt",
+    ]
@@ -0,0 +1,71 @@
+from dataclasses import dataclass, field
+
+import pytest
+
+from nf_rnaseq import results, scheduler, variables
+
+
+@dataclass
+class FakePOST:
+    identifier: str
+    term_in: str
+    term_out: str
+    url_base: str
+    jobId: str = field(init=False)
+
+    def __post_init__(self):
+        self.jobId = self.identifier
+
+
+@dataclass
+class FakeGET(FakePOST):
+    headers: dict | None = None
+    jobId: str = ""
+    dict_polls = {}
+
+    def __post_init__(self):
+        self.list_identifier = self.identifier.split(",")
+        self.result = results.GeneNameResult.from_lists(
+            self.list_identifier, [f"GENE_{i}" for i in self.list_identifier]
+        )
+
+    @staticmethod
+    def get_job_status(url_status):
+        jobId = url_status.split("/")[-1]
+        if "BAD" in jobId:
+            return "ERROR", "Invalid identifier"
+        if len(jobId.split(",")) > 3:
+            return "ERROR", "Id count exceeds the allowed limit of 3"
+        FakeGET.dict_polls[jobId] = FakeGET.dict_polls.get(jobId, 0) + 1
+        return ("FINISHED" if FakeGET.dict_polls[jobId] > 1 else "RUNNING"), ""
+
+
+@pytest.fixture
+def fake_database(monkeypatch):
+    dict_terms = {"term_in": "in", "term_out": "out", "url_base": "http://fake"}
+    monkeypatch.setitem(
+        variables.DICT_DATABASES,
+        "Fake",
+        {"POST": {"api_object": FakePOST, **dict_terms}, "GET": {"api_object": FakeGET, "headers": {}, **dict_terms}},
+    )
+    monkeypatch.setattr(scheduler, "get_polling_interval", lambda attempt, polling_interval: 0)
+    FakeGET.dict_polls.clear()
+    return "Fake"
+
+
+def test_run_jobs_polls_splits_and_preserves_order(fake_database):
+    list_ids = [f"ID{i}" for i in range(11)]
+
+    list_api_obj = scheduler.run_jobs(fake_database, list_ids, batch_size=5, workers=3)
+
+    assert [len(api_obj.result) for api_obj in list_api_obj] == [2, 3, 2, 3, 1]
+    assert [i for api_obj in list_api_obj for i in api_obj.result.identifiers] == list_ids
+    assert all(n == 2 for n in FakeGET.dict_polls.values())
+
+
+def test_run_jobs_raises_other_job_errors_without_splitting(fake_database):
+    list_ids = ["ID0", "ID1", "BAD", "ID3", "ID4"]
+
+    with pytest.raises(Exception, match="Invalid identifier"):
+        scheduler.run_jobs(fake_database, list_ids, batch_size=5, workers=3)
+    assert FakeGET.dict_polls == {}
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+import requests
+
+from nf_rnaseq import requests_wrapper, uniprot, variables
+from nf_rnaseq.api_schema import BatchTooLargeError
+
+
+def test_iter_results_streams_pages_and_joins_split_ids(monkeypatch, fake_session, make_response):
+    url_status = "https://rest.uniprot.org/idmapping/status/job1"
+    failed = {"failedIds": ["P00000"]}
+    dict_pages = {
+        url_status: ({"results": [{"from": "P1", "to": "A"}, {"from": "P2", "to": "B"}], **failed}, "page2"),
+        "page2": ({"results": [{"from": "P2", "to": "C"}, {"from": "P3", "to": "D"}], **failed}, "page3"),
+        "page3": ({"results": [{"from": "P3", "to": "D"}], **failed}, None),
+    }
+    fake_session(
+        {
+            url: make_response(json_body=json_page, headers={"Link": f'<{url_next}>; rel="next"'} if url_next else {})
+            for url, (json_page, url_next) in dict_pages.items()
+        }
+    )
+    monkeypatch.setattr(requests_wrapper, "is_cached", lambda session, url: True)
+
+    dict_get = variables.DICT_DATABASES["UniProtBULK"]["GET"]
+    api_obj = uniprot.UniProtGET(
+        identifier="P1,P2,P3,P00000,P99999",
+        term_in=dict_get["term_in"],
+        term_out=dict_get["term_out"],
+        url_base=dict_get["url_base"],
+        jobId="job1",
+        stream=True,
+    )
+    assert api_obj.json is None
+
+    list_pages = [result.to_lists() for result in api_obj.iter_results()]
+    # P99999 is in neither results nor failedIds
+    assert [ids for ids, _ in list_pages] == [["P1"], ["P2"], ["P3", "P00000", "P99999"]]
+    dict_out = {i: names for ids, list_names in list_pages for i, names in zip(ids, list_names, strict=True)}
+    assert dict_out["P2"] == ["B", "C"]
+    assert dict_out["P3"] == ["D"]
+    assert np.isnan(dict_out["P00000"][0])
+    assert np.isnan(dict_out["P99999"][0])
+
+
+@pytest.mark.parametrize(
+    ("message", "error"),
+    [
+        ("The 'ids' value has too many ids, the maximum is 100000", BatchTooLargeError),
+        ("Invalid 'from' parameter value", requests.exceptions.HTTPError),
+    ],
+)
+def test_post_splits_only_on_id_limit(fake_session, make_response, message, error):
+    fake_session(make_response(status_code=400, json_body={"messages": [message]}))
+
+    dict_post = variables.DICT_DATABASES["UniProtBULK"]["POST"]
+    with pytest.raises(error):
+        uniprot.UniProtPOST(
+            identifier="P1,P2",
+            term_in=dict_post["term_in"],
+            term_out=dict_post["term_out"],
+            url_base=dict_post["url_base"],
+        )